@@ -16,7 +16,97 @@ class Settings(BaseSettings):
     # 데이터 저장 경로
     data_dir: str = "data"
     comments_file: str = "comments.json"
-    
+
+    # 저장소 엔진 설정 ("json": 단일 JSON 파일, "log": 추가 전용 로그, "sharded": 게시물별 JSON 샤드, "sqlite": SQLite DB)
+    storage_engine: str = "json"
+    # SQLite 엔진 사용 시 DB 파일 이름 (data_dir 기준)
+    sqlite_file: str = "instagram.db"
+    # SQLite 엔진: 다른 프로세스의 쓰기 트랜잭션이 끝나길 기다리는 최대 시간 (초)
+    sqlite_busy_timeout: float = 30.0
+    # 로그 엔진(및 sharded 엔진의 ids.log) 압축(compaction) 기준: 전체 레코드 중 불필요한 레코드 비율과 최소 개수
+    log_compaction_ratio: float = 0.5
+    log_compaction_min_records: int = 1000
+    # json/sharded 엔진의 댓글 메모리 캐시 예산 (MB, 넘으면 오래 쓰지 않은 계정(샤드)부터 제거)
+    storage_cache_max_mb: int = 256
+    # json/sharded 엔진의 댓글 파일 저장 형식: "json"(들여쓰기, 기존 형식) | "json-compact" | "msgpack"(msgpack 패키지 필요)
+    # | "records"(길이 접두 레코드). 읽을 때는 형식을 자동 감지하고, 다른 형식의 파일은 처음 읽을 때 이 형식으로 변환
+    # (두 JSON 형식끼리는 읽는 결과가 같으므로 다음 저장 때 바뀜)
+    storage_format: str = "json"
+    # json 엔진: 읽기 위주인 아카이브 계정 ID 목록 (쉼표로 구분, 기본 계정은 "default"). 이 계정들은 댓글 파일 옆의
+    # 읽기 전용 mmap 세그먼트(.seg)에서 조회한 레코드만 디코딩하고 파싱한 댓글을 메모리에 캐시하지 않음
+    # (세그먼트는 처음 읽을 때와 쓰기 후에 다시 만듦)
+    storage_archive_accounts: str = ""
+    # json/log/sharded 엔진: 쓰기 때 데이터 파일 옆의 잠금 파일(.lock)로 다른 프로세스와 배타 (flock을 지원하지 않는
+    # 파일 시스템에서만 끔 — 끄면 서버와 동기화 스크립트가 동시에 쓸 때 변경이 유실될 수 있음)
+    storage_file_lock: bool = True
+
+    # Graph API 주소 (로컬 스텁 서버로 테스트할 때 변경)
+    graph_api_base_url: str = "https://graph.instagram.com"
+    # Graph API Batch 요청: 짧은 시간 창 안의 조회 요청을 최대 50개씩 묶어 전송
+    graph_batch_enabled: bool = False
+    graph_batch_window_ms: float = 10.0
+    graph_batch_max_size: int = 50
+    # 커서 페이지네이션 시 페이지당 항목 수
+    graph_page_size: int = 50
+    # 계정(액세스 토큰)별 호출 예산: 초당 요청 수와 순간 허용량
+    graph_rate_limit_per_sec: float = 5.0
+    graph_rate_limit_burst: int = 20
+    # X-App-Usage / X-Business-Use-Case-Usage 사용률(%)이 이 값을 넘으면 속도를 줄이고,
+    # reserve 값을 넘으면 답글/삭제 같은 interactive 요청만 보냄
+    graph_usage_slowdown_pct: float = 75.0
+    graph_usage_reserve_pct: float = 90.0
+    # 한도 초과(4xx)와 서버 오류(5xx) 재시도 (지수 백오프 + 지터)
+    graph_max_retries: int = 4
+    graph_retry_base_ms: float = 500.0
+    graph_retry_max_ms: float = 30000.0
+
+    # Graph API HTTP 연결 풀 설정 (프로세스 전체에서 공유)
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0
+    http_timeout: float = 10.0
+    # h2 패키지가 설치되어 있으면 HTTP/2 사용
+    http2: bool = True
+
+    # 댓글 동기화 시 미디어별 댓글 조회 동시 실행 수 (계정별 / 프로세스 전체)
+    sync_account_concurrency: int = 8
+    sync_process_concurrency: int = 32
+    # 다중 계정 동기화 스케줄러: 서버 안에서 실행할지, 동시에 동기화할 계정 수, 계정별 최근 미디어 수
+    sync_scheduler_enabled: bool = False
+    sync_scheduler_concurrency: int = 4
+    sync_media_limit: int = 10
+    # 계정별 동기화 간격(초): 처음 값과 범위. 한 번에 새 댓글이 약 sync_target_comments_per_run개 모이도록 조절
+    sync_interval_initial: float = 300.0
+    sync_interval_min: float = 30.0
+    sync_interval_max: float = 3600.0
+    sync_target_comments_per_run: float = 20.0
+
+    # 웹훅 이벤트 처리 큐 (워커 수, 워커당 한 번에 처리할 이벤트 수, 최대 대기 이벤트 수)
+    webhook_workers: int = 2
+    webhook_batch_size: int = 50
+    webhook_queue_max_size: int = 10000
+    # 웹훅 이벤트 디스크 스풀 (재시작/장애 시 유실 방지, data_dir 기준 디렉토리)
+    webhook_spool_enabled: bool = True
+    webhook_spool_dir: str = "webhook_spool"
+    webhook_spool_segment_bytes: int = 16 * 1024 * 1024
+    # group commit: 이 시간 동안 모인 이벤트를 fsync 한 번으로 확정
+    webhook_spool_group_commit_ms: float = 2.0
+    # 웹훅 댓글 상세 정보 조회 캐시(TTL 초, 최대 개수)와 게시물별 묶음 조회 시간 창
+    enrich_cache_ttl: float = 60.0
+    enrich_cache_size: int = 5000
+    enrich_window_ms: float = 20.0
+
+    # 새 댓글 푸시 스트림(SSE): 재연결 시 이어 보낼 최근 이벤트 수, 구독자별 버퍼 크기, 최대 구독자 수,
+    # 연결 유지 주석 간격(초, 다른 프로세스의 댓글 변경 확인 간격 겸), 클라이언트 재연결 대기(ms)
+    comment_stream_history: int = 1000
+    comment_stream_buffer_size: int = 256
+    comment_stream_max_subscribers: int = 1000
+    comment_stream_keepalive: float = 15.0
+    comment_stream_retry_ms: int = 3000
+
+    # 서버 시작 시 백그라운드에서 모든 계정의 댓글 검색 색인을 미리 만들지 여부 (끄면 첫 검색 때 만듦)
+    search_warm_up: bool = True
+
     # Railway 배포용 포트 (환경 변수에서 가져오거나 기본값 사용)
     port: int = 8000
     
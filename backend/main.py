@@ -1,13 +1,40 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routers import webhook, comments, accounts, auth
+from routers import webhook, comments, accounts, auth, stats, sync
+from services.instagram_client import open_http_pool, close_http_pool
+from services.webhook_queue import webhook_queue
+from services.comment_search import comment_search
+from services.account_manager import account_manager
+from services.sync_scheduler import sync_scheduler
 from config import settings
 import os
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """앱 시작/종료 시 공유 리소스 관리"""
+    # Graph API 연결 풀 (keep-alive)
+    await open_http_pool()
+    # 웹훅 이벤트 처리 워커
+    await webhook_queue.start()
+    # 댓글 검색 색인 (첫 검색이 전체 색인을 기다리지 않도록)
+    if settings.search_warm_up:
+        comment_search.warm_up([account["id"] for account in account_manager.get_all_accounts()])
+    # 다중 계정 댓글 동기화
+    if settings.sync_scheduler_enabled:
+        await sync_scheduler.start()
+    yield
+    await sync_scheduler.stop()
+    await webhook_queue.stop()
+    await close_http_pool()
+
+
 app = FastAPI(
     title="Instagram Comment Manager API",
     description="인스타그램 댓글 관리 API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Railway 배포를 위한 CORS 설정 (프론트엔드 URL을 환경 변수로 받을 수 있음)
@@ -39,6 +66,8 @@ app.include_router(webhook.router, tags=["webhook"])
 app.include_router(comments.router, prefix="/api", tags=["comments"])
 app.include_router(accounts.router, prefix="/api", tags=["accounts"])
 app.include_router(auth.router, prefix="/api", tags=["auth"])
+app.include_router(stats.router, prefix="/api", tags=["stats"])
+app.include_router(sync.router, prefix="/api", tags=["sync"])
 
 
 @app.get("/")
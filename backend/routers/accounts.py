@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Optional
 from services.account_manager import account_manager
-from services.instagram_client import InstagramClient
+from services.instagram_client import AsyncInstagramClient
 
 router = APIRouter()
 
@@ -50,8 +50,8 @@ async def create_account(account_request: AccountCreateRequest):
     """새 계정 추가"""
     try:
         # Access Token으로 사용자 정보 확인
-        client = InstagramClient(account_request.access_token)
-        user_info = client._make_request("GET", "me", {"fields": "id,username"})
+        client = AsyncInstagramClient(account_request.access_token)
+        user_info = await client._make_request("GET", "me", {"fields": "id,username"})
         
         account = account_manager.add_account(
             name=account_request.name,
@@ -5,7 +5,7 @@ import httpx
 import secrets
 from config import settings
 from services.account_manager import account_manager
-from services.instagram_client import InstagramClient
+from services.instagram_client import AsyncInstagramClient
 import os
 
 router = APIRouter()
@@ -203,8 +203,8 @@ async def instagram_callback(
                 # Instagram Account를 찾지 못한 경우 직접 시도
                 if not instagram_user_id:
                     try:
-                        instagram_client = InstagramClient(access_token)
-                        user_info = instagram_client._make_request("GET", "me", {"fields": "id,username"})
+                        instagram_client = AsyncInstagramClient(access_token)
+                        user_info = await instagram_client._make_request("GET", "me", {"fields": "id,username"})
                         instagram_user_id = user_info.get("id")
                         instagram_username = user_info.get("username", "unknown")
                     except:
@@ -220,11 +220,7 @@ async def instagram_callback(
             
             # 계정 추가 또는 업데이트
             account_name = f"{instagram_username}의 계정" if instagram_username else "Instagram 계정"
-            existing_account = None
-            for acc in account_manager.get_all_accounts():
-                if acc.get("user_id") == instagram_user_id or acc.get("username") == instagram_username:
-                    existing_account = acc
-                    break
+            existing_account = account_manager.find_account(instagram_user_id, instagram_username)
             
             if existing_account:
                 # 기존 계정 업데이트
@@ -1,9 +1,18 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Header
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
 from services.storage import storage
-from services.instagram_client import InstagramClient
+from services.instagram_client import AsyncInstagramClient
+from services.rate_limiter import GraphRateLimitError
 from services.account_manager import account_manager
+from services.comment_sync import get_media_list, sync_media_comments
+from services.pagination import encode_cursor, decode_cursor
+from services.comment_export import iter_ndjson, iter_gzip
+from services.comment_search import comment_search
+from services.comment_events import comment_events
+import asyncio
+import time
 
 router = APIRouter()
 
@@ -25,6 +34,32 @@ class CommentResponse(BaseModel):
     like_count: Optional[int] = 0
 
 
+def _rate_limit_error(e: GraphRateLimitError) -> HTTPException:
+    """호출 한도 초과를 빈 결과/500 대신 429(Retry-After)로 알림"""
+    headers = {"Retry-After": str(int(e.retry_after))} if e.retry_after else None
+    return HTTPException(status_code=429, detail=f"Instagram API rate limit reached: {e.detail}", headers=headers)
+
+
+class CommentPageResponse(BaseModel):
+    """커서 페이지네이션 응답 모델"""
+    comments: List[CommentResponse]
+    next_cursor: Optional[str] = None
+
+
+class CommentSearchResult(BaseModel):
+    """검색 결과 항목"""
+    account_id: str
+    score: float
+    comment: CommentResponse
+
+
+class CommentSearchResponse(BaseModel):
+    """댓글 검색 응답 모델"""
+    total: int
+    results: List[CommentSearchResult]
+    took_ms: float
+
+
 @router.get("/comments", response_model=List[CommentResponse])
 async def get_comments(
     account_id: Optional[str] = Query(None, description="계정 ID (없으면 기본 계정)"),
@@ -42,19 +77,128 @@ async def get_comments(
     if account_id and not account_manager.get_account(account_id):
         raise HTTPException(status_code=404, detail="Account not found")
     
-    comments = storage.get_all_comments(account_id)
+    return storage.list_comments(account_id, post_id=post_id, limit=limit, offset=offset)
+
+
+@router.get("/comments/page", response_model=CommentPageResponse)
+async def get_comments_page(
+    account_id: Optional[str] = Query(None, description="계정 ID (없으면 기본 계정)"),
+    post_id: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor (없으면 첫 페이지)")
+):
+    """
+    댓글 목록 조회 (커서 페이지네이션, 최신순)
+    - offset 대신 마지막으로 받은 댓글의 (created_at, id) 위치에서 이어서 조회하므로
+      페이지가 깊어져도 느려지지 않고, 새 댓글이 추가되어도 다음 페이지가 밀리지 않습니다.
+    - next_cursor가 null이면 마지막 페이지입니다.
+    """
+    if account_id and not account_manager.get_account(account_id):
+        raise HTTPException(status_code=404, detail="Account not found")
+    
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     
-    # post_id로 필터링
-    if post_id:
-        comments = [c for c in comments if c.get("post_id") == post_id]
+    # 다음 페이지가 있는지 알기 위해 하나 더 조회
+    comments = storage.list_comments_after(account_id, post_id=post_id, limit=limit + 1, after=after)
+    next_cursor = encode_cursor(comments[limit - 1]) if len(comments) > limit else None
+    return {"comments": comments[:limit], "next_cursor": next_cursor}
+
+
+@router.get("/comments/export")
+async def export_comments(
+    account_id: Optional[str] = Query(None, description="계정 ID (없으면 기본 계정)"),
+    post_id: Optional[str] = None,
+    since: Optional[str] = Query(None, description="created_at 시작 (이상, ISO 8601)"),
+    until: Optional[str] = Query(None, description="created_at 끝 (미만, ISO 8601)"),
+    gzip: bool = Query(False, description="gzip으로 압축해서 전송")
+):
+    """
+    계정의 댓글 전체를 NDJSON(한 줄에 댓글 하나)으로 내보내기
+    저장소에서 댓글을 하나씩 읽어 바로 전송하므로 댓글 수와 관계없이 메모리 사용량이 일정합니다.
+    """
+    if account_id and not account_manager.get_account(account_id):
+        raise HTTPException(status_code=404, detail="Account not found")
     
-    # 정렬 (최신순)
-    comments.sort(key=lambda x: x.get("created_at", ""), reverse=True)
+    chunks = iter_ndjson(storage.iter_comments(account_id, post_id=post_id, since=since, until=until))
+    filename = f"comments_{account_id or 'default'}.ndjson"
+    if gzip:
+        return StreamingResponse(
+            iter_gzip(chunks),
+            media_type="application/gzip",
+            headers={"Content-Disposition": f'attachment; filename="{filename}.gz"'}
+        )
+    return StreamingResponse(
+        chunks,
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/comments/stream")
+async def stream_comments(
+    request: Request,
+    account_id: Optional[str] = Query(None, description="계정 ID (없으면 모든 계정)"),
+    post_id: Optional[str] = Query(None, description="특정 게시물의 댓글만"),
+    last_event_id: Optional[str] = Header(None, description="EventSource가 재연결할 때 보내는 마지막 이벤트 ID")
+):
+    """
+    새 댓글 푸시 스트림 (Server-Sent Events)
+    웹훅/동기화/API로 저장된 댓글의 추가(created)/변경(updated)/삭제(deleted)를 바로 보내므로 목록을 폴링할 필요가 없습니다.
+    재연결하면 Last-Event-ID 다음 이벤트부터 이어 받고, 이어 받을 수 없으면 reset 이벤트를 받습니다(목록 다시 불러오기).
+    """
+    if account_id and not account_manager.get_account(account_id):
+        raise HTTPException(status_code=404, detail="Account not found")
     
-    # 페이지네이션
-    paginated_comments = comments[offset:offset + limit]
+    try:
+        subscriber, replay, reset_id = comment_events.subscribe(account_id, post_id, last_event_id)
+    except OverflowError:
+        raise HTTPException(status_code=503, detail="Too many stream subscribers")
+    return StreamingResponse(
+        comment_events.stream(subscriber, replay, reset_id, request.is_disconnected),
+        media_type="text/event-stream",
+        # 프록시가 이벤트를 모아 보내지 않도록
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/comments/search", response_model=CommentSearchResponse)
+async def search_comments(
+    q: str = Query(..., min_length=1, description="검색어 (\"@이름\"이면 사용자 이름만 검색)"),
+    account_id: Optional[str] = Query(None, description="계정 ID (없으면 모든 계정)"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000)
+):
+    """
+    댓글 본문/사용자 이름 검색 (점수순)
+    - 모든 검색어가 들어간 댓글만 반환하며, 한글은 2글자 단위로 색인해 조사/띄어쓰기가 달라도 찾습니다.
+    - 사용자 이름에서 찾은 댓글, 짧은 댓글일수록 점수가 높습니다.
+    - total은 전체 일치 건수이고 limit/offset으로 페이지를 나눕니다.
+    """
+    if account_id:
+        if not account_manager.get_account(account_id):
+            raise HTTPException(status_code=404, detail="Account not found")
+        account_ids = [account_id]
+    else:
+        account_ids = [account["id"] for account in account_manager.get_all_accounts()]
     
-    return paginated_comments
+    start = time.perf_counter()
+    # 색인이 아직 없는 계정은 처음 한 번 전체를 읽으므로 이벤트 루프 밖에서 실행
+    total, hits = await asyncio.get_running_loop().run_in_executor(
+        None, lambda: comment_search.search(q, account_ids, limit=limit, offset=offset)
+    )
+    results = []
+    for hit_account_id, comment_id, score in hits:
+        comment = storage.get_comment_by_id(comment_id, hit_account_id)
+        if comment:
+            results.append({"account_id": hit_account_id, "score": score, "comment": comment})
+    return {
+        "total": total,
+        "results": results,
+        "took_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
 
 
 @router.get("/comments/{comment_id}", response_model=CommentResponse)
@@ -97,7 +241,7 @@ async def reply_to_comment(
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
     
-    client = InstagramClient(account["access_token"])
+    client = AsyncInstagramClient(account["access_token"])
     
     # 테스트 댓글인지 확인 (test_로 시작하는 ID는 테스트 댓글)
     is_test_comment = comment_id.startswith("test_")
@@ -124,7 +268,7 @@ async def reply_to_comment(
     else:
         # 실제 Instagram 댓글의 경우 Instagram API 호출
         try:
-            instagram_response = client.reply_to_comment(
+            instagram_response = await client.reply_to_comment(
                 comment_id, 
                 reply_request.message
             )
@@ -151,6 +295,8 @@ async def reply_to_comment(
                 "instagram_id": instagram_response.get("id")
             }
         
+        except GraphRateLimitError as e:
+            raise _rate_limit_error(e)
         except Exception as e:
             raise HTTPException(
                 status_code=500, 
@@ -179,7 +325,7 @@ async def delete_comment(
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
     
-    client = InstagramClient(account["access_token"])
+    client = AsyncInstagramClient(account["access_token"])
     
     # 테스트 댓글인지 확인
     is_test_comment = comment_id.startswith("test_")
@@ -191,7 +337,7 @@ async def delete_comment(
     else:
         # 실제 Instagram 댓글의 경우 Instagram API 호출
         try:
-            deleted = client.delete_comment(comment_id)
+            deleted = await client.delete_comment(comment_id)
             
             if deleted:
                 # 저장소에서도 삭제
@@ -203,6 +349,8 @@ async def delete_comment(
                     detail="Failed to delete comment from Instagram"
                 )
         
+        except GraphRateLimitError as e:
+            raise _rate_limit_error(e)
         except Exception as e:
             raise HTTPException(
                 status_code=500, 
@@ -214,13 +362,17 @@ async def delete_comment(
 async def sync_comments(
     account_id: Optional[str] = Query(None, description="계정 ID (없으면 기본 계정)"),
     media_id: Optional[str] = None,
-    limit: int = 10
+    limit: int = 10,
+    full_history: bool = False,
+    force: bool = False
 ):
     """
     Instagram에서 댓글을 동기화 (폴링 방식)
     - account_id: 계정 ID (선택사항, 없으면 기본 계정)
     - media_id: 특정 미디어의 댓글만 동기화 (없으면 최근 미디어들의 댓글 동기화)
     - limit: 동기화할 미디어 개수 (media_id가 없을 때만 사용)
+    - full_history: True면 limit과 관계없이 계정의 전체 미디어를 커서를 따라 동기화
+    - force: True면 워터마크를 무시하고 모든 댓글을 다시 가져옴 (기본은 새 댓글만 증분 동기화)
     """
     try:
         if account_id and not account_manager.get_account(account_id):
@@ -231,40 +383,29 @@ async def sync_comments(
         if not account:
             raise HTTPException(status_code=404, detail="Account not found")
         
-        client = InstagramClient(account["access_token"])
-        synced_count = 0
+        client = AsyncInstagramClient(account["access_token"])
+        start = time.perf_counter()
         
         if media_id:
             # 특정 미디어의 댓글만 동기화
-            comments = client.get_media_comments(media_id)
-            for comment in comments:
-                comment_data = {
-                    "id": comment.get("id"),
-                    "post_id": media_id,
-                    "text": comment.get("text", ""),
-                    "username": comment.get("username", "unknown"),
-                    "timestamp": comment.get("timestamp"),
-                    "like_count": comment.get("like_count", 0),
-                    "replies": comment.get("replies", {}).get("data", [])
-                }
-                storage.add_comment(comment_data, account_id)
-                synced_count += 1
+            media_list = [{"id": media_id}]
         else:
             # 사용자의 최근 미디어들의 댓글 동기화
-            user_id = client.get_user_id()
+            user_id = await client.get_user_id()
             if not user_id:
                 raise HTTPException(
                     status_code=500, 
                     detail="Failed to get user ID"
                 )
             
-            media_list = client.get_user_media(user_id, limit)
+            media_list = await get_media_list(client, user_id, limit, full_history)
             
             if not media_list:
                 # 미디어가 없을 때 상세한 메시지 반환
                 return {
                     "success": True,
                     "synced_count": 0,
+                    "duration_ms": round((time.perf_counter() - start) * 1000, 1),
                     "message": "No media found. Please note: Instagram Graph API can only access posts created after converting to Business/Creator Account.",
                     "debug_info": {
                         "user_id": user_id,
@@ -272,29 +413,26 @@ async def sync_comments(
                         "note": "If you recently posted, the post must be created after the account was converted to Business/Creator Account."
                     }
                 }
-            
-            for media in media_list:
-                media_id = media.get("id")
-                comments = client.get_media_comments(media_id)
-                for comment in comments:
-                    comment_data = {
-                        "id": comment.get("id"),
-                        "post_id": media_id,
-                        "text": comment.get("text", ""),
-                        "username": comment.get("username", "unknown"),
-                        "timestamp": comment.get("timestamp"),
-                        "like_count": comment.get("like_count", 0),
-                        "replies": comment.get("replies", {}).get("data", [])
-                    }
-                    storage.add_comment(comment_data, account_id)
-                    synced_count += 1
+        
+        # 미디어별 댓글을 동시에 가져와 도착하는 대로 저장
+        result = await sync_media_comments(client, media_list, account_id, force=force)
+        synced_count = result["synced_count"]
         
         return {
             "success": True,
             "synced_count": synced_count,
+            "media_count": result["media_count"],
+            "skipped_media": result["skipped_media"],
+            "inserted": result["inserted"],
+            "updated": result["updated"],
+            "unchanged": result["unchanged"],
+            "failed_media": result["failed_media"],
+            "duration_ms": round((time.perf_counter() - start) * 1000, 1),
             "message": f"Successfully synced {synced_count} comments"
         }
     
+    except GraphRateLimitError as e:
+        raise _rate_limit_error(e)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from services.account_manager import account_manager
+from services.comment_stats import comment_stats
+
+router = APIRouter()
+
+
+def _check_account(account_id: Optional[str]):
+    if account_id and not account_manager.get_account(account_id):
+        raise HTTPException(status_code=404, detail="Account not found")
+
+
+@router.get("/stats")
+async def get_account_stats(
+    account_id: Optional[str] = Query(None, description="계정 ID (없으면 기본 계정)"),
+    top: int = Query(10, ge=0, le=100, description="상위 댓글 작성자 수")
+):
+    """
+    계정 댓글 집계
+    전체 댓글/답글 수, 답글이 없는 댓글 수, 게시물 수, 댓글을 많이 단 사용자 (저장 시점에 미리 집계된 값)
+    """
+    _check_account(account_id)
+    return comment_stats.account_summary(account_id, top=top)
+
+
+@router.get("/stats/posts")
+async def get_post_stats_list(
+    account_id: Optional[str] = Query(None, description="계정 ID (없으면 기본 계정)"),
+    limit: int = Query(50, ge=1, le=1000)
+):
+    """댓글이 많은 순으로 게시물별 댓글/답글/미답변 수"""
+    _check_account(account_id)
+    return comment_stats.list_posts(account_id, limit=limit)
+
+
+@router.get("/stats/posts/{post_id}")
+async def get_post_stats(
+    post_id: str,
+    account_id: Optional[str] = Query(None, description="계정 ID (없으면 기본 계정)")
+):
+    """게시물 하나의 댓글/답글/미답변 수"""
+    _check_account(account_id)
+    stats = comment_stats.post_stats(post_id, account_id)
+    if not stats:
+        raise HTTPException(status_code=404, detail="Post not found")
+    return stats
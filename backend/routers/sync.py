@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from services.sync_scheduler import sync_scheduler
+
+router = APIRouter()
+
+
+@router.get("/sync/status")
+async def get_sync_status():
+    """
+    다중 계정 동기화 스케줄러 상태
+    계정별 마지막 실행 시각/소요 시간/결과, 현재 간격과 다음 실행까지 남은 시간, 새 댓글 속도, 밀린 작업
+    (SYNC_SCHEDULER_ENABLED=true일 때 서버 안에서 실행)
+    """
+    return sync_scheduler.status()
@@ -2,10 +2,8 @@ from fastapi import APIRouter, Request, Response, HTTPException, Header
 from typing import Optional
 import hmac
 import hashlib
-import json
 from config import settings
-from services.storage import storage
-from services.instagram_client import instagram_client
+from services.webhook_queue import webhook_queue
 
 router = APIRouter()
 
@@ -42,57 +40,23 @@ async def handle_webhook(request: Request, x_hub_signature_256: Optional[str] =
     """
     Meta 웹훅 이벤트 수신 엔드포인트
     인스타그램에서 댓글이 달리면 이 엔드포인트로 이벤트가 전송됩니다.
+    서명만 검증한 뒤 원본 이벤트를 디스크 스풀과 처리 큐에 넣고 바로 응답합니다. (파싱/조회/저장은 백그라운드 워커가 처리)
     """
-    try:
-        body = await request.body()
-        
-        # 서명 검증 (선택사항, 보안 강화용)
-        if x_hub_signature_256:
-            if not verify_webhook_signature(body, x_hub_signature_256):
-                raise HTTPException(status_code=403, detail="Invalid signature")
-        
-        data = json.loads(body.decode('utf-8'))
-        
-        # 웹훅 이벤트 처리
-        if "entry" in data:
-            for entry in data["entry"]:
-                # 댓글 이벤트 처리
-                if "changes" in entry:
-                    for change in entry["changes"]:
-                        if change.get("field") == "comments":
-                            value = change.get("value", {})
-                            
-                            # 새 댓글 추가
-                            if "text" in value:
-                                comment_data = {
-                                    "id": value.get("id"),
-                                    "post_id": value.get("media_id") or entry.get("id"),
-                                    "text": value.get("text"),
-                                    "username": value.get("from", {}).get("username", "unknown"),
-                                    "timestamp": value.get("created_time"),
-                                    "replies": []
-                                }
-                                
-                                # 저장소에 저장
-                                storage.add_comment(comment_data)
-                                
-                                # Instagram API에서 상세 정보 가져오기 (선택사항)
-                                if comment_data["id"]:
-                                    try:
-                                        detailed_comment = instagram_client.get_comment(comment_data["id"])
-                                        if detailed_comment:
-                                            comment_data.update({
-                                                "like_count": detailed_comment.get("like_count", 0),
-                                                "replies": detailed_comment.get("replies", {}).get("data", [])
-                                            })
-                                            storage.update_comment(comment_data["id"], comment_data)
-                                    except Exception as e:
-                                        print(f"Error fetching detailed comment: {e}")
-        
-        return {"status": "ok"}
+    body = await request.body()
     
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail="Invalid JSON")
-    except Exception as e:
-        print(f"Webhook error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    # 서명 검증 (선택사항, 보안 강화용)
+    if x_hub_signature_256:
+        if not verify_webhook_signature(body, x_hub_signature_256):
+            raise HTTPException(status_code=403, detail="Invalid signature")
+    
+    if not await webhook_queue.submit(body):
+        # 큐가 가득 찬 경우 Meta가 나중에 다시 보내도록 503 응답
+        raise HTTPException(status_code=503, detail="Webhook queue is full")
+    
+    return {"status": "ok"}
+
+
+@router.get("/webhook/metrics")
+async def get_webhook_metrics():
+    """웹훅 처리 큐 현황 (큐 깊이, 지연 시간, 처리 건수)"""
+    return webhook_queue.metrics()
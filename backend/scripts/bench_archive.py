@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+아카이브 계정(mmap 세그먼트) 읽기 벤치마크
+같은 댓글 파일을 일반 json 엔진과 아카이브 계정(STORAGE_ARCHIVE_ACCOUNTS)으로 읽어
+ID 조회, 오프셋/키셋 페이지 조회 시간과 조회 후 남아 있는 Python 힙 메모리를 댓글 수별로 비교합니다.
+(mmap된 세그먼트 파일은 운영체제 페이지 캐시가 관리하므로 힙 메모리에 포함되지 않음)
+임시 디렉토리에 가짜 댓글을 만들어 측정하므로 기존 데이터에는 영향이 없습니다.
+"""
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+# 설정 로드에 필요한 값이 없으면 벤치마크용 값 사용
+for name in ("INSTAGRAM_ACCESS_TOKEN", "INSTAGRAM_APP_SECRET", "WEBHOOK_VERIFY_TOKEN"):
+    os.environ.setdefault(name, "bench")
+
+from config import settings
+from services.serializers import get_codec
+
+ACCOUNT_ID = "bench"
+
+
+def make_comments(count: int) -> list:
+    """벤치마크용 가짜 댓글 생성 (게시물 50개, 10개 중 하나는 답글 포함)"""
+    return [
+        {
+            "id": f"1789{i:012d}",
+            "post_id": f"media_{i % 50}",
+            "text": f"정말 예뻐요! 가격 문의드립니다 {i} 😍",
+            "username": f"user_{i % 1000}",
+            "created_at": f"2024-01-{1 + i // 86400 % 28:02d}T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}Z",
+            "replies": [{"id": f"1790{i:012d}", "text": "DM 드렸습니다"}] if i % 10 == 0 else [],
+        }
+        for i in range(count)
+    ]
+
+
+def create_engine(data_dir: str, archive: bool):
+    settings.data_dir = data_dir
+    settings.storage_archive_accounts = ACCOUNT_ID if archive else ""
+    from services.storage import StorageService
+    return StorageService()
+
+
+def run_queries(store, ids: list, count: int, rounds: int) -> dict:
+    """조회 종류별 평균 시간 (ms)"""
+    timings = {}
+    start = time.perf_counter()
+    for comment_id in ids[:rounds]:
+        store.get_comment_by_id(comment_id, ACCOUNT_ID)
+    timings["get"] = (time.perf_counter() - start) / rounds * 1e3
+
+    start = time.perf_counter()
+    for i in range(rounds):
+        store.list_comments(ACCOUNT_ID, f"media_{i % 50}", 50, 0)
+    timings["page"] = (time.perf_counter() - start) / rounds * 1e3
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        store.list_comments(ACCOUNT_ID, None, 50, count // 2)
+    timings["deep"] = (time.perf_counter() - start) / rounds * 1e3
+
+    cursor = ("2024-01-01T12:00:00Z", "")
+    start = time.perf_counter()
+    for _ in range(rounds):
+        store.list_comments_after(ACCOUNT_ID, None, 50, cursor)
+    timings["keyset"] = (time.perf_counter() - start) / rounds * 1e3
+    return timings
+
+
+def bench(count: int, rounds: int):
+    random.seed(count)
+    with tempfile.TemporaryDirectory() as data_dir:
+        comments_file = os.path.join(data_dir, f"comments_{ACCOUNT_ID}.json")
+        with open(comments_file, 'wb') as f:
+            f.write(get_codec("json").dumps({"comments": make_comments(count)}))
+        ids = [f"1789{random.randrange(count):012d}" for _ in range(rounds)]
+
+        for archive in (False, True):
+            label = "archive" if archive else "json"
+            # 첫 조회: 일반 엔진은 파일 파싱 + 인덱스 생성, 아카이브는 세그먼트 생성 (이후 프로세스는 열기만 함)
+            start = time.perf_counter()
+            create_engine(data_dir, archive).get_comment_by_id(ids[0], ACCOUNT_ID)
+            first_ms = (time.perf_counter() - start) * 1e3
+
+            # 새 인스턴스(다른 프로세스가 시작한 상황)의 첫 조회
+            store = create_engine(data_dir, archive)
+            start = time.perf_counter()
+            store.get_comment_by_id(ids[0], ACCOUNT_ID)
+            cold_ms = (time.perf_counter() - start) * 1e3
+            timings = run_queries(store, ids, count, rounds)
+            del store
+
+            # 또 다른 새 인스턴스로 조회한 뒤 남아 있는 힙 메모리 (추적 비용 때문에 시간 측정과 분리)
+            gc.collect()
+            tracemalloc.start()
+            store = create_engine(data_dir, archive)
+            run_queries(store, ids, count, 10)
+            gc.collect()
+            heap_mb = tracemalloc.get_traced_memory()[0] / 1024 / 1024
+            tracemalloc.stop()
+            print(
+                f"{count:>9,} | {label:>7} | {first_ms:>9.1f} | {cold_ms:>8.1f} | {heap_mb:>8.1f} | "
+                f"{timings['get']:>7.3f} | {timings['page']:>7.3f} | {timings['deep']:>7.3f} | {timings['keyset']:>7.3f}"
+            )
+            del store
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="아카이브 계정(mmap 세그먼트) 읽기 벤치마크")
+    parser.add_argument(
+        "--counts", default="10000,100000", help="쉼표로 구분한 댓글 수 목록 (기본값: 10000,100000)"
+    )
+    parser.add_argument("--rounds", type=int, default=200, help="조회 종류별 반복 횟수 (기본값: 200)")
+
+    args = parser.parse_args()
+    print("시간 단위 ms, 메모리 단위 MB (first: 새 파일 첫 조회, cold: 새 인스턴스 첫 조회, heap: 조회 후 남은 Python 힙)")
+    print(
+        f"{'comments':>9} | {'engine':>7} | {'first':>9} | {'cold':>8} | {'heap':>8} | "
+        f"{'get':>7} | {'page':>7} | {'deep':>7} | {'keyset':>7}"
+    )
+    for count in (int(value) for value in args.counts.split(",")):
+        bench(count, args.rounds)
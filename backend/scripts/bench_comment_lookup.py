@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+댓글 조회 마이크로벤치마크
+선형 검색(기존 get_comment_by_id 방식)과 메모리 해시 인덱스 조회 시간을 비교합니다.
+"""
+import sys
+import time
+import random
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from services.storage import _CommentIndex
+
+
+def make_comments(count: int) -> list:
+    """벤치마크용 가짜 댓글 생성"""
+    return [
+        {
+            "id": f"1789{i:012d}",
+            "post_id": f"media_{i % 50}",
+            "text": f"댓글 내용 {i}",
+            "username": f"user_{i % 1000}",
+            "created_at": f"2024-01-01T00:00:{i % 60:02d}Z",
+            "replies": [],
+        }
+        for i in range(count)
+    ]
+
+
+def linear_lookup(comments: list, comment_id: str):
+    for comment in comments:
+        if comment.get("id") == comment_id:
+            return comment
+    return None
+
+
+def bench(count: int, lookups: int):
+    comments = make_comments(count)
+    ids = [comments[random.randrange(count)]["id"] for _ in range(lookups)]
+    # 중복 체크 시나리오: 절반은 없는 ID
+    ids[::2] = [f"missing_{i}" for i in range(len(ids[::2]))]
+
+    start = time.perf_counter()
+    for comment_id in ids:
+        linear_lookup(comments, comment_id)
+    linear_us = (time.perf_counter() - start) / lookups * 1e6
+
+    start = time.perf_counter()
+    index = _CommentIndex({"comments": comments}, None)
+    build_ms = (time.perf_counter() - start) * 1e3
+
+    start = time.perf_counter()
+    for comment_id in ids:
+        index.by_id.get(comment_id)
+    indexed_us = (time.perf_counter() - start) / lookups * 1e6
+
+    print(
+        f"{count:>10,} | {linear_us:>14.1f} | {indexed_us:>14.3f} | "
+        f"{build_ms:>14.1f} | {linear_us / indexed_us:>10,.0f}x"
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="댓글 조회 마이크로벤치마크")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000, 1_000_000],
+        help="저장된 댓글 수 (기본값: 10000 100000 1000000)"
+    )
+    parser.add_argument(
+        "--lookups",
+        type=int,
+        default=200,
+        help="크기별 조회 횟수 (기본값: 200)"
+    )
+
+    args = parser.parse_args()
+
+    print(f"{'comments':>10} | {'linear (us/op)':>14} | {'index (us/op)':>14} | {'index build ms':>14} | {'speedup':>11}")
+    for size in args.sizes:
+        bench(size, args.lookups)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+동시 쓰기 스트레스 벤치마크
+여러 프로세스 × 스레드가 같은 계정에 동시에 댓글을 추가하고, 하나의 댓글에 답글을 붙입니다(read-modify-write).
+끝난 뒤 저장된 댓글/답글 수를 기대값과 비교해 유실된 변경이 없는지 확인하고 초당 쓰기 수를 출력합니다.
+임시 디렉토리에서 실행하므로 기존 데이터에는 영향이 없습니다.
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+# 설정 로드에 필요한 값이 없으면 벤치마크용 값 사용
+for name in ("INSTAGRAM_ACCESS_TOKEN", "INSTAGRAM_APP_SECRET", "WEBHOOK_VERIFY_TOKEN"):
+    os.environ.setdefault(name, "bench")
+
+from config import settings
+
+ACCOUNT_ID = "bench"
+SHARED_ID = "shared"
+
+
+def create_engine(engine: str, data_dir: str):
+    settings.data_dir = data_dir
+    if engine == "json":
+        from services.storage import StorageService
+        return StorageService()
+    if engine == "log":
+        from services.log_storage import LogStorageService
+        return LogStorageService()
+    if engine == "sharded":
+        from services.sharded_storage import ShardedStorageService
+        return ShardedStorageService()
+    from services.sqlite_storage import SQLiteStorageService
+    return SQLiteStorageService(os.path.join(data_dir, "bench.db"))
+
+
+def worker(engine: str, data_dir: str, file_lock: bool, proc: int, threads: int, writes: int, barrier):
+    """프로세스 하나: 스레드마다 댓글 추가와 공유 댓글 답글 추가를 번갈아 writes번 수행"""
+    settings.storage_file_lock = file_lock
+    store = create_engine(engine, data_dir)
+    barrier.wait()
+
+    errors = []
+
+    def run(thread: int):
+        for i in range(writes):
+            key = f"p{proc}-t{thread}-{i}"
+            try:
+                if i % 2 == 0:
+                    store.add_comment({"id": key, "post_id": "media_0", "text": f"댓글 {key}"}, ACCOUNT_ID)
+                else:
+                    store.add_reply(SHARED_ID, {"id": f"reply-{key}", "text": f"답글 {key}"}, ACCOUNT_ID)
+            except Exception as e:
+                errors.append(e)
+
+    pool = [threading.Thread(target=run, args=(t,)) for t in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    if errors:
+        print(f"⚠️  프로세스 {proc}: 쓰기 실패 {len(errors)}건 (첫 오류: {type(errors[0]).__name__})")
+        sys.exit(1)
+
+
+def bench(engine: str, processes: int, threads: int, writes: int, file_lock: bool) -> bool:
+    with tempfile.TemporaryDirectory() as data_dir:
+        settings.storage_file_lock = file_lock
+        store = create_engine(engine, data_dir)
+        store.add_comment({"id": SHARED_ID, "post_id": "media_0", "text": "공유 댓글"}, ACCOUNT_ID)
+
+        ctx = multiprocessing.get_context("spawn")
+        barrier = ctx.Barrier(processes + 1)
+        procs = [
+            ctx.Process(target=worker, args=(engine, data_dir, file_lock, p, threads, writes, barrier))
+            for p in range(processes)
+        ]
+        for p in procs:
+            p.start()
+        # 모든 프로세스가 준비된 뒤 동시에 시작
+        barrier.wait()
+        start = time.perf_counter()
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - start
+        failed = any(p.exitcode != 0 for p in procs)
+
+        # 다른 프로세스가 쓴 결과를 새 인스턴스로 다시 읽어 확인
+        store = create_engine(engine, data_dir)
+        total = processes * threads * writes
+        expected_comments = processes * threads * ((writes + 1) // 2) + 1
+        expected_replies = processes * threads * (writes // 2)
+        try:
+            comments = store.get_all_comments(ACCOUNT_ID)
+            shared = store.get_comment_by_id(SHARED_ID, ACCOUNT_ID) or {}
+        except Exception as e:
+            print(f"{engine:>6} | 저장된 데이터를 읽을 수 없음 ({type(e).__name__})")
+            return False
+        replies = len(shared.get("replies", []))
+        lost = (expected_comments - len(comments)) + (expected_replies - replies)
+        print(
+            f"{engine:>6} | {total:>7,} | {elapsed:>7.2f} | {total / elapsed:>9,.0f} | "
+            f"{len(comments):>6,}/{expected_comments:<6,} | {replies:>6,}/{expected_replies:<6,} | {lost:>5,}"
+        )
+        return lost == 0 and not failed
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="동시 쓰기 스트레스 벤치마크 (유실된 변경 확인)")
+    parser.add_argument(
+        "--engine", choices=["json", "log", "sharded", "sqlite", "all"], default="all", help="저장소 엔진 (기본값: all)"
+    )
+    parser.add_argument("--processes", type=int, default=4, help="쓰기 프로세스 수 (기본값: 4)")
+    parser.add_argument("--threads", type=int, default=4, help="프로세스당 스레드 수 (기본값: 4)")
+    parser.add_argument("--writes", type=int, default=100, help="스레드당 쓰기 수 (기본값: 100)")
+    parser.add_argument(
+        "--no-file-lock", action="store_true", help="json/log/sharded 엔진의 파일 잠금을 끄고 실행 (유실 재현용)"
+    )
+
+    args = parser.parse_args()
+    engines = ["json", "log", "sharded", "sqlite"] if args.engine == "all" else [args.engine]
+    print(
+        f"프로세스 {args.processes} × 스레드 {args.threads} × 쓰기 {args.writes} "
+        f"(파일 잠금 {'끔' if args.no_file_lock else '켬'})"
+    )
+    print(f"{'engine':>6} | {'writes':>7} | {'sec':>7} | {'writes/s':>9} | {'comments':>13} | {'replies':>13} | {'lost':>5}")
+    ok = True
+    for engine in engines:
+        ok = bench(engine, args.processes, args.threads, args.writes, not args.no_file_lock) and ok
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+댓글 페이지네이션 벤치마크
+저장소 엔진별로 offset 방식(list_comments)과 커서 방식(list_comments_after)의 깊은 페이지 조회 시간을 비교합니다.
+임시 디렉토리에 가짜 댓글을 만들어 측정하므로 기존 데이터에는 영향이 없습니다.
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+# 설정 로드에 필요한 값이 없으면 벤치마크용 값 사용
+for name in ("INSTAGRAM_ACCESS_TOKEN", "INSTAGRAM_APP_SECRET", "WEBHOOK_VERIFY_TOKEN"):
+    os.environ.setdefault(name, "bench")
+
+from config import settings
+from services.pagination import encode_cursor, decode_cursor
+
+
+def make_comments(count: int) -> list:
+    """벤치마크용 가짜 댓글 생성 (created_at이 겹치는 댓글 포함)"""
+    return [
+        {
+            "id": f"1789{i:012d}",
+            "post_id": f"media_{i % 50}",
+            "text": f"댓글 내용 {i}",
+            "username": f"user_{i % 1000}",
+            "created_at": f"2024-01-{1 + i // 86400 % 28:02d}T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}Z",
+            "replies": [],
+        }
+        for i in range(count)
+    ]
+
+
+def create_engine(engine: str, data_dir: str):
+    settings.data_dir = data_dir
+    if engine == "json":
+        from services.storage import StorageService
+        return StorageService()
+    if engine == "log":
+        from services.log_storage import LogStorageService
+        return LogStorageService()
+    if engine == "sharded":
+        from services.sharded_storage import ShardedStorageService
+        return ShardedStorageService()
+    from services.sqlite_storage import SQLiteStorageService
+    return SQLiteStorageService(os.path.join(data_dir, "bench.db"))
+
+
+def time_ms(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def bench(engine: str, count: int, page_size: int, depths: list, repeat: int):
+    with tempfile.TemporaryDirectory() as data_dir:
+        store = create_engine(engine, data_dir)
+        store.upsert_many(make_comments(count))
+
+        # 캐시를 채우기 위한 첫 조회
+        store.list_comments(limit=page_size)
+        store.list_comments_after(limit=page_size)
+
+        for depth in depths:
+            offset = depth * page_size
+            if offset >= count:
+                continue
+            # 커서 방식은 직전 페이지의 마지막 댓글에서 이어서 조회
+            previous = store.list_comments(limit=1, offset=offset - 1)[0] if offset else None
+            after = decode_cursor(encode_cursor(previous)) if previous else None
+
+            offset_ms = time_ms(lambda: store.list_comments(limit=page_size, offset=offset), repeat)
+            cursor_ms = time_ms(lambda: store.list_comments_after(limit=page_size, after=after), repeat)
+            print(
+                f"{engine:>6} | {count:>10,} | {depth:>6} | {offset_ms:>12.3f} | {cursor_ms:>12.3f} | "
+                f"{offset_ms / cursor_ms:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="댓글 페이지네이션 벤치마크")
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        default=["json", "sqlite"],
+        choices=["json", "log", "sharded", "sqlite"],
+        help="측정할 저장소 엔진 (기본값: json sqlite)"
+    )
+    parser.add_argument("--count", type=int, default=100_000, help="저장된 댓글 수 (기본값: 100000)")
+    parser.add_argument("--page-size", type=int, default=50, help="페이지 크기 (기본값: 50)")
+    parser.add_argument(
+        "--depths",
+        type=int,
+        nargs="+",
+        default=[0, 10, 100, 1000],
+        help="조회할 페이지 번호 (기본값: 0 10 100 1000)"
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="페이지별 반복 횟수 (기본값: 20)")
+
+    args = parser.parse_args()
+
+    print(f"{'engine':>6} | {'comments':>10} | {'page':>6} | {'offset (ms)':>12} | {'cursor (ms)':>12} | {'speedup':>9}")
+    for engine in args.engines:
+        bench(engine, args.count, args.page_size, args.depths, args.repeat)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+댓글 검색 벤치마크
+가짜 댓글(한글/영문 혼합)로 검색 색인을 만들고 검색어별 응답 시간을 측정합니다.
+저장소를 거치지 않고 색인만 메모리에 만들므로 기존 데이터에는 영향이 없습니다.
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+# 설정 로드에 필요한 값이 없으면 벤치마크용 값 사용
+for name in ("INSTAGRAM_ACCESS_TOKEN", "INSTAGRAM_APP_SECRET", "WEBHOOK_VERIFY_TOKEN"):
+    os.environ.setdefault(name, "bench")
+
+from services.comment_search import CommentSearchIndex
+
+WORDS = [
+    "안녕하세요", "좋아요", "최고예요", "정말", "예뻐요", "사진", "너무", "귀여워요", "가격", "문의",
+    "구매", "하고", "싶어요", "배송", "언제", "되나요", "색상", "사이즈", "추천", "감사합니다",
+    "대박", "완전", "멋져요", "오늘", "내일", "이벤트", "참여", "합니다", "ㅋㅋㅋ", "ㅠㅠ",
+    "love", "nice", "cute", "wow", "price", "dm", "please", "amazing", "follow", "shop",
+]
+
+DEFAULT_QUERIES = ["가격 문의", "가격문의", "배송", "귀여워요", "love", "이벤트 참여", "@user_42", "ㅋㅋ", "nice shop"]
+
+
+def make_comments(count: int, accounts: int, seed: int = 42):
+    """벤치마크용 가짜 댓글을 (계정, 댓글) 순서로 생성"""
+    rng = random.Random(seed)
+    for i in range(count):
+        yield f"account_{i % accounts}", {
+            "id": f"1789{i:012d}",
+            "text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 12))),
+            "username": f"user_{rng.randrange(20000)}",
+        }
+
+
+def bench(count: int, accounts: int, queries: list, repeat: int, limit: int, memory: bool):
+    index = CommentSearchIndex()
+    by_account = {}
+    for account_id, comment in make_comments(count, accounts):
+        by_account.setdefault(account_id, []).append(comment)
+
+    # 메모리 추적은 색인 시간을 크게 늘리므로 --memory일 때만 사용
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    for account_id, comments in by_account.items():
+        index.index_account(account_id, comments)
+    build_s = time.perf_counter() - start
+    if memory:
+        print(f"색인 메모리: 약 {tracemalloc.get_traced_memory()[0] / 1024 / 1024:.0f} MiB")
+        tracemalloc.stop()
+    by_account.clear()
+
+    print(f"색인: 댓글 {count:,}개, {build_s:.1f}s, {index.stats()}")
+    print(f"{'query':>14} | {'total':>9} | {'avg (ms)':>9} | {'max (ms)':>9}")
+    all_accounts = [f"account_{i}" for i in range(accounts)]
+    for query in queries:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            total, _ = index.search(query, all_accounts, limit=limit)
+            timings.append((time.perf_counter() - start) * 1e3)
+        print(f"{query:>14} | {total:>9,} | {sum(timings) / len(timings):>9.2f} | {max(timings):>9.2f}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="댓글 검색 벤치마크")
+    parser.add_argument("--count", type=int, default=1_000_000, help="색인할 댓글 수 (기본값: 1000000)")
+    parser.add_argument("--accounts", type=int, default=5, help="계정 수 (기본값: 5)")
+    parser.add_argument("--queries", nargs="+", default=DEFAULT_QUERIES, help="측정할 검색어")
+    parser.add_argument("--repeat", type=int, default=10, help="검색어별 반복 횟수 (기본값: 10)")
+    parser.add_argument("--limit", type=int, default=20, help="페이지 크기 (기본값: 20)")
+    parser.add_argument("--memory", action="store_true", help="색인 메모리 사용량도 측정 (느림)")
+
+    args = parser.parse_args()
+    bench(args.count, args.accounts, args.queries, args.repeat, args.limit, args.memory)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+댓글 파일 저장 형식 벤치마크
+저장 형식(STORAGE_FORMAT)별로 댓글 파일 저장/읽기 시간과 파일 크기, 저장소의 첫 조회(파일 읽기 + 인덱스 생성) 시간을
+기존 방식(표준 json 모듈, 들여쓰기)과 비교합니다.
+임시 디렉토리에 가짜 댓글을 만들어 측정하므로 기존 데이터에는 영향이 없습니다.
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+# 설정 로드에 필요한 값이 없으면 벤치마크용 값 사용
+for name in ("INSTAGRAM_ACCESS_TOKEN", "INSTAGRAM_APP_SECRET", "WEBHOOK_VERIFY_TOKEN"):
+    os.environ.setdefault(name, "bench")
+
+from config import settings
+from services import serializers
+from services.serializers import CODECS
+
+
+def make_comments(count: int) -> list:
+    """벤치마크용 가짜 댓글 생성 (10개 중 하나는 답글 포함)"""
+    return [
+        {
+            "id": f"1789{i:012d}",
+            "post_id": f"media_{i % 50}",
+            "text": f"정말 예뻐요! 가격 문의드립니다 {i} 😍",
+            "username": f"user_{i % 1000}",
+            "timestamp": f"2024-01-{1 + i // 86400 % 28:02d}T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}+0000",
+            "created_at": f"2024-01-{1 + i // 86400 % 28:02d}T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}Z",
+            "like_count": i % 7,
+            "replies": [
+                {"id": f"1790{i:012d}", "text": "DM 드렸습니다", "created_at": "2024-01-01T00:00:00Z"}
+            ] if i % 10 == 0 else [],
+        }
+        for i in range(count)
+    ]
+
+
+class _StdlibJson:
+    """기존 저장 방식 (표준 json 모듈, indent=2)"""
+
+    name = "json (stdlib)"
+
+    @staticmethod
+    def dumps(data) -> bytes:
+        return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+    @staticmethod
+    def loads(raw: bytes):
+        return json.loads(raw)
+
+
+def best_ms(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1e3
+
+
+def bench(count: int, repeat: int):
+    data = {"comments": make_comments(count)}
+    codecs = [_StdlibJson()]
+    for name, codec in CODECS.items():
+        if name == "msgpack" and serializers.msgpack is None:
+            print("ℹ️  msgpack 패키지가 없어 msgpack 형식은 건너뜁니다 (pip install msgpack)")
+            continue
+        codecs.append(codec)
+    print(f"orjson: {'사용' if serializers.orjson is not None else '없음 (표준 json 모듈 사용)'}")
+    print(f"댓글 {count:,}개, 반복 {repeat}회 (최솟값)")
+    print(f"{'format':>14} | {'size (MB)':>9} | {'save (ms)':>9} | {'load (ms)':>9} | {'cold get (ms)':>13}")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        for codec in codecs:
+            path = os.path.join(data_dir, "bench.bin")
+
+            def save():
+                with open(path, 'wb') as f:
+                    f.write(codec.dumps(data))
+
+            def load():
+                with open(path, 'rb') as f:
+                    return codec.loads(f.read())
+
+            save_ms = best_ms(save, repeat)
+            load_ms = best_ms(load, repeat)
+            assert len(load()["comments"]) == count
+            size_mb = os.path.getsize(path) / 1024 / 1024
+
+            # 저장소 첫 조회: 파일 읽기 + ID 인덱스 생성 (기존 방식은 같은 파일을 json 형식 설정으로 읽음)
+            cold_ms = float("nan")
+            if codec.name in CODECS:
+                account_dir = os.path.join(data_dir, codec.name)
+                os.makedirs(account_dir, exist_ok=True)
+                os.replace(path, os.path.join(account_dir, "comments_bench.json"))
+                settings.data_dir = account_dir
+                settings.storage_format = codec.name
+                from services.storage import StorageService
+
+                def cold_get():
+                    StorageService().get_comment_by_id("1789000000000000", "bench")
+
+                cold_ms = best_ms(cold_get, repeat)
+            print(f"{codec.name:>14} | {size_mb:>9.1f} | {save_ms:>9.1f} | {load_ms:>9.1f} | {cold_ms:>13.1f}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="댓글 파일 저장 형식 벤치마크")
+    parser.add_argument("--count", type=int, default=100_000, help="댓글 수 (기본값: 100000)")
+    parser.add_argument("--repeat", type=int, default=5, help="반복 횟수 (기본값: 5)")
+
+    args = parser.parse_args()
+    bench(args.count, args.repeat)
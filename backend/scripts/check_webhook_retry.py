@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+웹훅 재시도 회귀 확인
+첫 번째 저장(upsert_many)이 실패한 묶음을 다시 시도할 때 댓글이 중복으로 건너뛰어지지 않고 저장되는지,
+저장된 뒤에만 스풀 체크포인트가 올라가는지 확인합니다. (실패하면 종료 코드 1)
+임시 디렉토리에서 실행하므로 기존 데이터에는 영향이 없습니다.
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+# 설정 로드에 필요한 값이 없으면 확인용 값 사용 (상세 정보 조회는 연결할 수 없는 주소로 보내 바로 실패시킴)
+for name in ("INSTAGRAM_ACCESS_TOKEN", "INSTAGRAM_APP_SECRET", "WEBHOOK_VERIFY_TOKEN"):
+    os.environ.setdefault(name, "check")
+os.environ["DATA_DIR"] = tempfile.mkdtemp()
+os.environ["GRAPH_API_BASE_URL"] = "http://127.0.0.1:1"
+os.environ["GRAPH_MAX_RETRIES"] = "0"
+
+from services.storage import storage
+from services.webhook_queue import WebhookIngestQueue
+from services.webhook_spool import WebhookSpool
+
+
+def make_payload(comment_ids: list) -> bytes:
+    return json.dumps({
+        "entry": [{
+            "id": "media_0",
+            "changes": [
+                {"field": "comments", "value": {"id": comment_id, "text": "확인용 댓글", "from": {"username": "u"}}}
+                for comment_id in comment_ids
+            ],
+        }]
+    }).encode("utf-8")
+
+
+async def check() -> bool:
+    upsert_many = storage.upsert_many
+    calls = {"count": 0}
+
+    def failing_once(comments, account_id=None):
+        calls["count"] += 1
+        if calls["count"] == 1:
+            raise OSError("디스크 쓰기 실패 (확인용)")
+        return upsert_many(comments, account_id)
+
+    storage.upsert_many = failing_once
+    spool = WebhookSpool()
+    queue = WebhookIngestQueue(workers=1, spool=spool)
+    await queue.start()
+    try:
+        await queue.submit(make_payload(["retry_1", "retry_2"]))
+        await queue.stop()
+    finally:
+        storage.upsert_many = upsert_many
+
+    stored = [storage.get_comment_by_id(comment_id) for comment_id in ("retry_1", "retry_2")]
+    ok = all(stored) and calls["count"] == 2 and spool.committed_seq == 1
+    print(f"저장 시도 {calls['count']}회, 저장된 댓글 {sum(1 for c in stored if c)}/2, 스풀 체크포인트 {spool.committed_seq}")
+    print("✅ 재시도한 묶음이 저장되었습니다." if ok else "❌ 재시도한 묶음의 댓글이 유실되었습니다.")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(check()) else 1)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Graph API 스텁 서버
+로컬에서 AsyncInstagramClient(Batch 요청 포함)를 시험할 때 사용합니다.
+GRAPH_API_BASE_URL=http://localhost:8900 으로 설정한 뒤 백엔드를 실행하세요.
+"""
+import json
+from urllib.parse import urlsplit, parse_qs, urlencode
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+app = FastAPI(title="Graph API Stub")
+
+# 엔드포인트별 요청 횟수 (GET /_stats 로 확인)
+stats = {"requests": 0, "batch_requests": 0, "batched_calls": 0}
+
+
+# 미디어당 댓글 수 / 계정의 미디어 수 (커서 페이지네이션 시험용)
+COMMENTS_PER_MEDIA = 120
+MEDIA_COUNT = 30
+
+
+def _page(items: list, path: str, params: dict, base_url: str) -> dict:
+    """after 커서와 limit으로 잘라 paging.next 를 붙인 응답 생성"""
+    limit = int(params.get("limit", 25))
+    start = int(params.get("after", 0))
+    response = {"data": items[start:start + limit]}
+    if start + limit < len(items):
+        next_params = dict(params, after=str(start + limit))
+        response["paging"] = {
+            "cursors": {"after": str(start + limit)},
+            "next": f"{base_url.rstrip('/')}/{path.strip('/')}?{urlencode(next_params)}"
+        }
+    return response
+
+
+def _fake_response(path: str, params: dict, base_url: str) -> dict:
+    """경로에 맞는 가짜 응답 생성"""
+    if not path.strip("/") and "ids" in params:
+        # 여러 ID 조회: ?ids=a,b,c → {id: 객체}
+        return {
+            object_id: {"id": object_id, "text": "stub comment", "username": "stub_user", "like_count": 0}
+            for object_id in params["ids"].split(",")
+        }
+    parts = path.strip("/").split("/")
+    if parts[0] == "me":
+        return {"id": "stub_user", "username": "stub"}
+    if len(parts) == 2 and parts[1] == "media":
+        media = [{"id": f"media_{i}", "comments_count": COMMENTS_PER_MEDIA} for i in range(MEDIA_COUNT)]
+        return _page(media, path, params, base_url)
+    if len(parts) == 2 and parts[1] == "comments":
+        comments = [
+            {"id": f"{parts[0]}_c{i}", "text": f"stub comment {i}", "username": f"user_{i % 7}",
+             "timestamp": f"2024-01-01T00:{i // 60:02d}:{i % 60:02d}+0000", "like_count": i % 5}
+            for i in reversed(range(COMMENTS_PER_MEDIA))
+        ]
+        return _page(comments, path, params, base_url)
+    return {"id": parts[0], "text": "stub comment", "username": "stub_user", "like_count": 0}
+
+
+@app.get("/_stats")
+async def get_stats():
+    return stats
+
+
+@app.post("/")
+async def batch(request: Request):
+    """Batch 요청: batch=[{"method": "GET", "relative_url": "..."}]"""
+    form = await request.form()
+    calls = json.loads(form["batch"])
+    stats["requests"] += 1
+    stats["batch_requests"] += 1
+    stats["batched_calls"] += len(calls)
+    results = []
+    for call in calls:
+        url = urlsplit(call["relative_url"])
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        results.append({"code": 200, "body": json.dumps(_fake_response(url.path, params, str(request.base_url)))})
+    return JSONResponse(results)
+
+
+@app.get("/{path:path}")
+async def get(path: str, request: Request):
+    stats["requests"] += 1
+    return _fake_response(path, dict(request.query_params), str(request.base_url))
+
+
+if __name__ == "__main__":
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Graph API 스텁 서버")
+    parser.add_argument("--port", type=int, default=8900, help="포트 (기본값: 8900)")
+
+    args = parser.parse_args()
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
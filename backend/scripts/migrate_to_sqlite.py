@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+SQLite 마이그레이션 스크립트
+기존 JSON 파일(comments*.json, accounts.json)의 데이터를 SQLite DB로 옮깁니다.
+이미 옮겨진 댓글/계정은 건너뛰므로 여러 번 실행해도 안전합니다.
+(ID가 없는 댓글은 내용이 같은 행이 이미 있으면 그만큼 건너뜀)
+"""
+import sys
+import os
+import json
+import glob
+from collections import Counter
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from config import settings
+from services.serializers import decode
+from services.sqlite_db import get_connection, dumps, row_key
+
+
+def _load_json(path: str, key: str) -> list:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get(key, [])
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"⚠️  {path} 파일을 읽을 수 없습니다: {e}")
+        return []
+
+
+def _load_comments(path: str) -> list:
+    """댓글 파일 읽기 (STORAGE_FORMAT으로 저장한 msgpack/records 형식도 자동 감지)"""
+    try:
+        with open(path, 'rb') as f:
+            return decode(f.read())[0].get("comments", [])
+    except (FileNotFoundError, ValueError) as e:
+        print(f"⚠️  {path} 파일을 읽을 수 없습니다: {e}")
+        return []
+
+
+def _account_id_from_file(path: str) -> str:
+    """comments.json → default, comments_{account_id}.json → account_id"""
+    name = os.path.splitext(os.path.basename(path))[0]
+    if name == os.path.splitext(settings.comments_file)[0]:
+        return "default"
+    return name[len("comments_"):]
+
+
+def migrate(data_dir: str, db_file: str):
+    """JSON 파일 → SQLite DB 일괄 이전"""
+    conn = get_connection(db_file)
+
+    accounts = _load_json(os.path.join(data_dir, "accounts.json"), "accounts")
+    conn.execute("BEGIN")
+    for account in accounts:
+        conn.execute(
+            "INSERT OR IGNORE INTO accounts (id, user_id, username, data) VALUES (?, ?, ?, ?)",
+            (account["id"], account.get("user_id"), account.get("username"), dumps(account)),
+        )
+    conn.execute("COMMIT")
+    print(f"✅ 계정 {len(accounts)}개 처리")
+
+    comment_files = [os.path.join(data_dir, settings.comments_file)]
+    comment_files += sorted(glob.glob(os.path.join(data_dir, "comments_*.json")))
+    for path in comment_files:
+        if not os.path.exists(path):
+            continue
+        account_id = _account_id_from_file(path)
+        comments = _load_comments(path)
+        conn.execute("BEGIN")
+        inserted = 0
+        # ID가 없는 댓글: 내용 → (이번 실행 전에 DB에 있던 행 수, 파일에서 지금까지 나온 횟수)
+        # INSERT OR IGNORE로는 걸러지지 않으므로, 같은 내용이 파일에 나온 횟수만큼만 DB에 있도록 함
+        existing: dict = {}
+        seen: Counter = Counter()
+        for comment in comments:
+            if not comment.get("id"):
+                data = dumps(comment)
+                if data not in existing:
+                    existing[data] = conn.execute(
+                        "SELECT COUNT(*) FROM comments WHERE account_id = ? AND id = '' AND data = ?",
+                        (account_id, data),
+                    ).fetchone()[0]
+                seen[data] += 1
+                if seen[data] <= existing[data]:
+                    continue
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO comments (account_id, id, post_id, created_at, data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (account_id, *row_key(comment), dumps(comment)),
+            )
+            inserted += cursor.rowcount
+        conn.execute("COMMIT")
+        print(f"✅ {os.path.basename(path)} → 계정 '{account_id}': {inserted}/{len(comments)}개 이전")
+
+    print(f"\n✅ 마이그레이션 완료: {db_file}")
+    print("   .env에 STORAGE_ENGINE=sqlite 를 설정하면 SQLite 저장소를 사용합니다.")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="JSON 저장소 → SQLite 마이그레이션 스크립트")
+    parser.add_argument(
+        "--data-dir",
+        default=settings.data_dir,
+        help=f"JSON 파일이 있는 디렉토리 (기본값: {settings.data_dir})"
+    )
+    parser.add_argument(
+        "--db",
+        default=None,
+        help="대상 SQLite 파일 경로 (기본값: DATA_DIR/SQLITE_FILE)"
+    )
+
+    args = parser.parse_args()
+    migrate(args.data_dir, args.db or os.path.join(args.data_dir, settings.sqlite_file))
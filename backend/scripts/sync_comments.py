@@ -1,80 +1,74 @@
 #!/usr/bin/env python3
 """
 댓글 동기화 스크립트
-주기적으로 Instagram 댓글을 가져와서 저장합니다.
+활성 계정(AccountManager) 전체의 Instagram 댓글을 동시에 가져와서 저장합니다.
+루프 모드에서는 계정별로 새 댓글 속도에 맞춰 간격을 조절하는 스케줄러(services/sync_scheduler.py)를 실행합니다.
 """
 import sys
-import os
-import time
+import asyncio
 from pathlib import Path
 
 # 프로젝트 루트를 Python 경로에 추가
 backend_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_dir))
 
-from services.instagram_client import instagram_client
-from services.storage import storage
+from config import settings
+from services.instagram_client import close_http_pool
+from services.sync_scheduler import SyncScheduler
 
 
-def sync_all_comments(limit: int = 10):
-    """모든 미디어의 댓글 동기화"""
+def _print_status(accounts: list):
+    for account in accounts:
+        if account["last_error"]:
+            print(f"❌ {account['account_id']}: {account['last_error']} ({account['last_duration_ms']}ms)")
+            continue
+        failed = account["backlog"]["failed_media"]
+        print(
+            f"✅ {account['account_id']}: {account['last_synced_count']}개의 댓글 저장 "
+            f"({account['last_duration_ms']}ms{f', 실패한 미디어 {failed}개' if failed else ''})"
+        )
+
+
+async def _sync_all_comments(limit: int = 10, full_history: bool = False, force: bool = False) -> bool:
+    """모든 활성 계정의 댓글을 한 번 동기화"""
     print("댓글 동기화 시작...")
-    
     try:
-        user_id = instagram_client.get_user_id()
-        if not user_id:
-            print("❌ 사용자 ID를 가져올 수 없습니다.")
+        accounts = await SyncScheduler(limit, full_history, force).run_once()
+        if not accounts:
+            print("❌ 동기화할 활성 계정이 없습니다.")
             return False
-        
-        print(f"✅ 사용자 ID: {user_id}")
-        
-        # 미디어 목록 가져오기
-        media_list = instagram_client.get_user_media(user_id, limit)
-        print(f"✅ {len(media_list)}개의 미디어를 찾았습니다.")
-        
-        total_synced = 0
-        for i, media in enumerate(media_list, 1):
-            media_id = media.get("id")
-            print(f"\n[{i}/{len(media_list)}] 미디어 ID: {media_id}")
-            
-            # 댓글 가져오기
-            comments = instagram_client.get_media_comments(media_id)
-            print(f"  - {len(comments)}개의 댓글 발견")
-            
-            for comment in comments:
-                comment_data = {
-                    "id": comment.get("id"),
-                    "post_id": media_id,
-                    "text": comment.get("text", ""),
-                    "username": comment.get("username", "unknown"),
-                    "timestamp": comment.get("timestamp"),
-                    "like_count": comment.get("like_count", 0),
-                    "replies": comment.get("replies", {}).get("data", [])
-                }
-                storage.add_comment(comment_data)
-                total_synced += 1
-                print(f"  ✓ 댓글 저장: @{comment_data['username']} - {comment_data['text'][:30]}...")
-        
-        print(f"\n✅ 동기화 완료! 총 {total_synced}개의 댓글을 저장했습니다.")
-        return True
-    
-    except Exception as e:
-        print(f"❌ 오류 발생: {e}")
-        return False
+        _print_status(accounts)
+        return all(not account["last_error"] for account in accounts)
+    finally:
+        await close_http_pool()
+
+
+def sync_all_comments(limit: int = 10, full_history: bool = False, force: bool = False) -> bool:
+    """모든 활성 계정의 댓글 동기화"""
+    return asyncio.run(_sync_all_comments(limit, full_history, force))
+
+
+async def _run_scheduler(scheduler: SyncScheduler):
+    try:
+        await scheduler.run_forever()
+    finally:
+        await close_http_pool()
 
 
-def sync_loop(interval: int = 300):
-    """주기적으로 댓글 동기화 (폴링)"""
-    print(f"댓글 동기화 루프 시작 (간격: {interval}초)")
+def sync_loop(interval: int = 300, limit: int = 10, full_history: bool = False):
+    """계정별 간격을 조절하며 모든 활성 계정을 계속 동기화 (interval은 계정별 첫 간격)"""
+    settings.sync_interval_initial = interval
+    print(
+        f"댓글 동기화 스케줄러 시작 (첫 간격: {interval}초, "
+        f"범위: {settings.sync_interval_min:g}~{settings.sync_interval_max:g}초, "
+        f"동시 계정 수: {settings.sync_scheduler_concurrency})"
+    )
     print("Ctrl+C를 눌러 종료하세요.\n")
     
     try:
-        while True:
-            sync_all_comments()
-            print(f"\n다음 동기화까지 {interval}초 대기...\n")
-            time.sleep(interval)
+        asyncio.run(_run_scheduler(SyncScheduler(limit, full_history)))
     except KeyboardInterrupt:
-        print("\n\n동기화 루프를 종료합니다.")
+        print("\n\n동기화 스케줄러를 종료합니다.")
 
 
 if __name__ == "__main__":
@@ -90,18 +84,28 @@ if __name__ == "__main__":
         "--interval",
         type=int,
         default=300,
-        help="동기화 간격 (초, 기본값: 300)"
+        help="계정별 첫 동기화 간격 (초, 기본값: 300). 이후 새 댓글 속도에 맞춰 자동 조절"
     )
     parser.add_argument(
         "--limit",
         type=int,
         default=10,
-        help="동기화할 최근 미디어 개수 (기본값: 10)"
+        help="계정별로 동기화할 최근 미디어 개수 (기본값: 10)"
+    )
+    parser.add_argument(
+        "--full-history",
+        action="store_true",
+        help="최근 미디어 대신 계정의 전체 미디어와 댓글을 커서를 따라 동기화"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="워터마크를 무시하고 모든 댓글을 다시 가져옴 (기본은 새 댓글만 증분 동기화)"
     )
     
     args = parser.parse_args()
     
     if args.once:
-        sync_all_comments(args.limit)
+        sync_all_comments(args.limit, args.full_history, args.force)
     else:
-        sync_loop(args.interval)
+        sync_loop(args.interval, args.limit, args.full_history)
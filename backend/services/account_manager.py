@@ -1,16 +1,68 @@
 import json
 import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
 from typing import List, Dict, Optional
 from datetime import datetime
 from config import settings
+from services.file_lock import FileLock
+
+
+def next_account_id(account_ids: List[str]) -> str:
+    """
+    새 계정 ID (account_<기존 최대 번호 + 1>)
+    계정 수 + 1을 쓰면 중간 계정을 삭제한 뒤 추가할 때 남아 있는 계정과 ID가 겹치므로 최대 번호를 기준으로 합니다.
+    """
+    numbers = [0]
+    for account_id in account_ids:
+        prefix, _, suffix = (account_id or "").partition("_")
+        if prefix == "account" and suffix.isdigit():
+            numbers.append(int(suffix))
+    return f"account_{max(numbers) + 1}"
+
+
+class _AccountRegistry:
+    """accounts.json의 메모리 인덱스 (id / user_id / username → 계정)"""
+    
+    def __init__(self, data: Dict, signature: Optional[tuple]):
+        self.data = data
+        self.signature = signature
+        self.by_id: Dict[str, Dict] = {}
+        self.by_user_id: Dict[str, Dict] = {}
+        self.by_username: Dict[str, Dict] = {}
+        # 계정 ID → 파일 안의 순서 (같은 조건에 여러 계정이 맞으면 앞선 계정 사용)
+        self.position: Dict[str, int] = {}
+        for position, account in enumerate(data.get("accounts", [])):
+            account_id = account.get("id")
+            if account_id in self.by_id:
+                continue
+            self.by_id[account_id] = account
+            self.position[account_id] = position
+            if account.get("user_id"):
+                self.by_user_id.setdefault(account["user_id"], account)
+            if account.get("username"):
+                self.by_username.setdefault(account["username"], account)
 
 
 class AccountManager:
-    """Instagram 계정 관리 서비스"""
+    """
+    Instagram 계정 관리 서비스
+    계정 목록은 메모리 인덱스로 조회하며, 쓰기 시 바로 갱신하고 다른 프로세스가 파일을 바꾼 경우
+    (최대 RECHECK_INTERVAL초마다 확인하는) 파일 시그니처로 감지해 다시 읽습니다.
+    추가/수정/삭제는 스레드 잠금과 잠금 파일(.lock)을 잡고 최신 파일을 읽어 고쳐 쓰므로 동시에 써도 유실되지 않습니다.
+    """
+    
+    # 파일 변경 여부를 확인하는 최소 간격 (초)
+    RECHECK_INTERVAL = 1.0
     
     def __init__(self):
         self.data_dir = settings.data_dir
         self.accounts_file = os.path.join(self.data_dir, "accounts.json")
+        self._registry: Optional[_AccountRegistry] = None
+        self._checked_at = 0.0
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(self.accounts_file + ".lock")
         self._ensure_accounts_file()
     
     def _ensure_accounts_file(self):
@@ -38,59 +90,106 @@ class AccountManager:
         except (FileNotFoundError, json.JSONDecodeError):
             return {"accounts": []}
     
+    @contextmanager
+    def _write_lock(self):
+        """읽고 고쳐 쓰는 동안 다른 스레드/프로세스의 계정 변경을 막음"""
+        with self._lock:
+            with self._file_lock if settings.storage_file_lock else nullcontext():
+                yield
+    
     def _save_accounts(self, data: Dict):
-        """계정 데이터 저장"""
-        with open(self.accounts_file, 'w', encoding='utf-8') as f:
+        """계정 데이터 저장 (임시 파일에 쓴 뒤 교체) 후 메모리 인덱스 갱신"""
+        # 임시 파일 이름에 PID를 넣어 다른 프로세스의 임시 파일과 겹치지 않게 함
+        tmp_file = f"{self.accounts_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.accounts_file)
+        with self._lock:
+            self._registry = _AccountRegistry(data, self._file_signature())
+            self._checked_at = time.monotonic()
+    
+    def _file_signature(self) -> Optional[tuple]:
+        """파일 변경 감지용 (inode, 수정 시각, 크기)"""
+        try:
+            stat = os.stat(self.accounts_file)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    
+    def _get_registry(self) -> _AccountRegistry:
+        """메모리 인덱스 반환 (처음이거나 파일이 외부에서 바뀌었으면 다시 읽음)"""
+        with self._lock:
+            now = time.monotonic()
+            if self._registry is None or now - self._checked_at >= self.RECHECK_INTERVAL:
+                signature = self._file_signature()
+                if self._registry is None or self._registry.signature != signature:
+                    self._registry = _AccountRegistry(self._load_accounts(), signature)
+                self._checked_at = now
+            return self._registry
     
     def get_all_accounts(self) -> List[Dict]:
-        """모든 계정 조회"""
-        data = self._load_accounts()
-        return data.get("accounts", [])
+        """모든 계정 조회 (호출자가 수정해도 캐시에 영향이 없도록 복사본 반환)"""
+        return [dict(account) for account in self._get_registry().data.get("accounts", [])]
     
     def get_account(self, account_id: str) -> Optional[Dict]:
         """특정 계정 조회"""
-        accounts = self.get_all_accounts()
-        for account in accounts:
-            if account.get("id") == account_id:
-                return account
-        return None
+        account = self._get_registry().by_id.get(account_id)
+        return dict(account) if account else None
+    
+    def find_account(self, user_id: Optional[str] = None, username: Optional[str] = None) -> Optional[Dict]:
+        """Instagram user_id 또는 username이 일치하는 계정 조회 (둘 다 맞으면 목록에서 앞선 계정)"""
+        registry = self._get_registry()
+        matches = [
+            account for account in (
+                registry.by_user_id.get(user_id) if user_id else None,
+                registry.by_username.get(username) if username else None,
+            ) if account
+        ]
+        if not matches:
+            return None
+        return dict(min(matches, key=lambda account: registry.position[account.get("id")]))
     
     def add_account(self, name: str, access_token: str, user_id: Optional[str] = None, username: Optional[str] = None) -> Dict:
         """새 계정 추가"""
-        data = self._load_accounts()
-        accounts = data.get("accounts", [])
-        
-        # 계정 ID 생성
-        account_id = f"account_{len(accounts) + 1}"
-        
-        new_account = {
-            "id": account_id,
-            "name": name,
-            "access_token": access_token,
-            "user_id": user_id,
-            "username": username,
-            "created_at": datetime.utcnow().isoformat() + "Z",
-            "is_active": True
-        }
-        
-        accounts.append(new_account)
-        data["accounts"] = accounts
-        self._save_accounts(data)
+        with self._write_lock():
+            data = self._load_accounts()
+            accounts = data.get("accounts", [])
+            
+            # 계정 ID 생성
+            account_id = next_account_id([a.get("id") for a in accounts])
+            
+            new_account = {
+                "id": account_id,
+                "name": name,
+                "access_token": access_token,
+                "user_id": user_id,
+                "username": username,
+                "created_at": datetime.utcnow().isoformat() + "Z",
+                "is_active": True
+            }
+            
+            accounts.append(new_account)
+            data["accounts"] = accounts
+            self._save_accounts(data)
         
-        return new_account
+        # 메모리 인덱스에 들어간 객체이므로 복사본 반환
+        return dict(new_account)
     
     def update_account(self, account_id: str, updates: Dict) -> Optional[Dict]:
         """계정 정보 업데이트"""
-        data = self._load_accounts()
-        accounts = data.get("accounts", [])
-        
-        for i, account in enumerate(accounts):
-            if account.get("id") == account_id:
-                accounts[i].update(updates)
-                data["accounts"] = accounts
-                self._save_accounts(data)
-                return accounts[i]
+        with self._write_lock():
+            data = self._load_accounts()
+            accounts = data.get("accounts", [])
+            
+            for i, account in enumerate(accounts):
+                if account.get("id") == account_id:
+                    accounts[i].update(updates)
+                    data["accounts"] = accounts
+                    self._save_accounts(data)
+                    # 메모리 인덱스에 들어간 객체이므로 복사본 반환
+                    return dict(accounts[i])
         
         return None
     
@@ -99,16 +198,17 @@ class AccountManager:
         if account_id == "default":
             return False
         
-        data = self._load_accounts()
-        accounts = data.get("accounts", [])
-        
-        original_length = len(accounts)
-        accounts = [a for a in accounts if a.get("id") != account_id]
-        
-        if len(accounts) < original_length:
-            data["accounts"] = accounts
-            self._save_accounts(data)
-            return True
+        with self._write_lock():
+            data = self._load_accounts()
+            accounts = data.get("accounts", [])
+            
+            original_length = len(accounts)
+            accounts = [a for a in accounts if a.get("id") != account_id]
+            
+            if len(accounts) < original_length:
+                data["accounts"] = accounts
+                self._save_accounts(data)
+                return True
         
         return False
     
@@ -118,5 +218,13 @@ class AccountManager:
         return [a for a in accounts if a.get("is_active", True)]
 
 
+def create_account_manager() -> AccountManager:
+    """설정된 저장소 엔진(settings.storage_engine)에 맞는 계정 관리자 생성"""
+    if settings.storage_engine.lower() == "sqlite":
+        from services.sqlite_accounts import SQLiteAccountManager
+        return SQLiteAccountManager()
+    return AccountManager()
+
+
 # 싱글톤 인스턴스
-account_manager = AccountManager()
+account_manager = create_account_manager()
@@ -0,0 +1,245 @@
+import bisect
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from services.pagination import comment_sort_key
+from services.serializers import _json_dumps_compact, _json_loads
+
+_MAGIC = b"\x89CMTSG1\n"
+# magic, 원본 댓글 파일 시그니처(inode, 수정 시각, 크기), 댓글 수, ID 해시 슬롯 수, 게시물 해시 슬롯 수, 섹션 시작 위치:
+# 오프셋 인덱스(댓글 수 + 1개, 레코드 i는 [offsets[i], offsets[i + 1])), 최신순, 키셋순, 게시물별 최신순, 게시물별 키셋순
+# (레코드 번호 목록), ID 해시 표(해시, 레코드 번호 + 1 — 0이면 빈 슬롯), 게시물 해시 표(해시, 댓글 수, 정렬 목록 시작 위치)
+_HEADER = struct.Struct("<8sQqQQQQ10Q")
+_OFFSET = struct.Struct("<Q")
+_U32 = struct.Struct("<I")
+
+
+def _hash(key: str) -> int:
+    """프로세스와 관계없이 같은 값이 나오는 32비트 해시 (충돌은 찾은 레코드를 디코딩해 확인)"""
+    return zlib.crc32(key.encode("utf-8"))
+
+
+def _slot_count(count: int) -> int:
+    """해시 표 크기: 항목 수의 2배 이상인 2의 거듭제곱 (채움 비율 50% 이하)"""
+    slots = 2
+    while slots < count * 2:
+        slots <<= 1
+    return slots
+
+
+def _column(typecode: str, values) -> bytes:
+    """고정 폭 리틀 엔디언 열"""
+    column = array(typecode, values)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column.tobytes()
+
+
+def _hash_table(keys: List[str], columns: List[List[int]], slots: int) -> List[array]:
+    """
+    선형 탐사 해시 표 → [해시 열, 값 열...]
+    첫 번째 값 열로 빈 슬롯을 구분하므로 그 값은 0이 아니어야 합니다.
+    """
+    table = [array("I", bytes(4 * slots)) for _ in range(len(columns) + 1)]
+    hashes, occupied = table[0], table[1]
+    mask = slots - 1
+    for i, key in enumerate(keys):
+        h = _hash(key)
+        slot = h & mask
+        while occupied[slot]:
+            slot = (slot + 1) & mask
+        hashes[slot] = h
+        for column, values in zip(table[1:], columns):
+            column[slot] = values[i]
+    return table
+
+
+def write_segment(path: str, comments: List[Dict], source_signature: tuple):
+    """
+    댓글 목록으로 읽기 전용 세그먼트 파일을 만듦 (임시 파일에 쓴 뒤 원자적으로 교체)
+    source_signature는 세그먼트를 만든 원본 댓글 파일의 시그니처로, 원본이 바뀌었는지 확인하는 데 씁니다.
+    """
+    count = len(comments)
+    records = []
+    created = []
+    keys = []
+    # 게시물별 레코드 번호 (저장 순서), 첫 번째 ID의 레코드 번호 (중복 ID는 json 엔진과 같이 첫 번째 댓글)
+    groups: Dict[str, List[int]] = {}
+    first_ids: Dict[str, int] = {}
+    for i, comment in enumerate(comments):
+        records.append(_json_dumps_compact(comment))
+        created.append(comment.get("created_at", ""))
+        keys.append(comment_sort_key(comment))
+        post_id = comment.get("post_id")
+        if isinstance(post_id, str) and post_id:
+            groups.setdefault(post_id, []).append(i)
+        comment_id = comment.get("id")
+        if isinstance(comment_id, str) and comment_id:
+            first_ids.setdefault(comment_id, i)
+
+    # json 엔진의 정렬과 같은 키, 같은 안정 정렬
+    recent = sorted(range(count), key=created.__getitem__, reverse=True)
+    keyset = sorted(range(count), key=keys.__getitem__)
+    post_recent: List[int] = []
+    post_keyset: List[int] = []
+    post_starts = []
+    for members in groups.values():
+        post_starts.append(len(post_recent))
+        post_recent.extend(sorted(members, key=created.__getitem__, reverse=True))
+        post_keyset.extend(sorted(members, key=keys.__getitem__))
+
+    id_slots = _slot_count(len(first_ids))
+    id_table = _hash_table(list(first_ids), [[i + 1 for i in first_ids.values()]], id_slots)
+    post_slots = _slot_count(len(groups))
+    post_counts = [len(members) for members in groups.values()]
+    post_table = _hash_table(list(groups), [post_counts, post_starts], post_slots)
+
+    offsets = [_HEADER.size]
+    for record in records:
+        offsets.append(offsets[-1] + len(record))
+    sections = [
+        _column("Q", offsets),
+        _column("I", recent),
+        _column("I", keyset),
+        _column("I", post_recent),
+        _column("I", post_keyset),
+    ] + [_column("I", column) for column in id_table + post_table]
+    positions = []
+    position = offsets[-1]
+    for section in sections:
+        positions.append(position)
+        position += len(section)
+
+    ino, mtime_ns, size = source_signature
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, ino, mtime_ns, size, count, id_slots, post_slots, *positions))
+        f.write(b"".join(records))
+        for section in sections:
+            f.write(section)
+        f.flush()
+        os.fsync(f.fileno())
+    try:
+        os.replace(tmp_file, path)
+    except OSError:
+        os.remove(tmp_file)
+        raise
+
+
+class _KeyView:
+    """정렬 구간의 (created_at, id) 키를 필요한 위치만 디코딩해 보여주는 시퀀스 (이진 탐색용)"""
+
+    def __init__(self, segment: "ArchiveSegment", order_start: int, count: int):
+        self.segment = segment
+        self.order_start = order_start
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, position: int) -> Tuple[str, str]:
+        return comment_sort_key(self.segment._ordered(self.order_start, position))
+
+
+class ArchiveSegment:
+    """
+    읽기 전용 mmap 댓글 세그먼트
+    댓글마다 공백 없는 JSON 레코드 하나를 두고, 고정 폭 오프셋 인덱스와 정렬 순서(레코드 번호 목록), ID/게시물 해시 표로
+    필요한 레코드만 찾아 디코딩합니다. 파싱한 댓글을 메모리에 두지 않으므로 아카이브 크기와 관계없이 메모리 사용량이
+    일정하고, 파일 내용은 운영체제 페이지 캐시가 관리합니다.
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < _HEADER.size:
+            raise ValueError(f"Truncated archive segment: {path}")
+        (
+            magic, ino, mtime_ns, size, self.count, self._id_slots, self._post_slots,
+            self._offsets, self._recent, self._keyset, self._post_recent, self._post_keyset,
+            self._id_hashes, self._id_numbers, self._post_hashes, self._post_counts, self._post_starts,
+        ) = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC or len(self._mm) != self._post_starts + _U32.size * self._post_slots:
+            raise ValueError(f"Invalid archive segment: {path}")
+        self.source_signature = (ino, mtime_ns, size)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def record(self, number: int) -> Dict:
+        """레코드 번호(저장 순서)의 댓글 디코딩"""
+        (start,) = _OFFSET.unpack_from(self._mm, self._offsets + _OFFSET.size * number)
+        (end,) = _OFFSET.unpack_from(self._mm, self._offsets + _OFFSET.size * (number + 1))
+        return _json_loads(self._mm[start:end])
+
+    def _u32(self, column: int, position: int) -> int:
+        return _U32.unpack_from(self._mm, column + _U32.size * position)[0]
+
+    def _ordered(self, order_start: int, position: int) -> Dict:
+        """정렬 순서 목록의 position번째 댓글"""
+        return self.record(self._u32(order_start, position))
+
+    def __iter__(self) -> Iterator[Dict]:
+        """저장 순서대로 하나씩 디코딩"""
+        for number in range(self.count):
+            yield self.record(number)
+
+    def get(self, comment_id: str) -> Optional[Dict]:
+        """ID로 댓글 조회 (해시 표에서 찾은 레코드 하나만 디코딩)"""
+        h = _hash(comment_id)
+        mask = self._id_slots - 1
+        slot = h & mask
+        while True:
+            number = self._u32(self._id_numbers, slot)
+            if not number:
+                return None
+            if self._u32(self._id_hashes, slot) == h:
+                comment = self.record(number - 1)
+                if comment.get("id") == comment_id:
+                    return comment
+            slot = (slot + 1) & mask
+
+    def _post_range(self, post_id: str) -> Tuple[int, int]:
+        """게시물의 정렬 목록 구간 (시작 위치, 댓글 수)"""
+        h = _hash(post_id)
+        mask = self._post_slots - 1
+        slot = h & mask
+        while True:
+            count = self._u32(self._post_counts, slot)
+            if not count:
+                return 0, 0
+            if self._u32(self._post_hashes, slot) == h:
+                start = self._u32(self._post_starts, slot)
+                if self._ordered(self._post_recent, start).get("post_id") == post_id:
+                    return start, count
+            slot = (slot + 1) & mask
+
+    def _view(self, post_id: Optional[str], keyset: bool) -> Tuple[int, int]:
+        """(정렬 목록 시작 위치, 댓글 수) — post_id가 없으면 전체 목록"""
+        if not post_id:
+            return (self._keyset if keyset else self._recent), self.count
+        start, count = self._post_range(post_id)
+        order = self._post_keyset if keyset else self._post_recent
+        return order + _U32.size * start, count
+
+    def recent(self, post_id: Optional[str] = None, offset: int = 0, limit: int = 100) -> List[Dict]:
+        """최신순(created_at 내림차순) 목록의 [offset:offset + limit] 구간만 디코딩"""
+        order_start, count = self._view(post_id, keyset=False)
+        return [self._ordered(order_start, i) for i in range(count)[offset:offset + limit]]
+
+    def before(
+        self,
+        post_id: Optional[str] = None,
+        limit: int = 100,
+        after: Optional[Tuple[str, str]] = None
+    ) -> List[Dict]:
+        """키셋 페이지네이션: (created_at, id) 내림차순으로 after 커서 다음 limit개 (키는 이진 탐색 위치만 디코딩)"""
+        order_start, count = self._view(post_id, keyset=True)
+        end = count if after is None else bisect.bisect_left(_KeyView(self, order_start, count), tuple(after), 0, count)
+        start = max(0, end - limit)
+        return [self._ordered(order_start, i) for i in reversed(range(start, end))]
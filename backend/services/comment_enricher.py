@@ -0,0 +1,155 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+from config import settings
+from services.instagram_client import AsyncInstagramClient, async_instagram_client
+from services.rate_limiter import GraphRateLimitError
+
+
+class CommentEnricher:
+    """
+    웹훅 댓글 상세 정보(좋아요 수, 답글) 조회 묶음 처리기
+    - 같은 댓글 ID를 동시에 조회하면 Graph API 호출 하나를 함께 기다림 (in-flight 중복 제거)
+    - 최근 조회 결과를 짧은 TTL의 LRU 캐시에 보관 (Meta의 중복 전송 대응)
+    - 같은 게시물의 댓글은 짧은 시간 창 동안 모아 ids 파라미터로 한 번에 조회 (바이럴 게시물 대응)
+    """
+
+    # ids 파라미터로 한 번에 조회할 수 있는 최대 ID 수
+    MAX_IDS_PER_REQUEST = 50
+
+    def __init__(
+        self,
+        client: Optional[AsyncInstagramClient] = None,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        window: Optional[float] = None
+    ):
+        self.client = client or async_instagram_client
+        self.ttl = settings.enrich_cache_ttl if ttl is None else ttl
+        self.max_entries = max_entries or settings.enrich_cache_size
+        self.window = settings.enrich_window_ms / 1000 if window is None else window
+        # 댓글 ID → (만료 시각, 상세 정보)
+        self._cache: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        # 아래 상태는 이벤트 루프에 묶여 있으므로 루프가 바뀌면 초기화
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # 게시물 ID → 조회 대기 중인 댓글 ID 목록
+        self._buckets: Dict[str, List[str]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._stats = {
+            "cache_hits": 0,
+            "coalesced": 0,
+            "lookups": 0,
+            "api_calls": 0,
+            "failures": 0,
+            "rate_limited": 0,
+        }
+
+    async def get(self, comment_id: str, post_id: Optional[str] = None) -> Optional[Dict]:
+        """댓글 상세 정보 조회 (캐시 → 진행 중인 조회 → 게시물별 묶음 조회 순)"""
+        cached = self._cache_get(comment_id)
+        if cached is not None:
+            self._stats["cache_hits"] += 1
+            return cached
+
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._reset(loop)
+
+        future = self._inflight.get(comment_id)
+        if future is not None:
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["lookups"] += 1
+            future = loop.create_future()
+            self._inflight[comment_id] = future
+            self._schedule(comment_id, post_id or "")
+        # 한 호출자가 취소되어도 같은 결과를 기다리는 다른 호출자에게는 영향이 없도록 shield
+        return await asyncio.shield(future)
+
+    def metrics(self) -> Dict:
+        return {
+            "cache_entries": len(self._cache),
+            "inflight": len(self._inflight),
+            **self._stats,
+        }
+
+    def _reset(self, loop: asyncio.AbstractEventLoop):
+        for timer in self._timers.values():
+            timer.cancel()
+        self._loop = loop
+        self._inflight = {}
+        self._buckets = {}
+        self._timers = {}
+        self._tasks = set()
+
+    # ---------- 캐시 ----------
+
+    def _cache_get(self, comment_id: str) -> Optional[Dict]:
+        entry = self._cache.get(comment_id)
+        if entry is None:
+            return None
+        expires_at, details = entry
+        if expires_at < time.monotonic():
+            del self._cache[comment_id]
+            return None
+        self._cache.move_to_end(comment_id)
+        return details
+
+    def _cache_put(self, comment_id: str, details: Dict):
+        self._cache[comment_id] = (time.monotonic() + self.ttl, details)
+        self._cache.move_to_end(comment_id)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    # ---------- 게시물별 묶음 조회 ----------
+
+    def _schedule(self, comment_id: str, post_key: str):
+        bucket = self._buckets.setdefault(post_key, [])
+        bucket.append(comment_id)
+        if len(bucket) >= self.MAX_IDS_PER_REQUEST:
+            self._flush(post_key)
+        elif post_key not in self._timers:
+            self._timers[post_key] = self._loop.call_later(self.window, self._flush, post_key)
+
+    def _flush(self, post_key: str):
+        timer = self._timers.pop(post_key, None)
+        if timer is not None:
+            timer.cancel()
+        comment_ids = self._buckets.pop(post_key, [])
+        if comment_ids:
+            task = asyncio.ensure_future(self._fetch(comment_ids))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, comment_ids: List[str]):
+        """묶인 댓글 ID를 한 번에 조회하고 기다리는 호출자들에게 결과 전달"""
+        self._stats["api_calls"] += 1
+        details: Dict[str, Dict] = {}
+        try:
+            if len(comment_ids) == 1:
+                detail = await self.client.get_comment(comment_ids[0])
+                if detail:
+                    details[comment_ids[0]] = detail
+            else:
+                details = await self.client.get_comments_by_ids(comment_ids)
+        except GraphRateLimitError as e:
+            # 상세 정보는 보조 정보이므로 웹훅 댓글만 저장하고, 한도 초과는 따로 집계
+            self._stats["rate_limited"] += 1
+            print(f"Comment enrichment rate limited: {e}")
+        finally:
+            for comment_id in comment_ids:
+                detail = details.get(comment_id)
+                if detail:
+                    self._cache_put(comment_id, detail)
+                else:
+                    self._stats["failures"] += 1
+                future = self._inflight.pop(comment_id, None)
+                if future is not None and not future.done():
+                    future.set_result(detail)
+
+
+# 싱글톤 인스턴스
+comment_enricher = CommentEnricher()
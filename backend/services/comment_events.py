@@ -0,0 +1,216 @@
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
+from config import settings
+from services.storage import StorageService, snapshot_comment, storage
+
+
+class CommentEvent:
+    """댓글 변경 이벤트 하나 (created / updated / deleted)"""
+
+    __slots__ = ("seq", "type", "account_id", "post_id", "comment")
+
+    def __init__(self, seq: int, type: str, account_id: str, post_id: Optional[str], comment: Dict):
+        self.seq = seq
+        self.type = type
+        self.account_id = account_id
+        self.post_id = post_id
+        self.comment = comment
+
+
+class Subscriber:
+    """
+    구독자 하나의 버퍼
+    버퍼가 가득 차면(클라이언트가 못 따라오면) 더 쌓지 않고 overflowed로 표시해, 스트림이 reset을 보내고
+    클라이언트가 목록을 다시 불러오게 합니다. 다른 프로세스가 댓글을 바꿨을 때(개별 이벤트 없음)도 같은 방식입니다.
+    """
+
+    def __init__(self, account_id: Optional[str], post_id: Optional[str], buffer_size: int):
+        self.account_id = account_id
+        self.post_id = post_id
+        self.buffer: Deque[CommentEvent] = deque()
+        self.buffer_size = buffer_size
+        self.overflowed = False
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+
+    def matches(self, event: CommentEvent) -> bool:
+        if self.account_id is not None and event.account_id != self.account_id:
+            return False
+        return self.post_id is None or event.post_id == self.post_id
+
+    def push(self, event: CommentEvent):
+        """발행 스레드에서 호출 (이벤트 허브 잠금 안)"""
+        if len(self.buffer) >= self.buffer_size:
+            self.overflowed = True
+        else:
+            self.buffer.append(event)
+        self._wake()
+
+    def reset(self):
+        """목록을 다시 불러와야 함 (이벤트 허브 잠금 안)"""
+        self.overflowed = True
+        self._wake()
+
+    def _wake(self):
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            # 이벤트 루프가 이미 닫힘 (종료 중)
+            pass
+
+    async def wait(self, timeout: float) -> bool:
+        """새 이벤트가 올 때까지 대기 (timeout이 지나면 False)"""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._wakeup.clear()
+
+
+class CommentEventHub:
+    """
+    댓글 변경 이벤트 pub/sub (프로세스 내부)
+    저장소 변경 알림(add_listener)을 받아 웹훅/동기화/API로 저장된 댓글 변경을 구독자에게 전달합니다.
+    최근 comment_stream_history개의 이벤트를 보관해 재연결한 클라이언트가 Last-Event-ID 다음부터 이어 받고,
+    이벤트 ID에는 프로세스 시작 시각이 들어 있어 재시작 전 ID로 재연결하면 reset을 받습니다.
+    다른 프로세스(uvicorn 워커, scripts/sync_comments.py)의 변경은 스트림이 comment_stream_keepalive초마다
+    저장소에 확인하고, 변경이 있으면 그 계정의 구독자에게 reset을 보냅니다.
+    """
+
+    def __init__(self, store: StorageService):
+        self.store = store
+        self._lock = threading.Lock()
+        self._epoch = str(int(time.time() * 1000))
+        self._seq = 0
+        self._history: Deque[CommentEvent] = deque(maxlen=max(1, settings.comment_stream_history))
+        self._subscribers: List[Subscriber] = []
+        store.add_listener(self)
+
+    def event_id(self, event: CommentEvent) -> str:
+        return f"{self._epoch}-{event.seq}"
+
+    def _parse_event_id(self, event_id: Optional[str]) -> Optional[int]:
+        """이 프로세스에서 만든 ID면 순번, 아니면 None"""
+        epoch, _, seq = (event_id or "").partition("-")
+        if epoch != self._epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    # ---------- 저장소 변경 알림 ----------
+
+    def on_comment_changed(self, account_id: str, before: Optional[Dict], after: Optional[Dict]):
+        if after is None:
+            type, comment = "deleted", {"id": before.get("id"), "post_id": before.get("post_id")}
+        else:
+            type, comment = ("created" if before is None else "updated"), snapshot_comment(after)
+        with self._lock:
+            self._seq += 1
+            event = CommentEvent(self._seq, type, account_id, comment.get("post_id"), comment)
+            self._history.append(event)
+            for subscriber in self._subscribers:
+                if subscriber.matches(event):
+                    subscriber.push(event)
+
+    def on_account_reset(self, account_id: Optional[str]):
+        # 다른 프로세스의 변경은 개별 이벤트가 없으므로 해당 계정(None이면 전체)의 구독자에게 reset
+        with self._lock:
+            for subscriber in self._subscribers:
+                if account_id is None or subscriber.account_id is None or subscriber.account_id == account_id:
+                    subscriber.reset()
+
+    # ---------- 구독 ----------
+
+    def subscribe(
+        self,
+        account_id: Optional[str] = None,
+        post_id: Optional[str] = None,
+        last_event_id: Optional[str] = None
+    ) -> Tuple[Subscriber, List[CommentEvent], Optional[str]]:
+        """
+        구독 등록 → (구독자, 다시 보낼 이벤트, reset 이벤트 ID)
+        last_event_id 다음 이벤트가 보관 범위를 벗어났거나 다른 프로세스의 ID면 reset이 필요합니다 (아니면 None).
+        등록과 다시 보낼 이벤트 조회를 같은 잠금 안에서 하므로 빠지거나 중복되는 이벤트가 없습니다.
+        """
+        subscriber = Subscriber(account_id, post_id, max(1, settings.comment_stream_buffer_size))
+        with self._lock:
+            if len(self._subscribers) >= settings.comment_stream_max_subscribers:
+                raise OverflowError("Too many comment stream subscribers")
+            self._subscribers.append(subscriber)
+            if not last_event_id:
+                return subscriber, [], None
+            seq = self._parse_event_id(last_event_id)
+            oldest = self._history[0].seq if self._history else self._seq + 1
+            if seq is None or seq > self._seq or seq + 1 < oldest:
+                return subscriber, [], f"{self._epoch}-{self._seq}"
+            return subscriber, [e for e in self._history if e.seq > seq and subscriber.matches(e)], None
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def drain(self, subscriber: Subscriber) -> Tuple[List[CommentEvent], Optional[str]]:
+        """구독자 버퍼의 이벤트를 꺼냄 → (이벤트, 버퍼가 넘쳤으면 reset 이벤트 ID)"""
+        with self._lock:
+            events = list(subscriber.buffer)
+            subscriber.buffer.clear()
+            reset_id = f"{self._epoch}-{self._seq}" if subscriber.overflowed else None
+            subscriber.overflowed = False
+            return events, reset_id
+
+    async def stream(
+        self,
+        subscriber: Subscriber,
+        replay: List[CommentEvent],
+        reset_id: Optional[str],
+        is_disconnected
+    ) -> AsyncIterator[str]:
+        """
+        Server-Sent Events 스트림 (text/event-stream)
+        - event: comment  data: {"type", "account_id", "comment"}
+        - event: reset    목록을 다시 불러와야 함 (이어 받을 수 없거나 버퍼가 넘침, 다른 프로세스가 댓글을 바꿈)
+        - 이벤트가 없으면 comment_stream_keepalive초마다 주석 줄로 연결 유지
+        """
+        loop = asyncio.get_running_loop()
+        checked_at = time.monotonic()
+        try:
+            yield f"retry: {int(settings.comment_stream_retry_ms)}\n\n"
+            events = replay
+            while True:
+                for event in events:
+                    data = json.dumps(
+                        {"type": event.type, "account_id": event.account_id, "comment": event.comment},
+                        ensure_ascii=False
+                    )
+                    yield f"id: {self.event_id(event)}\nevent: comment\ndata: {data}\n\n"
+                if reset_id:
+                    yield f"id: {reset_id}\nevent: reset\ndata: {{}}\n\n"
+                if not await subscriber.wait(settings.comment_stream_keepalive):
+                    if await is_disconnected():
+                        return
+                    yield ": keepalive\n\n"
+                if time.monotonic() - checked_at >= settings.comment_stream_keepalive:
+                    # 다른 프로세스의 변경 확인 (변경이 있으면 on_account_reset → 이 구독자 reset), 파일 읽기는 스레드에서
+                    checked_at = time.monotonic()
+                    await loop.run_in_executor(None, self.store.check_external_changes, subscriber.account_id)
+                events, reset_id = self.drain(subscriber)
+        finally:
+            self.unsubscribe(subscriber)
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "last_event_id": f"{self._epoch}-{self._seq}",
+                "history": len(self._history),
+            }
+
+
+# 싱글톤 인스턴스
+comment_events = CommentEventHub(storage)
@@ -0,0 +1,33 @@
+import json
+import zlib
+from typing import Dict, Iterable, Iterator
+
+
+# 한 번에 내보내는 NDJSON 묶음 크기 (바이트)
+CHUNK_BYTES = 64 * 1024
+
+
+def iter_ndjson(comments: Iterable[Dict], chunk_bytes: int = CHUNK_BYTES) -> Iterator[bytes]:
+    """댓글을 한 줄에 하나씩 JSON으로 직렬화해 chunk_bytes 단위로 묶어 반환"""
+    buffer = []
+    size = 0
+    for comment in comments:
+        line = (json.dumps(comment, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            yield b"".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def iter_gzip(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """바이트 묶음을 스트리밍 gzip으로 압축 (전체를 메모리에 모으지 않음)"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,380 @@
+import heapq
+import math
+import re
+import threading
+from array import array
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from services.storage import StorageService, storage
+
+
+# 한글(완성형/자모)과 그 외 문자(영문, 숫자 등)를 따로 끊어 토큰화
+_HANGUL = "가-힣ㄱ-ㆎ"
+_TOKEN_RE = re.compile(rf"[{_HANGUL}]+|[^\W{_HANGUL}]+")
+
+
+def _is_hangul(char: str) -> bool:
+    return "가" <= char <= "힣" or "ㄱ" <= char <= "ㆎ"
+
+
+def tokenize(text: Optional[str], bridge: bool = False) -> List[str]:
+    """
+    검색용 토큰 목록
+    한글은 띄어쓰기/조사와 관계없이 찾을 수 있도록 2글자 n-gram(한 글자 단어는 그대로)으로,
+    영문/숫자는 단어 단위로 자릅니다.
+    bridge=True(색인할 때)이면 공백으로 떨어진 한글 단어 사이의 2글자도 넣어
+    "가격 문의"가 "가격문의"로도 검색되게 합니다.
+    """
+    terms = []
+    text = (text or "").lower()
+    previous = None
+    for match in _TOKEN_RE.finditer(text):
+        token = match.group()
+        if _is_hangul(token[0]):
+            if len(token) == 1:
+                terms.append(token)
+            else:
+                terms.extend(token[i:i + 2] for i in range(len(token) - 1))
+            if (
+                bridge
+                and previous is not None
+                and _is_hangul(previous.group()[0])
+                and text[previous.end():match.start()].isspace()
+            ):
+                terms.append(previous.group()[-1] + token[0])
+        else:
+            terms.append(token)
+        previous = match
+    return terms
+
+
+def username_terms(username: Optional[str]) -> Set[str]:
+    """사용자 이름 검색용 토큰 (전체 이름 + ._ 등 구분자로 나눈 조각)"""
+    username = (username or "").lower()
+    if not username:
+        return set()
+    return {username, *(part for part in re.split(r"[\W_]+", username) if part)}
+
+
+# 색인에 넣는 문서 키 = (짧은 본문 7비트 | 문서 번호 25비트) — 키를 바로 비교해 순위를 정함
+_DOC_BITS = 25
+_DOC_MASK = (1 << _DOC_BITS) - 1
+_MAX_LENGTH = 127
+# 검색 결과에서 사용자 이름 일치 문서를 앞에 두기 위한 비트
+_USER_HIT = 1 << 32
+
+
+def _length_norm(length: int) -> float:
+    """본문이 짧을수록(검색어 비중이 클수록) 큰 값 (0~1)"""
+    return 1.0 / (1.0 + math.log1p(length))
+
+
+class _AccountIndex:
+    """
+    계정 하나의 역색인
+    용어 → 문서 키 배열(array)로 저장해 댓글 100만 개에서도 메모리를 적게 쓰고,
+    문서 키에 본문 길이를 넣어 두어 후보마다 점수를 계산하지 않고 상위 문서를 고릅니다.
+    바뀐 댓글은 기존 문서를 삭제 표시한 뒤 새 번호로 다시 색인합니다.
+    """
+
+    def __init__(self):
+        # 문서 번호 → 댓글 ID (삭제된 문서는 None)
+        self.doc_ids: List[Optional[str]] = []
+        # 댓글 ID → 문서 키
+        self.by_id: Dict[str, int] = {}
+        self.text: Dict[str, array] = {}
+        self.user: Dict[str, array] = {}
+        # 삭제 표시된 문서 키
+        self.dead: Set[int] = set()
+
+    def add(self, comment: Dict):
+        comment_id = comment.get("id")
+        if not comment_id:
+            return
+        self.remove(comment_id)
+        if len(self.doc_ids) > _DOC_MASK:
+            self.compact()
+            if len(self.doc_ids) > _DOC_MASK:
+                raise OverflowError("Too many comments in one search index")
+
+        terms = tokenize(comment.get("text"), bridge=True)
+        key = ((_MAX_LENGTH - min(len(terms), _MAX_LENGTH)) << _DOC_BITS) | len(self.doc_ids)
+        self.by_id[comment_id] = key
+        self.doc_ids.append(comment_id)
+        for postings_map, doc_terms in ((self.text, set(terms)), (self.user, username_terms(comment.get("username")))):
+            for term in doc_terms:
+                postings = postings_map.get(term)
+                if postings is None:
+                    postings = postings_map[term] = array("I")
+                postings.append(key)
+
+    def remove(self, comment_id: Optional[str]):
+        key = self.by_id.pop(comment_id, None) if comment_id else None
+        if key is not None:
+            self.doc_ids[key & _DOC_MASK] = None
+            self.dead.add(key)
+
+    def needs_compaction(self, min_dead: int) -> bool:
+        return len(self.dead) >= min_dead and len(self.dead) * 2 >= len(self.doc_ids)
+
+    def compact(self):
+        """삭제 표시된 문서를 빼고 문서 번호를 다시 매김"""
+        remap: Dict[int, int] = {}
+        doc_ids = []
+        for comment_id, key in sorted(self.by_id.items(), key=lambda item: item[1] & _DOC_MASK):
+            remap[key] = (key & ~_DOC_MASK) | len(doc_ids)
+            doc_ids.append(comment_id)
+
+        def rewrite(postings_map: Dict[str, array]) -> Dict[str, array]:
+            result = {}
+            for term, postings in postings_map.items():
+                kept = array("I", (remap[key] for key in postings if key in remap))
+                if kept:
+                    result[term] = kept
+            return result
+
+        self.text = rewrite(self.text)
+        self.user = rewrite(self.user)
+        self.by_id = {comment_id: remap[key] for comment_id, key in self.by_id.items()}
+        self.doc_ids = doc_ids
+        self.dead = set()
+
+    @property
+    def size(self) -> int:
+        return len(self.by_id)
+
+    def document_frequency(self, term: str, username_only: bool) -> int:
+        """용어가 들어 있는 문서 수 (삭제 표시 포함 근사값)"""
+        count = len(self.user.get(term, ()))
+        return count if username_only else count + len(self.text.get(term, ()))
+
+    def match(self, terms: List[str], username_only: bool, need: int) -> Tuple[int, List[int]]:
+        """모든 용어가 들어 있는 문서 → (건수, 순위가 높은 문서 키 need개)"""
+        empty = ()
+        sources = []
+        for term in terms:
+            user = self.user.get(term, empty)
+            text = empty if username_only else self.text.get(term, empty)
+            if not user and not text:
+                return 0, []
+            sources.append((len(user) + len(text), user, text))
+        # 문서가 적은 용어부터 교집합 (집합 연산은 C 수준에서 처리됨)
+        sources.sort(key=lambda source: source[0])
+        _, user, text = sources[0]
+        candidates = set(chain(user, text))
+        for _, user, text in sources[1:]:
+            candidates.intersection_update(chain(user, text))
+            if not candidates:
+                return 0, []
+        if self.dead:
+            candidates -= self.dead
+
+        # 사용자 이름에서 찾은 문서가 앞, 그 안에서는 짧은 본문 → 최근에 저장된 순
+        user_hits = candidates.intersection(chain.from_iterable(user for _, user, _ in sources))
+        top = [key | _USER_HIT for key in heapq.nlargest(need, user_hits)]
+        if len(top) < need:
+            top.extend(heapq.nlargest(need - len(top), candidates - user_hits if user_hits else candidates))
+        return len(candidates), top
+
+
+class CommentSearchIndex:
+    """
+    댓글 본문/사용자 이름 역색인 (전체 계정)
+    저장소 변경 알림(add_listener)으로 쓰기와 함께 갱신되고, 계정은 처음 검색할 때 한 번 전체를 읽어 색인합니다.
+    다른 프로세스가 데이터를 바꾸면 해당 계정 색인을 버린 뒤 다시 만듭니다.
+    """
+
+    # 삭제 표시된 문서가 이 수 이상이고 계정 문서의 절반을 넘으면 압축
+    COMPACT_MIN_DEAD = 10000
+
+    def __init__(self, store: Optional[StorageService] = None):
+        self.storage = store
+        self._accounts: Dict[str, _AccountIndex] = {}
+        # 색인 중인 계정 → (그동안 들어온 변경, 완료 이벤트)
+        self._building: Dict[str, Tuple[List, threading.Event]] = {}
+        self._lock = threading.RLock()
+        if store is not None:
+            store.add_listener(self)
+
+    def index_account(self, account_id: str, comments: Iterable[Dict]):
+        """계정 전체를 (다시) 색인"""
+        index = _AccountIndex()
+        for comment in comments:
+            index.add(comment)
+        with self._lock:
+            self._accounts[account_id] = index
+
+    def _apply(self, index: _AccountIndex, before: Optional[Dict], after: Optional[Dict]):
+        if after is None:
+            index.remove(before.get("id"))
+        elif (
+            before is None
+            or before.get("id") != after.get("id")
+            or before.get("text") != after.get("text")
+            or before.get("username") != after.get("username")
+        ):
+            if before is not None and before.get("id") != after.get("id"):
+                index.remove(before.get("id"))
+            index.add(after)
+        else:
+            return
+        if index.needs_compaction(self.COMPACT_MIN_DEAD):
+            index.compact()
+
+    # ---------- 저장소 변경 알림 ----------
+
+    def on_comment_changed(self, account_id: str, before: Optional[Dict], after: Optional[Dict]):
+        with self._lock:
+            building = self._building.get(account_id)
+            if building is not None:
+                # 색인이 끝나면 순서대로 반영
+                building[0].append((before, after))
+                return
+            index = self._accounts.get(account_id)
+            # 아직 색인하지 않은 계정은 처음 검색할 때 전체를 읽어 만듦
+            if index is not None:
+                self._apply(index, before, after)
+
+    def on_account_reset(self, account_id: Optional[str]):
+        with self._lock:
+            if account_id is None:
+                self._accounts.clear()
+            else:
+                self._accounts.pop(account_id, None)
+            # 색인 중이던 계정은 끝난 뒤 다시 만들도록 표시
+            for key, building in self._building.items():
+                if account_id is None or key == account_id:
+                    building[0].append(None)
+
+    # ---------- 검색 ----------
+
+    def _build(self, account_id: str, events: List):
+        """
+        계정 색인 만들기
+        저장소 잠금 안에서는 색인에 필요한 값만 복사하고(쓰기를 오래 막지 않도록) 토큰화는 잠금 밖에서 하며,
+        그 사이의 변경 알림(events)은 모아 두었다가 순서대로 반영합니다.
+        """
+        def snapshot(comments: Iterable[Dict]) -> List[Dict]:
+            fields = [
+                {"id": comment.get("id"), "text": comment.get("text"), "username": comment.get("username")}
+                for comment in comments
+            ]
+            # 여기까지의 변경은 복사본에 이미 들어 있음
+            with self._lock:
+                events.clear()
+            return fields
+
+        while True:
+            index = _AccountIndex()
+            for comment in self.storage.scan_locked(account_id, snapshot):
+                index.add(comment)
+            with self._lock:
+                # None: 색인 중에 다른 프로세스가 데이터를 바꿈 → 다시 읽음
+                if None in events:
+                    continue
+                for before, after in events:
+                    self._apply(index, before, after)
+                # 이후 변경은 바로 색인에 반영되도록 같은 잠금 안에서 교체
+                self._accounts[account_id] = index
+                self._building.pop(account_id, None)
+                return
+
+    def _ensure(self, account_ids: List[str]):
+        """아직 색인하지 않은 계정을 색인 (다른 요청이 색인 중이면 끝날 때까지 기다림)"""
+        if self.storage is None:
+            return
+        for account_id in account_ids:
+            self.storage.check_external_changes(account_id)
+            with self._lock:
+                if account_id in self._accounts:
+                    continue
+                building = self._building.get(account_id)
+                owner = building is None
+                if owner:
+                    building = self._building[account_id] = ([], threading.Event())
+            if not owner:
+                building[1].wait()
+                continue
+            try:
+                self._build(account_id, building[0])
+            finally:
+                with self._lock:
+                    self._building.pop(account_id, None)
+                building[1].set()
+
+    def warm_up(self, account_ids: List[str]):
+        """계정 색인을 미리 만듦 (백그라운드 스레드에서 실행, 실패해도 첫 검색 때 다시 시도)"""
+        def run():
+            for account_id in account_ids:
+                try:
+                    self._ensure([account_id])
+                except Exception as e:
+                    print(f"Search index warm-up failed for {account_id}: {e}")
+
+        threading.Thread(target=run, name="comment-search-warm-up", daemon=True).start()
+
+    def search(
+        self,
+        query: str,
+        account_ids: Optional[List[str]] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Tuple[int, List[Tuple[str, str, float]]]:
+        """
+        모든 검색어가 들어 있는 댓글을 점수순으로 조회 → (전체 건수, [(계정, 댓글 ID, 점수)])
+        - account_ids가 None이면 이미 색인된 모든 계정에서 찾음
+        - "@이름"으로 시작하면 사용자 이름에서만 찾음
+        - 순위: 사용자 이름 일치 → 짧은 본문 → 최근에 저장된 순
+          점수 = 검색어 희소성(idf 합) × (본문 길이 보정 + 사용자 이름 일치 1)
+        """
+        query = query.strip()
+        username_only = query.startswith("@")
+        if username_only:
+            terms = [query[1:].lower()] if query[1:] else []
+        else:
+            terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return 0, []
+
+        if account_ids is not None:
+            self._ensure(account_ids)
+        need = offset + limit
+        with self._lock:
+            indexes = [
+                (account_id, self._accounts[account_id])
+                for account_id in (self._accounts if account_ids is None else account_ids)
+                if account_id in self._accounts
+            ]
+            total_docs = max(1, sum(index.size for _, index in indexes))
+            idf = 0.0
+            for term in terms:
+                frequency = sum(index.document_frequency(term, username_only) for _, index in indexes)
+                idf += math.log(1 + total_docs / max(1, frequency))
+
+            total = 0
+            ranked = []
+            for account_id, index in indexes:
+                count, top = index.match(terms, username_only, need)
+                total += count
+                ranked.extend((key, account_id, index) for key in top)
+            ranked = heapq.nlargest(need, ranked, key=lambda item: item[0])[offset:]
+
+            results = []
+            for key, account_id, index in ranked:
+                length = _MAX_LENGTH - ((key >> _DOC_BITS) & _MAX_LENGTH)
+                weight = _length_norm(length) + (1 if key & _USER_HIT else 0)
+                results.append((account_id, index.doc_ids[key & _DOC_MASK], round(idf * weight, 4)))
+            return total, results
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "accounts": len(self._accounts),
+                "documents": sum(index.size for index in self._accounts.values()),
+                "deleted_documents": sum(len(index.dead) for index in self._accounts.values()),
+                "terms": sum(len(index.text) + len(index.user) for index in self._accounts.values()),
+            }
+
+
+# 싱글톤 인스턴스
+comment_search = CommentSearchIndex(storage)
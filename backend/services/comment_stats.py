@@ -0,0 +1,171 @@
+import bisect
+import heapq
+import threading
+from typing import Dict, Iterable, List, Optional
+from services.storage import StorageService, storage
+
+
+class _RankedCounter:
+    """
+    키별 개수와 개수별 키 묶음을 함께 유지하는 카운터
+    개수가 바뀔 때 O(1)(+ 서로 다른 개수 목록 갱신)로 갱신하고, 상위 k개를 전체 정렬 없이 조회합니다.
+    """
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+        self._buckets: Dict[int, set] = {}
+        # 현재 존재하는 개수 값들 (오름차순)
+        self._levels: List[int] = []
+
+    def add(self, key: str, delta: int):
+        old = self.counts.get(key, 0)
+        new = old + delta
+        if old:
+            bucket = self._buckets[old]
+            bucket.discard(key)
+            if not bucket:
+                del self._buckets[old]
+                del self._levels[bisect.bisect_left(self._levels, old)]
+        if new > 0:
+            self.counts[key] = new
+            if new not in self._buckets:
+                self._buckets[new] = set()
+                bisect.insort(self._levels, new)
+            self._buckets[new].add(key)
+        else:
+            self.counts.pop(key, None)
+
+    def top(self, k: int) -> List[Dict]:
+        """개수가 많은 순으로 k개 (같은 개수는 이름순)"""
+        result = []
+        for level in reversed(self._levels):
+            remaining = k - len(result)
+            if remaining <= 0:
+                break
+            for key in heapq.nsmallest(remaining, self._buckets[level]):
+                result.append({"username": key, "count": level})
+        return result
+
+
+class _AccountStats:
+    """계정 하나의 댓글 집계"""
+
+    def __init__(self):
+        self.total_comments = 0
+        self.total_replies = 0
+        self.unreplied_comments = 0
+        # post_id → {"comments", "replies", "unreplied"}
+        self.posts: Dict[str, Dict[str, int]] = {}
+        self.commenters = _RankedCounter()
+
+    def apply(self, before: Optional[Dict], after: Optional[Dict]):
+        """변경 전 댓글의 기여분을 빼고 변경 후 댓글의 기여분을 더함"""
+        if before is not None:
+            self._add(before, -1)
+        if after is not None:
+            self._add(after, 1)
+
+    def _add(self, comment: Dict, sign: int):
+        replies = len(comment.get("replies") or [])
+        unreplied = 1 if replies == 0 else 0
+        post_id = comment.get("post_id") or ""
+
+        post = self.posts.setdefault(post_id, {"comments": 0, "replies": 0, "unreplied": 0})
+        post["comments"] += sign
+        post["replies"] += sign * replies
+        post["unreplied"] += sign * unreplied
+        if post["comments"] <= 0:
+            del self.posts[post_id]
+
+        self.total_comments += sign
+        self.total_replies += sign * replies
+        self.unreplied_comments += sign * unreplied
+        self.commenters.add(comment.get("username") or "unknown", sign)
+
+
+class CommentStats:
+    """
+    계정별/게시물별 댓글 집계 저장소
+    저장소 변경 알림(add_listener)을 받아 증분으로 갱신하므로 조회 시 댓글 전체를 다시 세지 않습니다.
+    계정 집계는 처음 조회할 때 한 번 전체를 읽어 만들고, 다른 프로세스가 데이터를 바꾸면 버린 뒤 다시 만듭니다.
+    """
+
+    def __init__(self, store: StorageService):
+        self.storage = store
+        self._accounts: Dict[str, _AccountStats] = {}
+        self._lock = threading.Lock()
+        store.add_listener(self)
+
+    # ---------- 저장소 변경 알림 ----------
+
+    def on_comment_changed(self, account_id: str, before: Optional[Dict], after: Optional[Dict]):
+        with self._lock:
+            stats = self._accounts.get(account_id)
+            # 아직 집계하지 않은 계정은 처음 조회할 때 전체를 읽어 만듦
+            if stats is not None:
+                stats.apply(before, after)
+
+    def on_account_reset(self, account_id: Optional[str]):
+        with self._lock:
+            if account_id is None:
+                self._accounts.clear()
+            else:
+                self._accounts.pop(account_id, None)
+
+    # ---------- 조회 ----------
+
+    def _build(self, account_id: str, comments: Iterable[Dict]) -> _AccountStats:
+        stats = _AccountStats()
+        for comment in comments:
+            stats.apply(None, comment)
+        with self._lock:
+            self._accounts[account_id] = stats
+        return stats
+
+    def _ensure(self, account_id: Optional[str]) -> str:
+        """계정 집계가 준비되어 있도록 하고 계정 키 반환"""
+        key = account_id or "default"
+        self.storage.check_external_changes(account_id)
+        with self._lock:
+            if key in self._accounts:
+                return key
+        # 저장소 잠금 안에서 전체를 읽어 만들므로 그 사이의 변경이 빠지거나 중복되지 않음
+        self.storage.scan_locked(account_id, lambda comments: self._build(key, comments))
+        return key
+
+    def account_summary(self, account_id: Optional[str] = None, top: int = 10) -> Dict:
+        """계정 전체 집계 (댓글/답글/미답변 수, 게시물 수, 상위 댓글 작성자)"""
+        key = self._ensure(account_id)
+        with self._lock:
+            stats = self._accounts.get(key) or _AccountStats()
+            return {
+                "account_id": key,
+                "total_comments": stats.total_comments,
+                "total_replies": stats.total_replies,
+                "unreplied_comments": stats.unreplied_comments,
+                "post_count": len(stats.posts),
+                "commenter_count": len(stats.commenters.counts),
+                "top_commenters": stats.commenters.top(top),
+            }
+
+    def post_stats(self, post_id: str, account_id: Optional[str] = None) -> Optional[Dict]:
+        """게시물 하나의 집계 (댓글이 없으면 None)"""
+        key = self._ensure(account_id)
+        with self._lock:
+            stats = self._accounts.get(key)
+            post = stats.posts.get(post_id) if stats else None
+            return {"post_id": post_id, **post} if post else None
+
+    def list_posts(self, account_id: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """댓글이 많은 순으로 게시물별 집계"""
+        key = self._ensure(account_id)
+        with self._lock:
+            stats = self._accounts.get(key)
+            if not stats:
+                return []
+            posts = heapq.nlargest(limit, stats.posts.items(), key=lambda item: item[1]["comments"])
+            return [{"post_id": post_id, **counts} for post_id, counts in posts]
+
+
+# 싱글톤 인스턴스
+comment_stats = CommentStats(storage)
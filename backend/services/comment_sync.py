@@ -0,0 +1,148 @@
+import asyncio
+import time
+import weakref
+from typing import Callable, Dict, List, Optional
+from config import settings
+from services.storage import storage
+from services.sync_state import sync_state
+
+
+# 이벤트 루프별 동시성 제한 세마포어 (키: 계정 ID 또는 프로세스 전체)
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+_PROCESS_KEY = "__process__"
+
+
+def _get_semaphore(key: str, limit: int) -> asyncio.Semaphore:
+    """현재 이벤트 루프에서 key에 해당하는 세마포어 반환 (없으면 생성)"""
+    loop = asyncio.get_running_loop()
+    semaphores = _semaphores.setdefault(loop, {})
+    if key not in semaphores:
+        semaphores[key] = asyncio.Semaphore(max(1, limit))
+    return semaphores[key]
+
+
+def to_comment_data(comment: Dict, media_id: str) -> Dict:
+    """Graph API 댓글 응답을 저장소 댓글 형식으로 변환"""
+    return {
+        "id": comment.get("id"),
+        "post_id": media_id,
+        "text": comment.get("text", ""),
+        "username": comment.get("username", "unknown"),
+        "timestamp": comment.get("timestamp"),
+        "like_count": comment.get("like_count", 0),
+        "replies": comment.get("replies", {}).get("data", [])
+    }
+
+
+async def get_media_list(client, user_id: str, limit: int = 10, full_history: bool = False) -> List[Dict]:
+    """
+    동기화할 미디어 목록 조회 (id, comments_count 포함)
+    - full_history: True면 커서를 따라 계정의 전체 미디어, False면 최근 limit개
+    """
+    if not full_history:
+        return await client.get_user_media(user_id, limit)
+    
+    media_list = []
+    async for page in client.iter_user_media_pages(user_id):
+        media_list.extend(page)
+    return media_list
+
+
+def _is_unchanged(media: Dict, watermark: Optional[Dict]) -> bool:
+    """마지막 동기화 이후 댓글 수가 그대로인 미디어인지 확인"""
+    if not watermark or media.get("comments_count") is None:
+        return False
+    return media["comments_count"] == watermark.get("comments_count")
+
+
+async def sync_media_comments(
+    client,
+    media_list: List[Dict],
+    account_id: Optional[str] = None,
+    on_media_synced: Optional[Callable[[str, int], None]] = None,
+    force: bool = False
+) -> Dict:
+    """
+    여러 미디어의 댓글을 동시에 가져와 저장
+    - 계정별(sync_account_concurrency), 프로세스 전체(sync_process_concurrency) 동시 요청 수를 제한합니다.
+    - 미디어마다 커서를 따라 댓글을 페이지 단위로 가져오며, 페이지가 도착하는 대로 upsert_many로 한 번에 저장합니다.
+    - (계정, 미디어)별 워터마크보다 오래된 댓글에 도달하면 더 이상 페이지를 가져오지 않고,
+      comments_count가 그대로인 미디어는 아예 건너뜁니다. force=True면 워터마크를 무시합니다.
+    - on_media_synced: 미디어 하나의 저장이 끝날 때마다 (media_id, 저장한 댓글 수)로 호출
+    """
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    account_semaphore = _get_semaphore(account_id or "default", settings.sync_account_concurrency)
+    process_semaphore = _get_semaphore(_PROCESS_KEY, settings.sync_process_concurrency)
+
+    async def sync_one(media: Dict):
+        media_id = media.get("id")
+        watermark = None if force else sync_state.get_watermark(account_id, media_id)
+        if _is_unchanged(media, watermark):
+            return media_id, None, "skipped"
+        
+        last_timestamp = (watermark or {}).get("last_timestamp") or ""
+        newest = {"last_timestamp": last_timestamp, "last_id": (watermark or {}).get("last_id")}
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+        try:
+            async with account_semaphore:
+                async with process_semaphore:
+                    async for page in client.iter_media_comment_pages(media_id):
+                        batch = []
+                        reached_watermark = False
+                        for comment in page:
+                            timestamp = comment.get("timestamp") or ""
+                            if timestamp and timestamp < last_timestamp:
+                                # 댓글은 최신순으로 오므로 이후는 모두 이미 받은 댓글
+                                reached_watermark = True
+                                break
+                            batch.append(to_comment_data(comment, media_id))
+                            if timestamp > newest["last_timestamp"]:
+                                newest = {"last_timestamp": timestamp, "last_id": comment.get("id")}
+                        # 페이지 단위로 한 번에 저장 (파일 저장, fsync, 잠금 대기는 이벤트 루프를 막지 않도록 스레드에서 실행)
+                        page_counts = await loop.run_in_executor(None, storage.upsert_many, batch, account_id)
+                        for key, value in page_counts.items():
+                            counts[key] += value
+                        if reached_watermark:
+                            break
+        except Exception as e:
+            # 한 미디어가 실패해도 나머지는 계속 동기화 (이미 저장한 페이지는 유지, 워터마크는 그대로)
+            print(f"Error syncing comments for media {media_id}: {e}")
+            return media_id, counts, "failed"
+        
+        comments_count = media.get("comments_count", (watermark or {}).get("comments_count"))
+        sync_state.set_watermark(account_id, media_id, dict(newest, comments_count=comments_count))
+        return media_id, counts, "synced"
+
+    tasks = [asyncio.create_task(sync_one(media)) for media in media_list]
+    totals = {"inserted": 0, "updated": 0, "unchanged": 0}
+    skipped_media = 0
+    failed_media = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            media_id, counts, status = await next_done
+            for key, value in (counts or {}).items():
+                totals[key] += value
+            if status == "skipped":
+                skipped_media += 1
+            elif status == "failed":
+                failed_media.append(media_id)
+            if on_media_synced:
+                on_media_synced(media_id, (counts or {}).get("inserted", 0) + (counts or {}).get("updated", 0))
+    finally:
+        for task in tasks:
+            task.cancel()
+        await loop.run_in_executor(None, sync_state.save)
+
+    return {
+        # 새로 저장되었거나 내용이 바뀐 댓글 수
+        "synced_count": totals["inserted"] + totals["updated"],
+        **totals,
+        "media_count": len(media_list),
+        "skipped_media": skipped_media,
+        "failed_media": failed_media,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1)
+    }
@@ -0,0 +1,87 @@
+import os
+import struct
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+_GENERATION = struct.Struct("<Q")
+
+
+class FileLock:
+    """
+    프로세스 간 배타 잠금 (잠금 파일에 fcntl.flock, Windows는 msvcrt.locking)
+    잠금 파일 앞 8바이트에는 쓰기 세대 번호를 기록합니다. 데이터 파일을 바꾼 프로세스가 번호를 올리므로,
+    다음에 잠금을 잡은 프로세스는 (inode, 수정 시각, 크기)가 우연히 같아도 캐시가 낡았음을 알 수 있습니다.
+    같은 인스턴스 안에서는 다시 잡을 수 있지만(재진입) 스레드 간 배타는 호출 쪽 잠금에 맡깁니다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.depth = 0
+        self._fd = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """잠금을 잡음 (blocking=False면 다른 프로세스가 잡고 있을 때 기다리지 않고 False 반환)"""
+        if self.depth == 0:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        os.close(fd)
+                        return False
+                else:
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    while True:
+                        try:
+                            # LK_LOCK은 약 10초 동안 재시도한 뒤 실패하므로 잡힐 때까지 반복
+                            msvcrt.locking(fd, msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+                            break
+                        except OSError:
+                            if not blocking:
+                                os.close(fd)
+                                return False
+                            continue
+            except BaseException:
+                os.close(fd)
+                raise
+            self._fd = fd
+        self.depth += 1
+        return True
+
+    def release(self):
+        self.depth -= 1
+        if self.depth == 0:
+            fd, self._fd = self._fd, None
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                else:
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            finally:
+                os.close(fd)
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def read_generation(self) -> int:
+        """잠금을 잡은 상태에서 현재 쓰기 세대 번호 읽기 (잠금 파일이 비어 있으면 0)"""
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        raw = os.read(self._fd, _GENERATION.size)
+        return _GENERATION.unpack(raw)[0] if len(raw) == _GENERATION.size else 0
+
+    def bump_generation(self) -> int:
+        """잠금을 잡은 상태에서 쓰기 세대 번호를 올리고 새 번호 반환"""
+        generation = self.read_generation() + 1
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        os.write(self._fd, _GENERATION.pack(generation))
+        return generation
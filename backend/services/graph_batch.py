@@ -0,0 +1,155 @@
+import asyncio
+import json
+import weakref
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+from config import settings
+from services.rate_limiter import (
+    GraphRateLimitError,
+    PRIORITY_BACKGROUND,
+    THROTTLE_ERROR_CODES,
+    request_with_retry,
+)
+
+
+class GraphBatchError(Exception):
+    """Batch 요청 안의 개별 요청이 실패했을 때 발생"""
+
+    def __init__(self, code: Optional[int], body: Optional[str]):
+        self.code = code
+        self.body = body
+        super().__init__(f"Graph batch sub-request failed (code={code}): {body}")
+
+
+class GraphBatcher:
+    """
+    Graph API Batch 요청 묶음 처리기
+    짧은 시간 창(graph_batch_window_ms) 안에 들어온 GET 요청을 최대 50개씩 하나의 Batch POST로 보내고,
+    응답을 나눠 각 호출자에게 돌려줍니다.
+    Batch는 묶인 요청 중 가장 급한 요청의 우선순위로 호출 예산을 기다립니다.
+    """
+
+    MAX_BATCH_SIZE = 50
+
+    def __init__(
+        self,
+        access_token: str,
+        base_url: str,
+        window: Optional[float] = None,
+        max_batch_size: Optional[int] = None
+    ):
+        self.access_token = access_token
+        self.base_url = base_url
+        self.window = settings.graph_batch_window_ms / 1000 if window is None else window
+        self.max_batch_size = min(max_batch_size or settings.graph_batch_max_size, self.MAX_BATCH_SIZE)
+        # (relative_url, 호출자 우선순위, 결과 future)
+        self._pending: List[Tuple[str, int, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    async def get(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        priority: int = PRIORITY_BACKGROUND
+    ) -> Dict:
+        """GET 요청을 다음 Batch에 추가하고 결과를 기다림"""
+        relative_url = endpoint.lstrip('/')
+        if params:
+            relative_url += "?" + urlencode(params)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((relative_url, priority, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """대기 중인 요청을 Batch 하나로 전송"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            task = asyncio.ensure_future(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: List[Tuple[str, int, asyncio.Future]]):
+        from services.instagram_client import open_http_pool
+
+        payload = [{"method": "GET", "relative_url": relative_url} for relative_url, _, _ in batch]
+        priority = min((priority for _, priority, _ in batch), default=PRIORITY_BACKGROUND)
+        try:
+            client = await open_http_pool()
+            # Meta는 Batch 안의 요청을 각각 한 번의 호출로 계산하므로 묶인 요청 수만큼 예산 사용
+            response = await request_with_retry(
+                self.access_token,
+                lambda: client.post(
+                    f"{self.base_url.rstrip('/')}/",
+                    data={
+                        "access_token": self.access_token,
+                        "batch": json.dumps(payload),
+                        "include_headers": "false"
+                    }
+                ),
+                priority,
+                cost=len(batch)
+            )
+            response.raise_for_status()
+            results = response.json()
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for index, (_, _, future) in enumerate(batch):
+            if future.done():
+                continue
+            item = results[index] if index < len(results) else None
+            if item is None:
+                # 시간 초과 등으로 처리되지 않은 개별 요청
+                future.set_exception(GraphBatchError(None, None))
+            elif item.get("code") != 200:
+                future.set_exception(self._item_error(item))
+            else:
+                try:
+                    future.set_result(json.loads(item.get("body") or "{}"))
+                except json.JSONDecodeError as e:
+                    future.set_exception(e)
+
+
+    @staticmethod
+    def _item_error(item: Dict) -> Exception:
+        """실패한 개별 요청의 예외 (호출 한도 초과는 GraphRateLimitError)"""
+        code, body = item.get("code"), item.get("body")
+        try:
+            error_code = json.loads(body or "{}").get("error", {}).get("code")
+        except (ValueError, AttributeError):
+            error_code = None
+        if code == 429 or error_code in THROTTLE_ERROR_CODES:
+            return GraphRateLimitError(None, body)
+        return GraphBatchError(code, body)
+
+
+# 이벤트 루프별 (access_token, base_url) → GraphBatcher
+_batchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str], GraphBatcher]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_batcher(access_token: str, base_url: str) -> GraphBatcher:
+    """현재 이벤트 루프에서 토큰별로 공유하는 GraphBatcher 반환"""
+    loop = asyncio.get_running_loop()
+    batchers = _batchers.setdefault(loop, {})
+    key = (access_token, base_url)
+    if key not in batchers:
+        batchers[key] = GraphBatcher(access_token, base_url)
+    return batchers[key]
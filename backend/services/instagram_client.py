@@ -1,107 +1,235 @@
+import asyncio
 import httpx
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional
 from config import settings
+from services.graph_batch import get_batcher
+from services.rate_limiter import (
+    GraphRateLimitError,
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    request_with_retry,
+)
 
 
-class InstagramClient:
-    """Instagram Graph API 클라이언트"""
+# 프로세스 전체에서 공유하는 비동기 HTTP 연결 풀 (FastAPI lifespan에서 열고 닫음)
+_http_pool: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    """h2 패키지가 설치되어 있어야 HTTP/2 사용 가능"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+async def open_http_pool() -> httpx.AsyncClient:
+    """공유 연결 풀 생성 (이미 열려 있으면 그대로 반환)"""
+    global _http_pool
+    if _http_pool is None or _http_pool.is_closed:
+        _http_pool = httpx.AsyncClient(
+            http2=settings.http2 and _http2_available(),
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry,
+            ),
+            timeout=settings.http_timeout,
+        )
+    return _http_pool
+
+
+async def close_http_pool():
+    """공유 연결 풀 종료"""
+    global _http_pool
+    if _http_pool is not None:
+        await _http_pool.aclose()
+        _http_pool = None
+
+
+class AsyncInstagramClient:
+    """
+    Instagram Graph API 비동기 클라이언트
+    공유 연결 풀(keep-alive, 가능하면 HTTP/2)을 사용하므로 요청마다 TCP/TLS 연결을 새로 맺지 않고,
+    FastAPI 이벤트 루프를 막지 않습니다.
+    모든 요청은 계정별 호출 예산(rate_limiter)을 거치며, 한도 초과/서버 오류는 백오프 후 재시도합니다.
+    조회 메서드는 호출 한도 초과(GraphRateLimitError)를 빈 결과로 감추지 않고 그대로 전달합니다.
+    """
     
     BASE_URL = "https://graph.instagram.com"
     
     def __init__(self, access_token: Optional[str] = None):
         self.access_token = access_token or settings.instagram_access_token
-        self.base_url = self.BASE_URL
+        self.base_url = settings.graph_api_base_url or self.BASE_URL
     
-    def _make_request(
+    async def _make_request(
         self, 
         method: str, 
         endpoint: str, 
         params: Optional[Dict] = None,
-        data: Optional[Dict] = None
+        data: Optional[Dict] = None,
+        batchable: bool = False,
+        priority: int = PRIORITY_INTERACTIVE
     ) -> Dict:
-        """API 요청 실행"""
+        """
+        API 요청 실행
+        - batchable: Batch 요청이 켜져 있으면 다른 조회 요청과 묶어서 전송
+        - priority: 호출 예산이 부족할 때의 순서 (답글/삭제 등 interactive 요청이 동기화보다 먼저)
+        """
+        if batchable and settings.graph_batch_enabled and method.upper() == "GET":
+            return await get_batcher(self.access_token, self.base_url).get(endpoint, params, priority)
+        
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
         
         request_params = {"access_token": self.access_token}
         if params:
             request_params.update(params)
         
-        with httpx.Client() as client:
-            if method.upper() == "GET":
-                response = client.get(url, params=request_params)
-            elif method.upper() == "POST":
-                response = client.post(url, params=request_params, json=data)
-            elif method.upper() == "DELETE":
-                response = client.delete(url, params=request_params)
-            else:
-                raise ValueError(f"Unsupported method: {method}")
-            
-            response.raise_for_status()
-            return response.json()
+        if method.upper() not in ("GET", "POST", "DELETE"):
+            raise ValueError(f"Unsupported method: {method}")
+        
+        client = await open_http_pool()
+        response = await request_with_retry(
+            self.access_token,
+            lambda: client.request(
+                method.upper(),
+                url,
+                params=request_params,
+                json=data if method.upper() == "POST" else None
+            ),
+            priority,
+            # POST(답글 작성)는 서버 오류 후 재시도하면 중복으로 처리될 수 있음
+            idempotent=method.upper() != "POST"
+        )
+        response.raise_for_status()
+        return response.json()
     
-    def get_media_comments(self, media_id: str) -> List[Dict]:
+    async def get_media_comments(self, media_id: str) -> List[Dict]:
         """미디어의 댓글 목록 조회"""
         try:
-            response = self._make_request("GET", f"{media_id}/comments", {
+            response = await self._make_request("GET", f"{media_id}/comments", {
                 "fields": "id,text,username,timestamp,like_count,replies"
-            })
+            }, batchable=True, priority=PRIORITY_BACKGROUND)
             return response.get("data", [])
+        except GraphRateLimitError:
+            raise
         except Exception as e:
             print(f"Error fetching comments: {e}")
             return []
     
-    def get_comment(self, comment_id: str) -> Optional[Dict]:
+    async def _get_url(self, url: str) -> Dict:
+        """paging.next 처럼 완성된 URL(access_token 포함)로 GET 요청"""
+        client = await open_http_pool()
+        response = await request_with_retry(self.access_token, lambda: client.get(url), PRIORITY_BACKGROUND)
+        response.raise_for_status()
+        return response.json()
+    
+    async def _iter_pages(self, endpoint: str, params: Dict) -> AsyncIterator[List[Dict]]:
+        """
+        커서(paging.next)를 따라가며 페이지 단위로 data 반환
+        현재 페이지를 처리하는 동안 다음 페이지를 미리 요청합니다. 요청 실패 시 예외가 그대로 전달됩니다.
+        """
+        next_page = asyncio.ensure_future(
+            self._make_request("GET", endpoint, params, batchable=True, priority=PRIORITY_BACKGROUND)
+        )
+        try:
+            while next_page is not None:
+                response = await next_page
+                next_url = response.get("paging", {}).get("next")
+                next_page = asyncio.ensure_future(self._get_url(next_url)) if next_url else None
+                yield response.get("data", [])
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+    
+    def iter_media_comment_pages(self, media_id: str, page_size: Optional[int] = None) -> AsyncIterator[List[Dict]]:
+        """미디어의 전체 댓글을 페이지 단위로 조회 (async generator)"""
+        return self._iter_pages(f"{media_id}/comments", {
+            "fields": "id,text,username,timestamp,like_count,replies",
+            "limit": page_size or settings.graph_page_size
+        })
+    
+    def iter_user_media_pages(self, user_id: str, page_size: Optional[int] = None) -> AsyncIterator[List[Dict]]:
+        """사용자의 전체 미디어를 페이지 단위로 조회 (async generator)"""
+        return self._iter_pages(f"{user_id}/media", {
+            "fields": "id,caption,media_type,media_url,permalink,timestamp,thumbnail_url,comments_count",
+            "limit": page_size or settings.graph_page_size
+        })
+    
+    async def get_comment(self, comment_id: str, priority: int = PRIORITY_BACKGROUND) -> Optional[Dict]:
         """특정 댓글 조회"""
         try:
-            response = self._make_request("GET", comment_id, {
+            return await self._make_request("GET", comment_id, {
                 "fields": "id,text,username,timestamp,like_count,replies"
-            })
-            return response
+            }, batchable=True, priority=priority)
+        except GraphRateLimitError:
+            raise
         except Exception as e:
             print(f"Error fetching comment: {e}")
             return None
     
-    def reply_to_comment(self, comment_id: str, message: str) -> Optional[Dict]:
+    async def get_comments_by_ids(
+        self,
+        comment_ids: List[str],
+        priority: int = PRIORITY_BACKGROUND
+    ) -> Dict[str, Dict]:
+        """여러 댓글을 ids 파라미터로 한 번에 조회 (댓글 ID → 상세 정보, 최대 50개)"""
+        try:
+            return await self._make_request("GET", "", {
+                "ids": ",".join(comment_ids),
+                "fields": "id,text,username,timestamp,like_count,replies"
+            }, batchable=True, priority=priority)
+        except GraphRateLimitError:
+            raise
+        except Exception as e:
+            print(f"Error fetching comments by ids: {e}")
+            return {}
+    
+    async def reply_to_comment(self, comment_id: str, message: str) -> Optional[Dict]:
         """댓글에 답글 작성"""
         try:
-            response = self._make_request(
+            return await self._make_request(
                 "POST",
                 f"{comment_id}/replies",
                 data={"message": message}
             )
-            return response
+        except GraphRateLimitError:
+            raise
         except Exception as e:
             print(f"Error replying to comment: {e}")
             return None
     
-    def delete_comment(self, comment_id: str) -> bool:
+    async def delete_comment(self, comment_id: str) -> bool:
         """댓글 삭제"""
         try:
-            self._make_request("DELETE", comment_id)
+            await self._make_request("DELETE", comment_id)
             return True
+        except GraphRateLimitError:
+            raise
         except Exception as e:
             print(f"Error deleting comment: {e}")
             return False
     
-    def get_media_info(self, media_id: str) -> Optional[Dict]:
+    async def get_media_info(self, media_id: str) -> Optional[Dict]:
         """미디어 정보 조회"""
         try:
-            response = self._make_request("GET", media_id, {
+            return await self._make_request("GET", media_id, {
                 "fields": "id,caption,media_type,media_url,permalink,timestamp"
-            })
-            return response
+            }, batchable=True)
+        except GraphRateLimitError:
+            raise
         except Exception as e:
             print(f"Error fetching media info: {e}")
             return None
     
-    def get_user_media(self, user_id: str, limit: int = 25) -> List[Dict]:
+    async def get_user_media(self, user_id: str, limit: int = 25) -> List[Dict]:
         """사용자의 미디어 목록 조회"""
         try:
-            # 여러 필드 조합 시도
-            response = self._make_request("GET", f"{user_id}/media", {
-                "fields": "id,caption,media_type,media_url,permalink,timestamp,thumbnail_url",
+            response = await self._make_request("GET", f"{user_id}/media", {
+                "fields": "id,caption,media_type,media_url,permalink,timestamp,thumbnail_url,comments_count",
                 "limit": limit
-            })
+            }, priority=PRIORITY_BACKGROUND)
             media_list = response.get("data", [])
             
             # 디버깅 정보 출력
@@ -109,26 +237,29 @@ class InstagramClient:
                 print(f"⚠️  미디어가 없습니다. User ID: {user_id}")
                 print(f"   응답: {response}")
                 print(f"   참고: Instagram Graph API는 Business Account로 전환된 이후에 올린 게시물만 가져올 수 있습니다.")
-                print(f"   또한 게시물이 공개 상태여야 하며, 스토리/릴스는 다른 엔드포인트를 사용합니다.")
             
             return media_list
+        except GraphRateLimitError:
+            raise
         except Exception as e:
             print(f"Error fetching user media: {e}")
             import traceback
             traceback.print_exc()
             return []
     
-    def get_user_id(self) -> Optional[str]:
+    async def get_user_id(self) -> Optional[str]:
         """현재 사용자(계정) ID 조회"""
         try:
-            response = self._make_request("GET", "me", {
+            response = await self._make_request("GET", "me", {
                 "fields": "id,username"
-            })
+            }, priority=PRIORITY_BACKGROUND)
             return response.get("id")
+        except GraphRateLimitError:
+            raise
         except Exception as e:
             print(f"Error fetching user ID: {e}")
             return None
 
 
 # 싱글톤 인스턴스
-instagram_client = InstagramClient()
+async_instagram_client = AsyncInstagramClient()
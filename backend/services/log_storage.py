@@ -0,0 +1,385 @@
+import heapq
+import json
+import os
+from typing import Iterator, List, Dict, Optional, Tuple
+from datetime import datetime
+from config import settings
+from services.storage import StorageService, prepare_new_comment, merge_comment, matches_filter
+from services.pagination import comment_sort_key
+
+
+class _LogState:
+    """계정별 로그 파일의 메모리 인덱스 상태"""
+
+    def __init__(self):
+        # 댓글 ID → 최신 레코드의 파일 오프셋 (삽입 순서 유지)
+        self.index: Dict[str, int] = {}
+        # 지금까지 읽은(또는 쓴) 파일 끝 위치
+        self.end_offset = 0
+        # 파일 교체(압축) 감지용 inode
+        self.inode: Optional[int] = None
+        # 로그에 기록된 전체 레코드 수 (삭제/덮어쓴 레코드 포함)
+        self.total_records = 0
+
+    @property
+    def dead_records(self) -> int:
+        return self.total_records - len(self.index)
+
+
+def _index_key(comment_id: Optional[str], offset: int) -> str:
+    """
+    인덱스 키: 댓글 ID (ID가 없는 댓글은 레코드 위치로 만든 키)
+    ID가 없는 댓글을 모두 None 키에 넣으면 마지막 하나만 남아 나머지가 목록에서 빠지므로 레코드마다 따로 둡니다.
+    """
+    return comment_id or f"@{offset}"
+
+
+class LogStorageService(StorageService):
+    """
+    추가 전용(append-only) 로그 기반 저장소 서비스
+    모든 변경을 로그 파일 끝에 한 줄씩 추가하고, 댓글 ID → 파일 오프셋 인덱스를 메모리에 유지합니다.
+    쓰기 비용은 저장된 댓글 수와 무관하게 O(1)이며, 불필요한 레코드가 쌓이면 주기적으로 압축합니다.
+    추가와 압축은 로그 파일의 잠금 파일(.lock)을 잡고 하므로 여러 프로세스가 같은 로그에 써도 레코드가 겹치지 않습니다.
+    """
+
+    def __init__(self):
+        self._states: Dict[str, _LogState] = {}
+        super().__init__()
+
+    def _get_log_file(self, account_id: Optional[str] = None) -> str:
+        """계정별 로그 파일 경로 반환"""
+        return os.path.splitext(self._get_comments_file(account_id))[0] + ".log"
+
+    def _ensure_data_file(self, account_id: Optional[str] = None):
+        """데이터 디렉토리가 없으면 생성 (로그 파일은 첫 쓰기 시 생성)"""
+        os.makedirs(self.data_dir, exist_ok=True)
+
+    def _data_file(self, account_id: Optional[str] = None) -> str:
+        return self._get_log_file(account_id)
+
+    def _invalidate_cache(self, account_id: Optional[str] = None):
+        # 다른 프로세스의 추가분은 _get_state가 end_offset 이후만 이어 읽고, 압축은 inode로 감지하므로
+        # 전체를 다시 읽지 않음
+        pass
+
+    def _migrate_legacy_file(self, account_id: Optional[str], log_file: str):
+        """기존 JSON 파일이 있으면 로그 파일로 변환"""
+        legacy_data = self._read_file(self._get_comments_file(account_id))
+        comments = legacy_data.get("comments", [])
+        tmp_file = f"{log_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'wb') as f:
+            for comment in comments:
+                f.write(self._encode_record({"op": "put", "comment": comment}))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, log_file)
+        self._mark_written(log_file)
+        if comments:
+            print(f"✅ {len(comments)}개의 댓글을 로그 저장소로 변환했습니다: {log_file}")
+
+    @staticmethod
+    def _encode_record(record: Dict) -> bytes:
+        return (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+    def _replay(self, log_file: str, state: _LogState):
+        """state.end_offset 이후의 레코드를 읽어 인덱스에 반영"""
+        with open(log_file, 'rb') as f:
+            f.seek(state.end_offset)
+            offset = state.end_offset
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # 기록 도중 중단된 마지막 줄은 다음 쓰기 때 덮어씀
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # JSONDecodeError 또는 UnicodeDecodeError (잘못된 바이트가 섞인 줄)
+                    print(f"⚠️  손상된 로그 레코드를 건너뜁니다: {log_file} @ {offset}")
+                    offset += len(line)
+                    continue
+                if record.get("op") == "put":
+                    state.index[_index_key(record["comment"].get("id"), offset)] = offset
+                elif record.get("op") == "del":
+                    state.index.pop(record.get("id"), None)
+                state.total_records += 1
+                offset += len(line)
+            state.end_offset = offset
+
+    def _get_state(self, account_id: Optional[str] = None) -> _LogState:
+        """계정의 인덱스 상태를 반환 (필요 시 로드 및 다른 프로세스의 추가분 반영)"""
+        log_file = self._get_log_file(account_id)
+        if not os.path.exists(log_file):
+            with self._write_lock(account_id):
+                # 다른 프로세스가 먼저 변환했을 수 있음
+                if not os.path.exists(log_file):
+                    self._migrate_legacy_file(account_id, log_file)
+
+        stat = os.stat(log_file)
+        state = self._states.get(log_file)
+        external_change = state is not None
+        if state is None or state.inode != stat.st_ino or stat.st_size < state.end_offset:
+            # 처음 로드하거나 파일이 교체된 경우 전체 재구성
+            state = _LogState()
+            state.inode = stat.st_ino
+            self._states[log_file] = state
+        else:
+            external_change = external_change and stat.st_size > state.end_offset
+        if stat.st_size > state.end_offset:
+            self._replay(log_file, state)
+        if external_change:
+            # 다른 프로세스가 추가했거나 압축한 파일
+            self._notify_reset(account_id)
+        return state
+
+    def check_external_changes(self, account_id: Optional[str] = None):
+        """다른 프로세스의 추가/압축을 확인 (변경이 있으면 on_account_reset 알림)"""
+        with self._lock:
+            self._get_state(account_id)
+
+    def _read_record(self, log_file: str, offset: int) -> Dict:
+        with open(log_file, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def _append(self, account_id: Optional[str], record: Dict):
+        """레코드 하나를 로그 끝에 추가"""
+        self._append_many(account_id, [record])
+
+    def _append_many(self, account_id: Optional[str], records: List[Dict]):
+        """레코드들을 한 번의 쓰기로 로그 끝에 추가하고 인덱스 갱신"""
+        if not records:
+            return
+        log_file = self._get_log_file(account_id)
+        state = self._get_state(account_id)
+        encoded = [self._encode_record(record) for record in records]
+        with open(log_file, 'r+b') as f:
+            # 중단된 마지막 줄이 있으면 그 위치부터 덮어씀
+            f.seek(state.end_offset)
+            f.write(b"".join(encoded))
+            f.truncate()
+        self._mark_written(log_file)
+        for record, line in zip(records, encoded):
+            if record["op"] == "put":
+                state.index[_index_key(record["comment"].get("id"), state.end_offset)] = state.end_offset
+            else:
+                state.index.pop(record.get("id"), None)
+            state.end_offset += len(line)
+            state.total_records += 1
+        self._maybe_compact(account_id, state)
+
+    def _maybe_compact(self, account_id: Optional[str], state: _LogState):
+        """불필요한 레코드 비율이 기준을 넘으면 압축"""
+        if state.total_records < settings.log_compaction_min_records:
+            return
+        if state.dead_records / state.total_records < settings.log_compaction_ratio:
+            return
+        self.compact(account_id)
+
+    def compact(self, account_id: Optional[str] = None):
+        """살아있는 레코드만 새 파일에 기록한 뒤 원자적으로 교체"""
+        with self._write_lock(account_id):
+            log_file = self._get_log_file(account_id)
+            state = self._get_state(account_id)
+            tmp_file = f"{log_file}.{os.getpid()}.tmp"
+            new_state = _LogState()
+            with open(log_file, 'rb') as src, open(tmp_file, 'wb') as dst:
+                for key, offset in state.index.items():
+                    src.seek(offset)
+                    line = src.readline()
+                    # ID가 없는 댓글의 키는 새 위치로 바꿈
+                    if key == _index_key(None, offset):
+                        key = _index_key(None, dst.tell())
+                    new_state.index[key] = dst.tell()
+                    dst.write(line)
+                    new_state.total_records += 1
+                dst.flush()
+                os.fsync(dst.fileno())
+                new_state.end_offset = dst.tell()
+            os.replace(tmp_file, log_file)
+            self._mark_written(log_file)
+            new_state.inode = os.stat(log_file).st_ino
+            self._states[log_file] = new_state
+
+    def get_all_comments(self, account_id: Optional[str] = None) -> List[Dict]:
+        """모든 댓글 조회"""
+        with self._lock:
+            log_file = self._get_log_file(account_id)
+            state = self._get_state(account_id)
+            comments = []
+            with open(log_file, 'rb') as f:
+                for offset in state.index.values():
+                    f.seek(offset)
+                    comments.append(json.loads(f.readline())["comment"])
+            return comments
+
+    def list_comments(
+        self,
+        account_id: Optional[str] = None,
+        post_id: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[Dict]:
+        """댓글 목록 조회 (post_id 필터, 최신순 정렬, 페이지네이션)"""
+        comments = self.get_all_comments(account_id)
+        if post_id:
+            comments = [c for c in comments if c.get("post_id") == post_id]
+        comments.sort(key=lambda x: x.get("created_at", ""), reverse=True)
+        return comments[offset:offset + limit]
+    
+    def list_comments_after(
+        self,
+        account_id: Optional[str] = None,
+        post_id: Optional[str] = None,
+        limit: int = 100,
+        after: Optional[Tuple[str, str]] = None
+    ) -> List[Dict]:
+        """키셋 페이지네이션: (created_at, id) 내림차순으로 after 커서 다음 댓글부터 limit개 조회"""
+        comments = self.get_all_comments(account_id)
+        if post_id:
+            comments = [c for c in comments if c.get("post_id") == post_id]
+        if after is not None:
+            after = tuple(after)
+            comments = [c for c in comments if comment_sort_key(c) < after]
+        return heapq.nlargest(limit, comments, key=comment_sort_key)
+    
+    def iter_comments(
+        self,
+        account_id: Optional[str] = None,
+        post_id: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> Iterator[Dict]:
+        """
+        로그 파일을 처음부터 읽으며 최신 레코드(인덱스가 가리키는 위치)만 하나씩 반환
+        잠금 안에서 인덱스를 복사하고 파일을 열어 두므로, 읽는 도중 압축으로 파일이 교체되거나 같은 댓글이
+        다시 기록되어도 열어 둔 파일과 인덱스가 같은 시점을 가리킵니다.
+        """
+        with self._lock:
+            log_file = self._get_log_file(account_id)
+            state = self._get_state(account_id)
+            end_offset = state.end_offset
+            index = dict(state.index)
+            f = open(log_file, 'rb')
+        with f:
+            offset = 0
+            for line in f:
+                if offset >= end_offset:
+                    break
+                record_offset, offset = offset, offset + len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # JSONDecodeError 또는 UnicodeDecodeError (잘못된 바이트가 섞인 줄)
+                    continue
+                if record.get("op") != "put":
+                    continue
+                comment = record["comment"]
+                # 나중에 덮어쓰였거나 삭제된 레코드는 건너뜀
+                if index.get(_index_key(comment.get("id"), record_offset)) != record_offset:
+                    continue
+                if matches_filter(comment, post_id, since, until):
+                    yield comment
+    
+    def get_comment_by_id(self, comment_id: str, account_id: Optional[str] = None) -> Optional[Dict]:
+        """ID로 댓글 조회"""
+        with self._lock:
+            state = self._get_state(account_id)
+            offset = state.index.get(comment_id) if comment_id else None
+            if offset is None:
+                return None
+            comment = self._read_record(self._get_log_file(account_id), offset)["comment"]
+            # ID가 없는 댓글의 위치 키("@오프셋")로는 조회되지 않도록 확인
+            return comment if comment.get("id") == comment_id else None
+
+    def add_comment(self, comment: Dict, account_id: Optional[str] = None) -> Dict:
+        """새 댓글 추가"""
+        with self._write_lock(account_id):
+            # 중복 체크
+            comment_id = comment.get("id")
+            if comment_id:
+                existing = self.get_comment_by_id(comment_id, account_id)
+                if existing:
+                    return existing
+
+            prepare_new_comment(comment)
+            self._append(account_id, {"op": "put", "comment": comment})
+            self._notify(account_id, [(None, comment)])
+            return comment
+
+    def upsert_many(self, comments: List[Dict], account_id: Optional[str] = None) -> Dict[str, int]:
+        """여러 댓글을 한 번에 추가/갱신 (잠금 한 번, 로그 쓰기 한 번)"""
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+        with self._write_lock(account_id):
+            # 같은 배치 안에서 ID가 겹치면 마지막 상태 하나만 기록
+            changed: Dict[str, Dict] = {}
+            anonymous: List[Dict] = []
+            events = []
+            for comment in comments:
+                comment_id = comment.get("id")
+                existing = None
+                if comment_id:
+                    existing = changed.get(comment_id) or self.get_comment_by_id(comment_id, account_id)
+                if existing is None:
+                    prepare_new_comment(comment)
+                    if comment_id:
+                        changed[comment_id] = comment
+                    else:
+                        anonymous.append(comment)
+                    counts["inserted"] += 1
+                    events.append((None, self._snapshot(comment)))
+                else:
+                    before = self._snapshot(existing)
+                    if merge_comment(existing, comment):
+                        changed[comment_id] = existing
+                        counts["updated"] += 1
+                        events.append((before, self._snapshot(existing)))
+                    else:
+                        counts["unchanged"] += 1
+
+            records = [{"op": "put", "comment": c} for c in list(changed.values()) + anonymous]
+            self._append_many(account_id, records)
+            self._notify(account_id, events)
+        return counts
+
+    def update_comment(self, comment_id: str, updates: Dict, account_id: Optional[str] = None) -> Optional[Dict]:
+        """댓글 업데이트"""
+        with self._write_lock(account_id):
+            comment = self.get_comment_by_id(comment_id, account_id)
+            if not comment:
+                return None
+            before = self._snapshot(comment)
+            comment.update(updates)
+            self._append(account_id, {"op": "put", "comment": comment})
+            self._notify(account_id, [(before, comment)])
+            return comment
+
+    def add_reply(self, comment_id: str, reply: Dict, account_id: Optional[str] = None) -> Optional[Dict]:
+        """댓글에 답글 추가"""
+        with self._write_lock(account_id):
+            comment = self.get_comment_by_id(comment_id, account_id)
+            if not comment:
+                return None
+
+            if "replies" not in comment:
+                comment["replies"] = []
+
+            if "created_at" not in reply:
+                reply["created_at"] = datetime.utcnow().isoformat() + "Z"
+
+            before = self._snapshot(comment)
+            comment["replies"].append(reply)
+            self._append(account_id, {"op": "put", "comment": comment})
+            self._notify(account_id, [(before, comment)])
+            return reply
+
+    def delete_comment(self, comment_id: str, account_id: Optional[str] = None) -> bool:
+        """댓글 삭제"""
+        with self._write_lock(account_id):
+            state = self._get_state(account_id)
+            if comment_id not in state.index:
+                return False
+            before = self.get_comment_by_id(comment_id, account_id) if self._listeners else None
+            self._append(account_id, {"op": "del", "id": comment_id})
+            if before is not None:
+                self._notify(account_id, [(before, None)])
+            return True
@@ -0,0 +1,26 @@
+import base64
+import json
+from typing import Dict, Tuple
+
+
+def comment_sort_key(comment: Dict) -> Tuple[str, str]:
+    """키셋 페이지네이션 정렬 키 (created_at, id) — 목록은 이 키의 내림차순"""
+    return (comment.get("created_at") or "", comment.get("id") or "")
+
+
+def encode_cursor(comment: Dict) -> str:
+    """마지막으로 받은 댓글 위치를 불투명한 커서 문자열로 변환"""
+    raw = json.dumps(list(comment_sort_key(comment)), ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """커서 문자열을 (created_at, id)로 변환 (형식이 잘못되면 ValueError)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, comment_id = json.loads(raw.decode("utf-8"))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(created_at, str) or not isinstance(comment_id, str):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return created_at, comment_id
@@ -0,0 +1,259 @@
+import asyncio
+import heapq
+import itertools
+import json
+import random
+import time
+import weakref
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import httpx
+from config import settings
+
+
+# 요청 우선순위 (숫자가 작을수록 먼저 처리)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+# 사용률 헤더를 믿는 시간 (이후에는 다음 응답으로 갱신될 때까지 무시)
+USAGE_STALE_SEC = 60.0
+
+# 호출 한도 초과를 뜻하는 Graph API 오류 코드 (앱/사용자/페이지 한도, 비즈니스 사용 사례 한도)
+THROTTLE_ERROR_CODES = {4, 17, 32, 613} | set(range(80001, 80015))
+
+
+class GraphRateLimitError(Exception):
+    """Graph API 호출 한도에 걸려 재시도 후에도 요청하지 못했을 때 발생"""
+
+    def __init__(self, retry_after: Optional[float] = None, detail: Optional[str] = None):
+        self.retry_after = retry_after
+        self.detail = detail
+        super().__init__(f"Graph API rate limit reached (retry after {retry_after}s): {detail}")
+
+
+def _error_code(response: httpx.Response) -> Optional[int]:
+    try:
+        return response.json().get("error", {}).get("code")
+    except (ValueError, AttributeError):
+        return None
+
+
+def is_throttled(response: httpx.Response) -> bool:
+    """응답이 호출 한도 초과인지 확인 (429 또는 한도 관련 오류 코드)"""
+    if response.status_code == 429:
+        return True
+    return response.status_code in (400, 403) and _error_code(response) in THROTTLE_ERROR_CODES
+
+
+def parse_usage(headers: httpx.Headers) -> Tuple[float, float]:
+    """
+    X-App-Usage / X-Business-Use-Case-Usage 헤더에서 (사용률 %, 접근 회복까지 남은 초) 추출
+    사용률은 call_count, total_time, total_cputime 중 가장 큰 값입니다.
+    """
+    usage = 0.0
+    regain_after = 0.0
+    for name in ("x-app-usage", "x-business-use-case-usage"):
+        raw = headers.get(name)
+        if not raw:
+            continue
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            continue
+        entries: List[Dict] = []
+        if name == "x-app-usage":
+            entries.append(value)
+        else:
+            for items in value.values():
+                entries.extend(items)
+        for entry in entries:
+            usage = max(
+                usage,
+                float(entry.get("call_count", 0)),
+                float(entry.get("total_time", 0)),
+                float(entry.get("total_cputime", 0)),
+            )
+            # 분 단위
+            regain_after = max(regain_after, float(entry.get("estimated_time_to_regain_access", 0)) * 60)
+    return usage, regain_after
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    try:
+        return float(response.headers.get("retry-after", ""))
+    except ValueError:
+        return None
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """지수 백오프 + 지터 (Retry-After가 있으면 그 이상 기다림)"""
+    base = settings.graph_retry_base_ms / 1000
+    cap = settings.graph_retry_max_ms / 1000
+    delay = min(cap, base * (2 ** attempt)) * random.uniform(0.5, 1.0)
+    if retry_after:
+        delay = max(delay, retry_after)
+    return delay
+
+
+class AccountRateLimiter:
+    """
+    액세스 토큰(계정) 하나의 호출 예산 (토큰 버킷)
+    모든 호출자(동기화, 웹훅 상세 조회, 답글, 삭제)가 acquire()로 차례를 받으며,
+    대기 중에는 interactive 요청이 background 요청보다 먼저 처리됩니다.
+    Meta 사용률 헤더가 graph_usage_slowdown_pct를 넘으면 속도를 줄이고, graph_usage_reserve_pct를 넘으면
+    남은 한도는 interactive 요청에만 씁니다.
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[int] = None):
+        self.base_rate = rate or settings.graph_rate_limit_per_sec
+        self.capacity = float(burst or settings.graph_rate_limit_burst)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._usage = 0.0
+        self._usage_at = 0.0
+        # 이 시각까지는 요청을 보내지 않음 (한도 초과 응답 이후)
+        self._blocked_until = 0.0
+        self._waiters: List[Tuple[int, int, float, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def usage(self) -> float:
+        """최근 응답 기준 사용률 (%), 오래된 값은 0으로 취급"""
+        if time.monotonic() - self._usage_at > USAGE_STALE_SEC:
+            return 0.0
+        return self._usage
+
+    @property
+    def rate(self) -> float:
+        """사용률에 따라 조정된 초당 요청 수"""
+        slowdown = settings.graph_usage_slowdown_pct
+        usage = self.usage
+        if usage <= slowdown:
+            return self.base_rate
+        remaining = max(0.0, 100.0 - usage) / max(1.0, 100.0 - slowdown)
+        return max(self.base_rate * 0.05, self.base_rate * remaining)
+
+    async def acquire(self, priority: int = PRIORITY_BACKGROUND, cost: float = 1.0):
+        """호출 차례가 올 때까지 대기"""
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), min(cost, self.capacity), future))
+        self._dispatch()
+        await future
+
+    def observe(self, response: httpx.Response):
+        """응답 헤더의 사용률을 반영"""
+        usage, regain_after = parse_usage(response.headers)
+        if usage or regain_after:
+            self._usage = usage
+            self._usage_at = time.monotonic()
+        if regain_after:
+            self.block(regain_after)
+
+    def block(self, seconds: float):
+        """한도 초과 응답을 받은 경우 seconds 동안 새 요청을 멈춤"""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def metrics(self) -> Dict:
+        return {
+            "usage_pct": self.usage,
+            "rate_per_sec": round(self.rate, 3),
+            "tokens": round(self._tokens, 2),
+            "waiting": len(self._waiters),
+            "blocked_for_sec": round(max(0.0, self._blocked_until - time.monotonic()), 1),
+        }
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        now = time.monotonic()
+        self._refill(now)
+        while self._waiters:
+            priority, _, cost, future = self._waiters[0]
+            if future.done():
+                # 취소된 대기자
+                heapq.heappop(self._waiters)
+                continue
+            if now < self._blocked_until:
+                self._schedule(self._blocked_until - now)
+                return
+            if priority > PRIORITY_INTERACTIVE and self.usage >= settings.graph_usage_reserve_pct:
+                # 남은 한도는 interactive 요청용으로 남겨두고, 사용률이 갱신되거나 떨어질 때까지 대기
+                self._schedule(1.0)
+                return
+            if self._tokens < cost:
+                self._schedule((cost - self._tokens) / self.rate)
+                return
+            heapq.heappop(self._waiters)
+            self._tokens -= cost
+            future.set_result(None)
+
+    def _schedule(self, delay: float):
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+
+async def request_with_retry(
+    access_token: str,
+    send: Callable[[], Awaitable[httpx.Response]],
+    priority: int = PRIORITY_BACKGROUND,
+    cost: float = 1.0,
+    idempotent: bool = True
+) -> httpx.Response:
+    """
+    계정의 호출 예산 안에서 send()를 실행하고, 한도 초과(4xx)와 서버 오류(5xx)는 지수 백오프로 재시도
+    재시도 후에도 한도 초과면 GraphRateLimitError, 서버 오류면 마지막 응답을 그대로 반환합니다.
+    idempotent=False(답글 작성 등 POST)면 서버가 이미 처리했을 수 있는 5xx는 재시도하지 않고,
+    요청이 거절된 한도 초과만 재시도합니다. (중복 답글 방지)
+    """
+    limiter = get_rate_limiter(access_token)
+    attempt = 0
+    while True:
+        await limiter.acquire(priority, cost)
+        response = await send()
+        limiter.observe(response)
+        throttled = is_throttled(response)
+        if not throttled and (response.status_code < 500 or not idempotent):
+            return response
+
+        retry_after = _retry_after(response)
+        delay = backoff_delay(attempt, retry_after)
+        if throttled:
+            # 같은 계정의 다른 호출자도 함께 멈춤
+            limiter.block(delay)
+        if attempt >= settings.graph_max_retries:
+            if throttled:
+                raise GraphRateLimitError(round(retry_after or delay, 1), response.text[:200])
+            return response
+        if not throttled:
+            await asyncio.sleep(delay)
+        attempt += 1
+
+
+# 이벤트 루프별 access_token → AccountRateLimiter
+_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, AccountRateLimiter]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_rate_limiter(access_token: str) -> AccountRateLimiter:
+    """현재 이벤트 루프에서 액세스 토큰에 해당하는 호출 예산 반환"""
+    loop = asyncio.get_running_loop()
+    limiters = _limiters.setdefault(loop, {})
+    limiter = limiters.get(access_token)
+    if limiter is None:
+        limiter = limiters[access_token] = AccountRateLimiter()
+    return limiter
+
+
+def rate_limiter_metrics() -> List[Dict]:
+    """현재 이벤트 루프의 계정별 호출 예산 현황 (토큰은 끝 4자리만 표시)"""
+    limiters = _limiters.get(asyncio.get_running_loop(), {})
+    return [
+        {"token": f"...{access_token[-4:]}", **limiter.metrics()}
+        for access_token, limiter in limiters.items()
+    ]
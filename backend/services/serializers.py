@@ -0,0 +1,184 @@
+import json
+import re
+import struct
+from typing import Dict, List, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+_RECORD_LENGTH = struct.Struct("<I")
+# 들여쓰기한 JSON: 첫 괄호 바로 뒤에 줄바꿈/공백이 옴 (공백 없는 JSON은 문자열 밖에 공백이 없음)
+_PRETTY_JSON = re.compile(rb"\s*[\[{]\s")
+
+
+def _json_loads(raw: bytes):
+    # orjson이 설치되어 있으면 기존 들여쓰기 JSON 파일도 orjson으로 읽음
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _json_dumps_compact(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class Codec:
+    """
+    댓글 파일 직렬화 형식
+    바이너리 형식은 파일 앞에 magic 바이트를 붙여 읽을 때 형식을 자동으로 알아내고,
+    magic이 없는 파일은 JSON(기존 형식)으로 읽습니다.
+    """
+
+    name = ""
+    magic = b""
+    # 같은 계열의 형식은 읽은 결과가 같으므로 읽을 때 설정된 형식으로 다시 저장하지 않음
+    family = ""
+
+    def dumps(self, data: Dict) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, raw: bytes) -> Dict:
+        raise NotImplementedError
+
+
+class PrettyJsonCodec(Codec):
+    """기존 형식: 들여쓰기한 JSON (사람이 읽고 고치기 쉬움)"""
+
+    name = "json"
+    family = "json"
+
+    def dumps(self, data: Dict) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+    def loads(self, raw: bytes) -> Dict:
+        return _json_loads(raw)
+
+
+class CompactJsonCodec(Codec):
+    """공백 없는 JSON (orjson이 설치되어 있으면 orjson 사용)"""
+
+    name = "json-compact"
+    family = "json"
+
+    def dumps(self, data: Dict) -> bytes:
+        return _json_dumps_compact(data)
+
+    def loads(self, raw: bytes) -> Dict:
+        return _json_loads(raw)
+
+
+class MsgpackCodec(Codec):
+    """MessagePack (msgpack 패키지 필요)"""
+
+    name = "msgpack"
+    family = "msgpack"
+    magic = b"\x89CMTMP1\n"
+
+    def dumps(self, data: Dict) -> bytes:
+        return self.magic + msgpack.packb(data, use_bin_type=True)
+
+    def loads(self, raw: bytes) -> Dict:
+        if msgpack is None:
+            raise RuntimeError("msgpack package is required to read this comments file")
+        return msgpack.unpackb(memoryview(raw)[len(self.magic):], raw=False)
+
+
+class RecordCodec(Codec):
+    """
+    길이 접두 레코드 형식: magic 뒤에 [4바이트 길이 + 공백 없는 JSON] 레코드가 이어짐
+    첫 레코드는 "comments"를 뺀 나머지 필드, 이후 댓글 하나당 레코드 하나입니다.
+    레코드 경계를 파싱 없이 알 수 있어 읽을 때는 레코드들을 하나의 JSON 배열로 이어 한 번에 파싱하고,
+    손상된 레코드가 있으면 그 레코드만 건너뜁니다.
+    """
+
+    name = "records"
+    family = "records"
+    magic = b"\x89CMTRC1\n"
+
+    def dumps(self, data: Dict) -> bytes:
+        header = {key: value for key, value in data.items() if key != "comments"}
+        parts = [self.magic]
+        for record in [header] + list(data.get("comments", [])):
+            encoded = _json_dumps_compact(record)
+            parts.append(_RECORD_LENGTH.pack(len(encoded)))
+            parts.append(encoded)
+        return b"".join(parts)
+
+    @classmethod
+    def split_records(cls, raw: bytes) -> List[bytes]:
+        """레코드 바이트 목록 (중간에 잘린 마지막 레코드는 제외)"""
+        view = memoryview(raw)
+        records = []
+        offset = len(cls.magic)
+        end = len(raw)
+        while offset + _RECORD_LENGTH.size <= end:
+            (length,) = _RECORD_LENGTH.unpack_from(view, offset)
+            offset += _RECORD_LENGTH.size
+            if offset + length > end:
+                break
+            records.append(view[offset:offset + length])
+            offset += length
+        return records
+
+    def loads(self, raw: bytes) -> Dict:
+        records = self.split_records(raw)
+        if not records:
+            return {"comments": []}
+        try:
+            header, *comments = _json_loads(b"[" + b",".join(records) + b"]")
+        except ValueError:
+            # 레코드별로 다시 읽음 (헤더 레코드가 손상되었으면 첫 댓글을 헤더로 착각하지 않도록 따로 처리)
+            header = None
+            comments = []
+            for number, record in enumerate(records):
+                try:
+                    value = _json_loads(bytes(record))
+                except ValueError:
+                    continue
+                if number == 0:
+                    header = value
+                else:
+                    comments.append(value)
+        data = dict(header) if isinstance(header, dict) else {}
+        data["comments"] = comments
+        return data
+
+
+CODECS: Dict[str, Codec] = {
+    codec.name: codec for codec in (PrettyJsonCodec(), CompactJsonCodec(), MsgpackCodec(), RecordCodec())
+}
+
+
+def get_codec(name: str) -> Codec:
+    """설정 이름(storage_format)으로 직렬화 형식 반환"""
+    codec = CODECS.get(name.lower())
+    if codec is None:
+        raise ValueError(f"Unsupported storage format: {name}")
+    if codec is CODECS["msgpack"] and msgpack is None:
+        raise RuntimeError("STORAGE_FORMAT=msgpack requires the msgpack package (pip install msgpack)")
+    return codec
+
+
+def detect_codec(raw: bytes) -> Codec:
+    """파일 앞부분의 magic 바이트로 형식을 알아냄 (없으면 JSON, 첫 괄호 뒤 들여쓰기 여부로 두 JSON 형식을 구분)"""
+    for codec in CODECS.values():
+        if codec.magic and raw.startswith(codec.magic):
+            return codec
+    return CODECS["json"] if _PRETTY_JSON.match(raw) else CODECS["json-compact"]
+
+
+def decode(raw: bytes) -> Tuple[Dict, Codec]:
+    """파일 내용을 형식에 맞게 읽음 → (데이터, 형식)"""
+    codec = detect_codec(raw)
+    return codec.loads(raw), codec
@@ -0,0 +1,569 @@
+import bisect
+import hashlib
+import heapq
+import json
+import os
+import re
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from config import settings
+from services.storage import StorageService, _CommentIndex, prepare_new_comment, merge_comment, matches_filter
+from services.pagination import comment_sort_key
+
+# 샤드 파일 이름에 그대로 쓸 수 있는 post_id (그 외에는 해시 사용)
+_SAFE_POST_ID = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+class _ShardManifest:
+    """계정 하나의 샤드 목록(manifest.json)과 댓글 ID → 게시물 인덱스(ids.log)"""
+
+    def __init__(self):
+        # 게시물 키(post_id, 없으면 "") → [샤드 파일 이름, 샤드 안에서 가장 최근 created_at]
+        self.posts: Dict[str, List[str]] = {}
+        # 댓글 ID → 게시물 키 (ID로 찾을 때 처음 읽음, 게시물 단위 조회에는 필요 없음)
+        self.ids: Optional[Dict[str, str]] = None
+        # ids.log에 기록된 레코드 수 (삭제/이동 레코드 포함)와 마지막 완전한 줄의 끝 위치
+        self.id_records = 0
+        self.ids_end = 0
+        # (manifest.json, ids.log) 파일 시그니처 — 다른 프로세스의 변경 감지용
+        self.signature: Optional[tuple] = None
+
+
+class ShardedStorageService(StorageService):
+    """
+    게시물별로 나눈(sharded) JSON 저장소 서비스
+    계정 디렉토리(comments_{account_id}/)에 게시물마다 샤드 파일을 두고, 작은 manifest.json에 게시물별 샤드 파일과
+    가장 최근 created_at을, 추가 전용 ids.log에 댓글 ID → 게시물을 기록합니다.
+    게시물 단위 조회/답글/미디어별 동기화는 그 게시물의 샤드만 읽고 쓰며, 샤드는 처음 접근할 때 읽고
+    캐시 예산(storage_cache_max_mb)을 넘으면 오래 쓰지 않은 샤드부터 비웁니다.
+    게시물 구분 없는 최신순 조회는 최근 댓글이 있는 샤드부터 읽어 한 페이지가 채워지면 멈춥니다.
+    """
+
+    MANIFEST_FILE = "manifest.json"
+    IDS_FILE = "ids.log"
+
+    def __init__(self):
+        # 샤드 디렉토리 → manifest
+        self._manifests: Dict[str, _ShardManifest] = {}
+        super().__init__()
+
+    # ---------- 경로 ----------
+
+    def _get_shard_dir(self, account_id: Optional[str] = None) -> str:
+        """계정별 샤드 디렉토리 경로 (comments_{account_id}.json → comments_{account_id}/)"""
+        return os.path.splitext(self._get_comments_file(account_id))[0]
+
+    def _ensure_data_file(self, account_id: Optional[str] = None):
+        """데이터 디렉토리가 없으면 생성 (샤드 디렉토리는 첫 접근 시 생성)"""
+        os.makedirs(self.data_dir, exist_ok=True)
+
+    def _data_file(self, account_id: Optional[str] = None) -> str:
+        # 잠금 파일은 샤드 디렉토리 옆 (comments_{account_id}.lock)
+        return self._get_shard_dir(account_id)
+
+    @staticmethod
+    def _post_key(comment: Dict) -> str:
+        return comment.get("post_id") or ""
+
+    @staticmethod
+    def _shard_file_name(post_key: str) -> str:
+        if not post_key:
+            return "_unassigned.json"
+        if _SAFE_POST_ID.fullmatch(post_key):
+            return f"post_{post_key}.json"
+        return f"posth_{hashlib.sha1(post_key.encode('utf-8')).hexdigest()[:20]}.json"
+
+    # ---------- manifest ----------
+
+    def _manifest_signature(self, shard_dir: str) -> tuple:
+        return (
+            self._file_signature(os.path.join(shard_dir, self.MANIFEST_FILE)),
+            self._file_signature(os.path.join(shard_dir, self.IDS_FILE)),
+        )
+
+    def _get_manifest(self, account_id: Optional[str] = None) -> _ShardManifest:
+        """계정의 manifest 반환 (필요 시 기존 JSON 파일 변환, 다른 프로세스가 바꿨으면 다시 읽음)"""
+        shard_dir = self._get_shard_dir(account_id)
+        if not os.path.exists(os.path.join(shard_dir, self.MANIFEST_FILE)):
+            with self._write_lock(account_id):
+                # 다른 프로세스가 먼저 변환했을 수 있음
+                if not os.path.exists(os.path.join(shard_dir, self.MANIFEST_FILE)):
+                    self._migrate_legacy_file(account_id, shard_dir)
+
+        signature = self._manifest_signature(shard_dir)
+        manifest = self._manifests.get(shard_dir)
+        if manifest is None or manifest.signature != signature:
+            external_change = manifest is not None
+            manifest = self._read_manifest(shard_dir)
+            manifest.signature = signature
+            self._manifests[shard_dir] = manifest
+            if external_change:
+                # 다른 프로세스가 씀
+                self._notify_reset(account_id)
+        return manifest
+
+    def _read_manifest(self, shard_dir: str) -> _ShardManifest:
+        manifest = _ShardManifest()
+        try:
+            with open(os.path.join(shard_dir, self.MANIFEST_FILE), 'r', encoding='utf-8') as f:
+                manifest.posts = json.load(f).get("posts", {})
+        except (FileNotFoundError, ValueError):
+            pass
+        return manifest
+
+    def _load_ids(self, shard_dir: str, manifest: _ShardManifest) -> Dict[str, str]:
+        """댓글 ID → 게시물 인덱스 (처음 필요할 때 ids.log에서 읽음)"""
+        if manifest.ids is not None:
+            return manifest.ids
+        manifest.ids = {}
+        try:
+            with open(os.path.join(shard_dir, self.IDS_FILE), 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return manifest.ids
+        # 기록 도중 중단된 마지막 줄은 무시 (다음 쓰기 때 덮어씀)
+        raw = raw[:raw.rfind(b"\n") + 1]
+        manifest.ids_end = len(raw)
+        try:
+            # 줄마다 파싱하지 않고 한 번에 JSON 배열로 파싱
+            records = json.loads(b"[" + raw[:-1].replace(b"\n", b",") + b"]") if raw else []
+        except ValueError:
+            # 손상된 줄이 있으면 줄 단위로 읽으며 건너뜀
+            records = []
+            for line in raw.splitlines():
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        for comment_id, post_key in records:
+            if post_key is None:
+                manifest.ids.pop(comment_id, None)
+            else:
+                manifest.ids[comment_id] = post_key
+        manifest.id_records = len(records)
+        return manifest.ids
+
+    def _migrate_legacy_file(self, account_id: Optional[str], shard_dir: str):
+        """기존 계정 JSON 파일이 있으면 게시물별 샤드로 나눠 저장 (없으면 빈 manifest 생성)"""
+        os.makedirs(shard_dir, exist_ok=True)
+        legacy_file = self._get_comments_file(account_id)
+        comments = self._read_file(legacy_file).get("comments", []) if os.path.exists(legacy_file) else []
+        manifest = _ShardManifest()
+        manifest.ids = {}
+        shards: Dict[str, List[Dict]] = {}
+        id_records = []
+        for comment in comments:
+            post_key = self._post_key(comment)
+            shards.setdefault(post_key, []).append(comment)
+            self._touch(manifest, post_key, comment)
+            comment_id = comment.get("id")
+            if comment_id and comment_id not in manifest.ids:
+                manifest.ids[comment_id] = post_key
+                id_records.append((comment_id, post_key))
+        self._manifests[shard_dir] = manifest
+        self._append_ids(shard_dir, manifest, id_records)
+        for post_key, shard_comments in shards.items():
+            self._save_file(os.path.join(shard_dir, manifest.posts[post_key][0]), {"comments": shard_comments})
+        self._write_manifest(shard_dir, manifest)
+        self._mark_written(shard_dir)
+        if comments:
+            print(f"✅ {len(comments)}개의 댓글을 게시물 {len(shards)}개의 샤드로 나눴습니다: {shard_dir}")
+
+    def _touch(self, manifest: _ShardManifest, post_key: str, comment: Dict):
+        """게시물 샤드를 manifest에 등록하고 가장 최근 created_at 갱신"""
+        entry = manifest.posts.get(post_key)
+        if entry is None:
+            entry = manifest.posts[post_key] = [self._shard_file_name(post_key), ""]
+        created_at = comment.get("created_at", "")
+        if created_at > entry[1]:
+            entry[1] = created_at
+
+    def _write_manifest(self, shard_dir: str, manifest: _ShardManifest):
+        manifest_file = os.path.join(shard_dir, self.MANIFEST_FILE)
+        tmp_file = f"{manifest_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({"version": 1, "posts": manifest.posts}, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, manifest_file)
+        manifest.signature = self._manifest_signature(shard_dir)
+
+    def _append_ids(self, shard_dir: str, manifest: _ShardManifest, records: List[Tuple[str, Optional[str]]]):
+        """댓글 ID → 게시물 레코드를 ids.log 끝에 추가 (불필요한 레코드가 많으면 다시 씀)"""
+        ids_file = os.path.join(shard_dir, self.IDS_FILE)
+        self._load_ids(shard_dir, manifest)
+        dead_records = manifest.id_records + len(records) - len(manifest.ids)
+        total_records = manifest.id_records + len(records)
+        if (
+            total_records >= settings.log_compaction_min_records
+            and dead_records / total_records >= settings.log_compaction_ratio
+        ):
+            tmp_file = f"{ids_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(b"".join(self._encode_id(i, p) for i, p in manifest.ids.items()))
+                manifest.ids_end = f.tell()
+            os.replace(tmp_file, ids_file)
+            manifest.id_records = len(manifest.ids)
+            return
+        if not records:
+            return
+        encoded = b"".join(self._encode_id(comment_id, post_key) for comment_id, post_key in records)
+        with open(ids_file, 'ab') as f:
+            # 중단된 마지막 줄이 있으면 그 위치부터 덮어씀
+            f.truncate(manifest.ids_end)
+            f.seek(manifest.ids_end)
+            f.write(encoded)
+        manifest.ids_end += len(encoded)
+        manifest.id_records += len(records)
+
+    @staticmethod
+    def _encode_id(comment_id: str, post_key: Optional[str]) -> bytes:
+        return (json.dumps([comment_id, post_key], ensure_ascii=False) + "\n").encode("utf-8")
+
+    # ---------- 샤드 ----------
+
+    def _get_shard_index(
+        self,
+        account_id: Optional[str],
+        manifest: _ShardManifest,
+        post_key: str
+    ) -> Optional[_CommentIndex]:
+        """게시물 샤드의 메모리 인덱스 (처음 접근할 때 읽음, 샤드가 없으면 None)"""
+        entry = manifest.posts.get(post_key)
+        if entry is None:
+            return None
+        return self._get_file_index(os.path.join(self._get_shard_dir(account_id), entry[0]), account_id)
+
+    def _new_shard_index(self, account_id: Optional[str], manifest: _ShardManifest, post_key: str) -> _CommentIndex:
+        """게시물 샤드 인덱스 (없으면 manifest에 등록하고 빈 샤드 생성)"""
+        if post_key not in manifest.posts:
+            manifest.posts[post_key] = [self._shard_file_name(post_key), ""]
+        return self._get_shard_index(account_id, manifest, post_key)
+
+    def _commit(
+        self,
+        account_id: Optional[str],
+        manifest: _ShardManifest,
+        shards: Dict[str, _CommentIndex],
+        id_records: List[Tuple[str, Optional[str]]]
+    ):
+        """
+        변경을 ids.log → 샤드 → manifest 순서로 기록
+        중간에 중단되어도 ids.log가 가리키는 댓글을 못 찾을 뿐 manifest가 가리키는 샤드는 온전합니다.
+        """
+        shard_dir = self._get_shard_dir(account_id)
+        self._append_ids(shard_dir, manifest, id_records)
+        removed = []
+        for post_key, index in shards.items():
+            shard_file = os.path.join(shard_dir, self._shard_file_name(post_key))
+            if index.data.get("comments"):
+                self._save_file(shard_file, index.data)
+            else:
+                # 댓글이 모두 삭제(이동)된 샤드는 manifest에서 뺀 뒤 파일 삭제
+                manifest.posts.pop(post_key, None)
+                removed.append(shard_file)
+        self._write_manifest(shard_dir, manifest)
+        for shard_file in removed:
+            self._indexes.pop(shard_file, None)
+            self._known_signatures.pop(shard_file, None)
+            try:
+                os.remove(shard_file)
+            except FileNotFoundError:
+                pass
+        self._mark_written(shard_dir)
+
+    def _invalidate_cache(self, account_id: Optional[str] = None):
+        """다른 프로세스가 쓴 계정: manifest와 샤드 캐시를 버리고 on_account_reset 알림 (샤드별 알림은 생략)"""
+        shard_dir = self._get_shard_dir(account_id)
+        self._manifests.pop(shard_dir, None)
+        prefix = shard_dir + os.sep
+        for shard_file in [path for path in self._indexes if path.startswith(prefix)]:
+            del self._indexes[shard_file]
+        for shard_file in [path for path in self._known_signatures if path.startswith(prefix)]:
+            self._known_signatures[shard_file] = None
+        self._notify_reset(account_id)
+
+    def check_external_changes(self, account_id: Optional[str] = None):
+        """다른 프로세스의 변경을 확인 (모든 쓰기가 manifest를 다시 쓰므로 manifest만 확인)"""
+        with self._lock:
+            self._get_manifest(account_id)
+
+    def _relocate(
+        self,
+        account_id: Optional[str],
+        manifest: _ShardManifest,
+        comment: Dict,
+        old_key: str,
+        shards: Dict[str, _CommentIndex],
+        id_records: List
+    ):
+        """post_id가 바뀐 댓글을 새 게시물 샤드로 옮김"""
+        new_key = self._post_key(comment)
+        if new_key == old_key:
+            return
+        old_index = shards[old_key]
+        old_index.data["comments"] = [c for c in old_index.data.get("comments", []) if c is not comment]
+        new_index = shards.get(new_key) or self._new_shard_index(account_id, manifest, new_key)
+        new_index.data.setdefault("comments", []).append(comment)
+        comment_id = comment.get("id")
+        if comment_id:
+            old_index.by_id.pop(comment_id, None)
+            new_index.by_id[comment_id] = comment
+            manifest.ids[comment_id] = new_key
+            id_records.append((comment_id, new_key))
+        self._touch(manifest, new_key, comment)
+        shards[new_key] = new_index
+
+    # ---------- 조회 ----------
+
+    def _merge_shards(
+        self,
+        account_id: Optional[str],
+        need: int,
+        take: Callable[[_CommentIndex], List[Dict]],
+        key: Callable[[Dict], object]
+    ) -> List[Dict]:
+        """
+        게시물 구분 없는 최신순 조회: 최근 created_at이 큰 샤드부터 각 샤드의 앞부분(take)을 합쳐 need개를 모음
+        need개를 모았고 다음 샤드의 가장 최근 댓글이 그보다 오래됐으면 나머지 샤드는 읽지 않습니다.
+        """
+        manifest = self._get_manifest(account_id)
+        parts = []
+        # 지금까지 읽은 댓글 중 가장 최근 need개의 created_at (min-heap)
+        top: List[str] = []
+        for post_key, (_, latest) in sorted(manifest.posts.items(), key=lambda item: item[1][1], reverse=True):
+            if len(top) >= need and top[0] > latest:
+                break
+            part = take(self._get_shard_index(account_id, manifest, post_key))
+            parts.append(part)
+            for comment in part:
+                created_at = comment.get("created_at", "")
+                if len(top) < need:
+                    heapq.heappush(top, created_at)
+                elif created_at > top[0]:
+                    heapq.heapreplace(top, created_at)
+                else:
+                    # part는 최신순이므로 나머지는 더 오래됨
+                    break
+        return list(islice(heapq.merge(*parts, key=key, reverse=True), need))
+
+    def get_all_comments(self, account_id: Optional[str] = None) -> List[Dict]:
+        """모든 댓글 조회 (모든 샤드를 읽음)"""
+        with self._lock:
+            manifest = self._get_manifest(account_id)
+            comments = []
+            for post_key in list(manifest.posts):
+                comments.extend(self._get_shard_index(account_id, manifest, post_key).data.get("comments", []))
+            return comments
+
+    def list_comments(
+        self,
+        account_id: Optional[str] = None,
+        post_id: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[Dict]:
+        """댓글 목록 조회 (post_id가 있으면 그 게시물 샤드만 읽음)"""
+        with self._lock:
+            if post_id:
+                index = self._get_shard_index(account_id, self._get_manifest(account_id), post_id)
+                return index.sorted_comments()[offset:offset + limit] if index else []
+            need = offset + limit
+            comments = self._merge_shards(
+                account_id,
+                need,
+                lambda index: index.sorted_comments()[:need],
+                lambda c: c.get("created_at", ""),
+            )
+            return comments[offset:]
+
+    def list_comments_after(
+        self,
+        account_id: Optional[str] = None,
+        post_id: Optional[str] = None,
+        limit: int = 100,
+        after: Optional[Tuple[str, str]] = None
+    ) -> List[Dict]:
+        """키셋 페이지네이션: (created_at, id) 내림차순으로 after 커서 다음 댓글부터 limit개 조회"""
+
+        def take(index: _CommentIndex) -> List[Dict]:
+            keys, comments = index.keyset_view()
+            end = len(keys) if after is None else bisect.bisect_left(keys, tuple(after))
+            return comments[max(0, end - limit):end][::-1]
+
+        with self._lock:
+            if post_id:
+                index = self._get_shard_index(account_id, self._get_manifest(account_id), post_id)
+                return take(index) if index else []
+            return self._merge_shards(account_id, limit, take, comment_sort_key)
+
+    def iter_comments(
+        self,
+        account_id: Optional[str] = None,
+        post_id: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> Iterator[Dict]:
+        """조건에 맞는 댓글을 샤드(게시물) 순서대로 하나씩 반환 (샤드는 차례로 읽음)"""
+        with self._lock:
+            manifest = self._get_manifest(account_id)
+            post_keys = [post_id] if post_id else list(manifest.posts)
+        for post_key in post_keys:
+            with self._lock:
+                index = self._get_shard_index(account_id, self._get_manifest(account_id), post_key)
+                comments = index.data.get("comments", []) if index else []
+            for comment in comments:
+                if matches_filter(comment, post_id, since, until):
+                    yield comment
+
+    def _find(
+        self,
+        account_id: Optional[str],
+        manifest: _ShardManifest,
+        comment_id: str,
+        shards: Optional[Dict[str, _CommentIndex]] = None
+    ):
+        """
+        댓글 ID → (게시물 키, 샤드 인덱스, 댓글) (없으면 댓글이 None)
+        shards에는 아직 저장하지 않은 변경 중인 샤드를 넘깁니다. 그 사이 캐시에서 제거된 샤드를 디스크에서 다시 읽으면
+        저장 전의 변경이 사라지므로 shards에 있는 인덱스를 먼저 사용합니다.
+        """
+        post_key = self._load_ids(self._get_shard_dir(account_id), manifest).get(comment_id)
+        index = None
+        if post_key is not None:
+            index = (shards or {}).get(post_key) or self._get_shard_index(account_id, manifest, post_key)
+        return post_key, index, index.by_id.get(comment_id) if index else None
+
+    def get_comment_by_id(self, comment_id: str, account_id: Optional[str] = None) -> Optional[Dict]:
+        """ID로 댓글 조회 (ids.log로 찾은 게시물 샤드만 읽음)"""
+        with self._lock:
+            return self._find(account_id, self._get_manifest(account_id), comment_id)[2]
+
+    # ---------- 변경 ----------
+
+    def add_comment(self, comment: Dict, account_id: Optional[str] = None) -> Dict:
+        """새 댓글 추가"""
+        with self._write_lock(account_id):
+            manifest = self._get_manifest(account_id)
+
+            # 중복 체크
+            comment_id = comment.get("id")
+            if comment_id:
+                existing = self._find(account_id, manifest, comment_id)[2]
+                if existing:
+                    return existing
+
+            prepare_new_comment(comment)
+            post_key = self._post_key(comment)
+            index = self._new_shard_index(account_id, manifest, post_key)
+            index.data.setdefault("comments", []).append(comment)
+            id_records = []
+            if comment_id:
+                index.by_id[comment_id] = comment
+                manifest.ids[comment_id] = post_key
+                id_records.append((comment_id, post_key))
+            self._touch(manifest, post_key, comment)
+            self._commit(account_id, manifest, {post_key: index}, id_records)
+            self._notify(account_id, [(None, comment)])
+            return comment
+
+    def upsert_many(self, comments: List[Dict], account_id: Optional[str] = None) -> Dict[str, int]:
+        """
+        여러 댓글을 한 번에 추가/갱신 (잠금 한 번, 바뀐 샤드마다 파일 저장 한 번)
+        미디어별 동기화처럼 한 게시물의 댓글만 오면 그 게시물의 샤드만 씁니다.
+        """
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+        with self._write_lock(account_id):
+            manifest = self._get_manifest(account_id)
+            shards: Dict[str, _CommentIndex] = {}
+            id_records = []
+            events = []
+            for comment in comments:
+                comment_id = comment.get("id")
+                post_key, index, existing = (
+                    self._find(account_id, manifest, comment_id, shards) if comment_id else (None, None, None)
+                )
+                if existing is None:
+                    prepare_new_comment(comment)
+                    post_key = self._post_key(comment)
+                    index = shards.get(post_key) or self._new_shard_index(account_id, manifest, post_key)
+                    index.data.setdefault("comments", []).append(comment)
+                    if comment_id:
+                        index.by_id[comment_id] = comment
+                        manifest.ids[comment_id] = post_key
+                        id_records.append((comment_id, post_key))
+                    self._touch(manifest, post_key, comment)
+                    shards[post_key] = index
+                    counts["inserted"] += 1
+                    events.append((None, self._snapshot(comment)))
+                else:
+                    before = self._snapshot(existing)
+                    if merge_comment(existing, comment):
+                        shards[post_key] = index
+                        self._relocate(account_id, manifest, existing, post_key, shards, id_records)
+                        counts["updated"] += 1
+                        events.append((before, self._snapshot(existing)))
+                    else:
+                        counts["unchanged"] += 1
+
+            if shards:
+                self._commit(account_id, manifest, shards, id_records)
+                self._notify(account_id, events)
+        return counts
+
+    def update_comment(self, comment_id: str, updates: Dict, account_id: Optional[str] = None) -> Optional[Dict]:
+        """댓글 업데이트"""
+        with self._write_lock(account_id):
+            manifest = self._get_manifest(account_id)
+            post_key, index, comment = self._find(account_id, manifest, comment_id)
+            if not comment:
+                return None
+
+            before = self._snapshot(comment)
+            comment.update(updates)
+            shards = {post_key: index}
+            id_records = []
+            self._relocate(account_id, manifest, comment, post_key, shards, id_records)
+            self._touch(manifest, self._post_key(comment), comment)
+            self._commit(account_id, manifest, shards, id_records)
+            self._notify(account_id, [(before, comment)])
+            return comment
+
+    def add_reply(self, comment_id: str, reply: Dict, account_id: Optional[str] = None) -> Optional[Dict]:
+        """댓글에 답글 추가 (댓글이 있는 게시물 샤드만 씀)"""
+        with self._write_lock(account_id):
+            manifest = self._get_manifest(account_id)
+            post_key, index, comment = self._find(account_id, manifest, comment_id)
+            if not comment:
+                return None
+
+            if "replies" not in comment:
+                comment["replies"] = []
+
+            # 답글에 타임스탬프 추가
+            if "created_at" not in reply:
+                reply["created_at"] = datetime.utcnow().isoformat() + "Z"
+
+            before = self._snapshot(comment)
+            comment["replies"].append(reply)
+            self._commit(account_id, manifest, {post_key: index}, [])
+            self._notify(account_id, [(before, comment)])
+            return reply
+
+    def delete_comment(self, comment_id: str, account_id: Optional[str] = None) -> bool:
+        """댓글 삭제"""
+        with self._write_lock(account_id):
+            manifest = self._get_manifest(account_id)
+            post_key, index, comment = self._find(account_id, manifest, comment_id)
+            if not comment:
+                return False
+
+            index.by_id.pop(comment_id, None)
+            comments = index.data.get("comments", [])
+            removed = [c for c in comments if c.get("id") == comment_id]
+            index.data["comments"] = [c for c in comments if c.get("id") != comment_id]
+            manifest.ids.pop(comment_id, None)
+            self._commit(account_id, manifest, {post_key: index}, [(comment_id, None)])
+            self._notify(account_id, [(c, None) for c in removed])
+            return True
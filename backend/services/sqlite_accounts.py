@@ -0,0 +1,97 @@
+import json
+from typing import List, Dict, Optional
+from datetime import datetime
+from config import settings
+from services.account_manager import AccountManager, next_account_id
+from services.sqlite_db import get_connection, get_connection_lock, dumps
+
+
+class SQLiteAccountManager(AccountManager):
+    """SQLite 기반 Instagram 계정 관리 서비스"""
+
+    def __init__(self, db_file: Optional[str] = None):
+        self.data_dir = settings.data_dir
+        self.conn = get_connection(db_file)
+        # 같은 연결을 쓰는 댓글 저장소(SQLiteStorageService)와 공유하는 잠금 (읽기 포함)
+        self._lock = get_connection_lock(db_file)
+        self._ensure_default_account()
+
+    def _ensure_default_account(self):
+        """계정이 하나도 없으면 기본 계정 추가 (기존 .env의 토큰 사용)"""
+        with self._lock:
+            if self.conn.execute("SELECT 1 FROM accounts LIMIT 1").fetchone():
+                return
+            self._save_account({
+                "id": "default",
+                "name": "기본 계정",
+                "access_token": settings.instagram_access_token,
+                "user_id": None,
+                "username": None,
+                "created_at": datetime.utcnow().isoformat() + "Z",
+                "is_active": True
+            })
+
+    def _save_account(self, account: Dict):
+        self.conn.execute(
+            "INSERT INTO accounts (id, user_id, username, data) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET "
+            "user_id = excluded.user_id, username = excluded.username, data = excluded.data",
+            (account["id"], account.get("user_id"), account.get("username"), dumps(account)),
+        )
+
+    def get_all_accounts(self) -> List[Dict]:
+        """모든 계정 조회"""
+        with self._lock:
+            rows = self.conn.execute("SELECT data FROM accounts ORDER BY rowid").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get_account(self, account_id: str) -> Optional[Dict]:
+        """특정 계정 조회"""
+        with self._lock:
+            row = self.conn.execute("SELECT data FROM accounts WHERE id = ?", (account_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find_account(self, user_id: Optional[str] = None, username: Optional[str] = None) -> Optional[Dict]:
+        """Instagram user_id 또는 username이 일치하는 계정 조회 (둘 다 맞으면 먼저 추가된 계정)"""
+        if not user_id and not username:
+            return None
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT data FROM accounts WHERE user_id = ? OR username = ? ORDER BY rowid LIMIT 1",
+                (user_id, username),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def add_account(self, name: str, access_token: str, user_id: Optional[str] = None, username: Optional[str] = None) -> Dict:
+        """새 계정 추가"""
+        with self._lock:
+            account_ids = [row[0] for row in self.conn.execute("SELECT id FROM accounts WHERE id LIKE 'account%'")]
+            new_account = {
+                "id": next_account_id(account_ids),
+                "name": name,
+                "access_token": access_token,
+                "user_id": user_id,
+                "username": username,
+                "created_at": datetime.utcnow().isoformat() + "Z",
+                "is_active": True
+            }
+            self._save_account(new_account)
+            return new_account
+
+    def update_account(self, account_id: str, updates: Dict) -> Optional[Dict]:
+        """계정 정보 업데이트"""
+        with self._lock:
+            account = self.get_account(account_id)
+            if not account:
+                return None
+            account.update(updates)
+            self._save_account(account)
+            return account
+
+    def delete_account(self, account_id: str) -> bool:
+        """계정 삭제 (기본 계정은 삭제 불가)"""
+        if account_id == "default":
+            return False
+        with self._lock:
+            cursor = self.conn.execute("DELETE FROM accounts WHERE id = ?", (account_id,))
+            return cursor.rowcount > 0
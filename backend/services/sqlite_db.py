@@ -0,0 +1,119 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional, Tuple
+from config import settings
+
+
+SCHEMA = """
+-- ID가 없는 댓글은 id = '' 로 저장 (키셋 정렬 키 comment_sort_key와 같은 값이므로 인덱스로 커서 위치를 찾을 수 있음)
+CREATE TABLE IF NOT EXISTS comments (
+    account_id TEXT NOT NULL,
+    id TEXT NOT NULL DEFAULT '',
+    post_id TEXT,
+    created_at TEXT NOT NULL DEFAULT '',
+    data TEXT NOT NULL
+);
+-- ID 중복은 ID가 있는 댓글끼리만 막음
+CREATE UNIQUE INDEX IF NOT EXISTS idx_comments_account_id
+    ON comments (account_id, id) WHERE id <> '';
+-- (created_at, id)까지 포함해 키셋 페이지네이션 커서 위치로 바로 이동 가능
+CREATE INDEX IF NOT EXISTS idx_comments_account_post_created_id
+    ON comments (account_id, post_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_comments_account_created_id
+    ON comments (account_id, created_at DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS accounts (
+    id TEXT PRIMARY KEY,
+    user_id TEXT,
+    username TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_accounts_user_id ON accounts (user_id);
+CREATE INDEX IF NOT EXISTS idx_accounts_username ON accounts (username);
+"""
+
+# 일회성 마이그레이션 (순서대로 PRAGMA user_version 1, 2, ...에 해당, 이미 적용한 버전은 건너뜀)
+MIGRATIONS = [
+    # 1: 키셋 페이지네이션용 (created_at, id) 인덱스로 바꾸면서 이전 인덱스 제거
+    """
+    DROP INDEX IF EXISTS idx_comments_account_post;
+    DROP INDEX IF EXISTS idx_comments_account_created;
+    """,
+    # 2: ID가 없는 댓글(NULL)을 '' 로 바꾸고 UNIQUE (account_id, id) 제약을 부분 유니크 인덱스로 옮김
+    #    (SQLite는 제약을 바꿀 수 없으므로 rowid(저장 순서)를 유지한 채 테이블을 다시 만듦)
+    """
+    CREATE TABLE comments_new (
+        account_id TEXT NOT NULL,
+        id TEXT NOT NULL DEFAULT '',
+        post_id TEXT,
+        created_at TEXT NOT NULL DEFAULT '',
+        data TEXT NOT NULL
+    );
+    INSERT INTO comments_new (rowid, account_id, id, post_id, created_at, data)
+        SELECT rowid, account_id, COALESCE(id, ''), post_id, COALESCE(created_at, ''), data FROM comments;
+    DROP TABLE comments;
+    ALTER TABLE comments_new RENAME TO comments;
+    CREATE UNIQUE INDEX idx_comments_account_id ON comments (account_id, id) WHERE id <> '';
+    CREATE INDEX idx_comments_account_post_created_id ON comments (account_id, post_id, created_at DESC, id DESC);
+    CREATE INDEX idx_comments_account_created_id ON comments (account_id, created_at DESC, id DESC);
+    """,
+]
+
+_connections: Dict[str, sqlite3.Connection] = {}
+# DB 파일별 공유 연결을 쓰는 저장소/계정 관리자가 함께 잡는 잠금
+# (한 쪽의 BEGIN IMMEDIATE ... COMMIT 트랜잭션 중간에 다른 쪽의 쓰기가 끼어들어 같이 커밋/롤백되지 않도록 함)
+_connection_locks: Dict[str, threading.RLock] = {}
+_connections_lock = threading.Lock()
+
+
+def _db_path(db_file: Optional[str] = None) -> str:
+    return db_file or os.path.join(settings.data_dir, settings.sqlite_file)
+
+
+def _migrate(conn: sqlite3.Connection):
+    """아직 적용하지 않은 마이그레이션 실행"""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, script in enumerate(MIGRATIONS[version:], start=version + 1):
+        conn.executescript(f"BEGIN IMMEDIATE; {script} PRAGMA user_version = {number}; COMMIT;")
+
+
+def get_connection_lock(db_file: Optional[str] = None) -> threading.RLock:
+    """공유 연결을 쓰는 동안 잡아야 하는 잠금 (get_connection과 같은 DB 파일 기준)"""
+    db_file = _db_path(db_file)
+    with _connections_lock:
+        return _connection_locks.setdefault(db_file, threading.RLock())
+
+
+def get_connection(db_file: Optional[str] = None) -> sqlite3.Connection:
+    """DB 파일별 공유 연결 반환 (처음 호출 시 스키마 생성, 마이그레이션)"""
+    db_file = _db_path(db_file)
+    with _connections_lock:
+        conn = _connections.get(db_file)
+        if conn is None:
+            os.makedirs(os.path.dirname(db_file) or ".", exist_ok=True)
+            # 다른 프로세스가 쓰기 잠금을 잡고 있으면 sqlite_busy_timeout초까지 기다림
+            conn = sqlite3.connect(
+                db_file, timeout=settings.sqlite_busy_timeout, check_same_thread=False, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            _migrate(conn)
+            _connections[db_file] = conn
+        return conn
+
+
+def account_key(account_id: Optional[str]) -> str:
+    """JSON 저장소와 동일하게 account_id가 없으면 기본 계정으로 취급"""
+    return account_id or "default"
+
+
+def row_key(comment: Dict) -> Tuple[str, Optional[str], str]:
+    """comments 테이블의 (id, post_id, created_at) 열 값 (ID/작성 시각이 없으면 '' — comment_sort_key와 같은 키)"""
+    return comment.get("id") or "", comment.get("post_id"), comment.get("created_at") or ""
+
+
+def dumps(data: Dict) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
@@ -0,0 +1,254 @@
+import json
+from contextlib import contextmanager
+from typing import Iterator, List, Dict, Optional, Tuple
+from datetime import datetime
+from config import settings
+from services.storage import StorageService, prepare_new_comment, merge_comment
+from services.sqlite_db import get_connection, get_connection_lock, account_key, dumps, row_key
+
+
+class SQLiteStorageService(StorageService):
+    """
+    SQLite 기반 저장소 서비스
+    모든 계정의 댓글을 하나의 테이블에 저장하고, (account_id, post_id, created_at, id) /
+    (account_id, created_at, id) 인덱스로 목록 조회를 전체 로드 없이 인덱스 범위 스캔으로 처리합니다.
+    변경은 BEGIN IMMEDIATE 트랜잭션 안에서 읽고 고쳐 쓰므로 여러 프로세스가 동시에 써도 변경이 유실되지 않습니다.
+    """
+
+    # iter_comments가 한 번에 읽는 행 수
+    EXPORT_CHUNK_SIZE = 1000
+
+    def __init__(self, db_file: Optional[str] = None):
+        self.data_dir = settings.data_dir
+        self.conn = get_connection(db_file)
+        # 같은 연결을 쓰는 계정 관리자(SQLiteAccountManager)와 공유하는 잠금
+        # (읽기도 잡아야 다른 스레드가 연 트랜잭션의, 롤백될 수 있는 변경을 읽지 않음)
+        self._lock = get_connection_lock(db_file)
+        self._listeners: List = []
+        # 다른 연결(프로세스)이 커밋하면 바뀌는 값 (PRAGMA data_version)
+        self._data_version: Optional[int] = None
+
+    def _upsert_row(self, comment: Dict, account_id: Optional[str]):
+        self.conn.execute(
+            "INSERT INTO comments (account_id, id, post_id, created_at, data) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (account_id, id) WHERE id <> '' DO UPDATE SET "
+            "post_id = excluded.post_id, created_at = excluded.created_at, data = excluded.data",
+            (account_key(account_id), *row_key(comment), dumps(comment)),
+        )
+
+    @contextmanager
+    def _write_lock(self, account_id: Optional[str] = None):
+        """
+        쓰기 트랜잭션 (BEGIN IMMEDIATE: 시작할 때 DB 쓰기 잠금을 잡음)
+        다른 프로세스가 쓰는 중이면 sqlite_busy_timeout초까지 기다리고, 예외가 나면 롤백합니다.
+        """
+        with self._lock:
+            if self.conn.in_transaction:
+                yield
+                return
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def check_external_changes(self, account_id: Optional[str] = None):
+        """다른 프로세스의 커밋 여부를 확인 (있으면 어느 계정인지 알 수 없으므로 전체 on_account_reset 알림)"""
+        with self._lock:
+            version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+            if self._data_version is not None and version != self._data_version:
+                self._notify_reset(None)
+            self._data_version = version
+
+    def get_all_comments(self, account_id: Optional[str] = None) -> List[Dict]:
+        """모든 댓글 조회 (저장 순서 유지)"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT data FROM comments WHERE account_id = ? ORDER BY rowid",
+                (account_key(account_id),),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def list_comments(
+        self,
+        account_id: Optional[str] = None,
+        post_id: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[Dict]:
+        """댓글 목록 조회 (인덱스 범위 스캔)"""
+        with self._lock:
+            if post_id:
+                rows = self.conn.execute(
+                    "SELECT data FROM comments WHERE account_id = ? AND post_id = ? "
+                    "ORDER BY created_at DESC, rowid LIMIT ? OFFSET ?",
+                    (account_key(account_id), post_id, limit, offset),
+                ).fetchall()
+            else:
+                rows = self.conn.execute(
+                    "SELECT data FROM comments WHERE account_id = ? "
+                    "ORDER BY created_at DESC, rowid LIMIT ? OFFSET ?",
+                    (account_key(account_id), limit, offset),
+                ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def list_comments_after(
+        self,
+        account_id: Optional[str] = None,
+        post_id: Optional[str] = None,
+        limit: int = 100,
+        after: Optional[Tuple[str, str]] = None
+    ) -> List[Dict]:
+        """
+        키셋 페이지네이션: (created_at, id) 인덱스에서 커서 위치로 바로 이동해 limit개 조회
+        ID가 없는 댓글은 id = '' 로 저장되어 있으므로 comment_sort_key와 같은 키로 비교/정렬됩니다.
+        """
+        conditions = ["account_id = ?"]
+        params: list = [account_key(account_id)]
+        if post_id:
+            conditions.append("post_id = ?")
+            params.append(post_id)
+        if after is not None:
+            conditions.append("(created_at, id) < (?, ?)")
+            params.extend(after)
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT data FROM comments WHERE {' AND '.join(conditions)} "
+                "ORDER BY created_at DESC, id DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def iter_comments(
+        self,
+        account_id: Optional[str] = None,
+        post_id: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> Iterator[Dict]:
+        """조건에 맞는 댓글을 저장 순서대로 하나씩 반환 (rowid 기준으로 EXPORT_CHUNK_SIZE개씩 끊어 조회)"""
+        conditions = ["account_id = ?", "rowid > ?"]
+        params: list = [account_key(account_id)]
+        if post_id:
+            conditions.append("post_id = ?")
+            params.append(post_id)
+        if since:
+            conditions.append("created_at >= ?")
+            params.append(since)
+        if until:
+            conditions.append("created_at < ?")
+            params.append(until)
+        query = f"SELECT rowid, data FROM comments WHERE {' AND '.join(conditions)} ORDER BY rowid LIMIT ?"
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self.conn.execute(
+                    query, (params[0], last_rowid, *params[1:], self.EXPORT_CHUNK_SIZE)
+                ).fetchall()
+            for rowid, data in rows:
+                yield json.loads(data)
+            if len(rows) < self.EXPORT_CHUNK_SIZE:
+                return
+            last_rowid = rows[-1][0]
+
+    def get_comment_by_id(self, comment_id: str, account_id: Optional[str] = None) -> Optional[Dict]:
+        """ID로 댓글 조회"""
+        if not comment_id:
+            # ID가 없는 댓글(id = '')은 ID로 찾을 수 없음
+            return None
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT data FROM comments WHERE account_id = ? AND id = ?",
+                (account_key(account_id), comment_id),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def add_comment(self, comment: Dict, account_id: Optional[str] = None) -> Dict:
+        """새 댓글 추가"""
+        with self._lock:
+            with self._write_lock(account_id):
+                # 중복 체크
+                comment_id = comment.get("id")
+                if comment_id:
+                    existing = self.get_comment_by_id(comment_id, account_id)
+                    if existing:
+                        return existing
+
+                prepare_new_comment(comment)
+                self._upsert_row(comment, account_id)
+            self._notify(account_id, [(None, comment)])
+            return comment
+
+    def upsert_many(self, comments: List[Dict], account_id: Optional[str] = None) -> Dict[str, int]:
+        """여러 댓글을 한 번에 추가/갱신 (잠금 한 번, 트랜잭션 한 번)"""
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+        with self._lock:
+            events = []
+            with self._write_lock(account_id):
+                for comment in comments:
+                    comment_id = comment.get("id")
+                    existing = self.get_comment_by_id(comment_id, account_id) if comment_id else None
+                    if existing is None:
+                        self._upsert_row(prepare_new_comment(comment), account_id)
+                        counts["inserted"] += 1
+                        events.append((None, self._snapshot(comment)))
+                        continue
+                    before = self._snapshot(existing)
+                    if merge_comment(existing, comment):
+                        self._upsert_row(existing, account_id)
+                        counts["updated"] += 1
+                        events.append((before, self._snapshot(existing)))
+                    else:
+                        counts["unchanged"] += 1
+            self._notify(account_id, events)
+        return counts
+
+    def update_comment(self, comment_id: str, updates: Dict, account_id: Optional[str] = None) -> Optional[Dict]:
+        """댓글 업데이트"""
+        with self._lock:
+            with self._write_lock(account_id):
+                comment = self.get_comment_by_id(comment_id, account_id)
+                if not comment:
+                    return None
+                before = self._snapshot(comment)
+                comment.update(updates)
+                self._upsert_row(comment, account_id)
+            self._notify(account_id, [(before, comment)])
+            return comment
+
+    def add_reply(self, comment_id: str, reply: Dict, account_id: Optional[str] = None) -> Optional[Dict]:
+        """댓글에 답글 추가"""
+        with self._lock:
+            with self._write_lock(account_id):
+                comment = self.get_comment_by_id(comment_id, account_id)
+                if not comment:
+                    return None
+
+                if "replies" not in comment:
+                    comment["replies"] = []
+
+                if "created_at" not in reply:
+                    reply["created_at"] = datetime.utcnow().isoformat() + "Z"
+
+                before = self._snapshot(comment)
+                comment["replies"].append(reply)
+                self._upsert_row(comment, account_id)
+            self._notify(account_id, [(before, comment)])
+            return reply
+
+    def delete_comment(self, comment_id: str, account_id: Optional[str] = None) -> bool:
+        """댓글 삭제"""
+        if not comment_id:
+            return False
+        with self._lock:
+            with self._write_lock(account_id):
+                before = self.get_comment_by_id(comment_id, account_id) if self._listeners else None
+                cursor = self.conn.execute(
+                    "DELETE FROM comments WHERE account_id = ? AND id = ?",
+                    (account_key(account_id), comment_id),
+                )
+            if cursor.rowcount > 0 and before is not None:
+                self._notify(account_id, [(before, None)])
+            return cursor.rowcount > 0
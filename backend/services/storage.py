@@ -1,18 +1,252 @@
-import json
+import bisect
 import os
-from typing import List, Dict, Optional
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator, List, Dict, Optional, Tuple
 from datetime import datetime
 from config import settings
+from services.archive_segment import ArchiveSegment, write_segment
+from services.file_lock import FileLock
+from services.pagination import comment_sort_key
+from services.serializers import Codec, decode, get_codec
+
+
+def prepare_new_comment(comment: Dict) -> Dict:
+    """새로 저장할 댓글에 기본 필드(created_at, replies) 추가"""
+    if "created_at" not in comment:
+        comment["created_at"] = datetime.utcnow().isoformat() + "Z"
+    if "replies" not in comment:
+        comment["replies"] = []
+    return comment
+
+
+def merge_comment(existing: Dict, incoming: Dict) -> bool:
+    """
+    저장된 댓글에 새로 받은 값을 합침 (변경이 있으면 True)
+    created_at은 처음 저장한 값을 유지하고, 답글은 ID 기준으로 없는 것만 추가합니다.
+    """
+    changed = False
+    for key, value in incoming.items():
+        if key == "created_at":
+            continue
+        if key == "replies":
+            replies = existing.setdefault("replies", [])
+            known_ids = {reply.get("id") for reply in replies}
+            for reply in value or []:
+                if reply.get("id") not in known_ids:
+                    replies.append(reply)
+                    known_ids.add(reply.get("id"))
+                    changed = True
+        elif existing.get(key) != value:
+            existing[key] = value
+            changed = True
+    return changed
+
+
+# 파싱된 댓글 객체가 차지하는 메모리 / JSON 파일 크기 (대략적인 배수, 캐시 예산 계산용)
+_CACHE_SIZE_FACTOR = 4
+
+
+def snapshot_comment(comment: Dict) -> Dict:
+    """변경 알림용 댓글 복사본 (답글 목록까지 복사)"""
+    return dict(comment, replies=list(comment.get("replies") or []))
+
+
+def matches_filter(
+    comment: Dict,
+    post_id: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None
+) -> bool:
+    """post_id와 created_at 범위(since 이상, until 미만) 조건을 만족하는지 확인"""
+    if post_id and comment.get("post_id") != post_id:
+        return False
+    created_at = comment.get("created_at", "")
+    if since and created_at < since:
+        return False
+    if until and created_at >= until:
+        return False
+    return True
+
+
+class _CommentIndex:
+    """댓글 파일 하나의 메모리 인덱스 (댓글 ID → 댓글 레코드, 최신순 정렬 목록)"""
+    
+    def __init__(self, data: Dict, signature: Optional[tuple]):
+        self.data = data
+        self.signature = signature
+        self.by_id: Dict[str, Dict] = {}
+        for comment in data.get("comments", []):
+            comment_id = comment.get("id")
+            if comment_id:
+                # 중복 ID가 있으면 기존 선형 검색과 동일하게 첫 번째 댓글 사용
+                self.by_id.setdefault(comment_id, comment)
+        # post_id(None이면 전체) → 최신순 정렬 목록 (처음 조회할 때 만들고 변경 시 비움)
+        self._sorted: Dict[Optional[str], List[Dict]] = {}
+        # post_id → ((created_at, id) 오름차순 키 목록, 같은 순서의 댓글 목록) — 커서 위치를 이진 탐색
+        self._keysets: Dict[Optional[str], Tuple[List[Tuple[str, str]], List[Dict]]] = {}
+    
+    @property
+    def estimated_bytes(self) -> int:
+        """메모리 예산 계산용 추정 크기"""
+        file_size = self.signature[2] if self.signature else 0
+        return file_size * _CACHE_SIZE_FACTOR
+    
+    def sorted_comments(self, post_id: Optional[str] = None) -> List[Dict]:
+        """최신순(created_at 내림차순) 정렬된 댓글 목록 (post_id 필터)"""
+        view = self._sorted.get(post_id)
+        if view is None:
+            comments = self.data.get("comments", [])
+            if post_id:
+                comments = [c for c in comments if c.get("post_id") == post_id]
+            view = sorted(comments, key=lambda x: x.get("created_at", ""), reverse=True)
+            self._sorted[post_id] = view
+        return view
+    
+    def keyset_view(self, post_id: Optional[str] = None) -> Tuple[List[Tuple[str, str]], List[Dict]]:
+        """(created_at, id) 오름차순으로 정렬된 (키 목록, 댓글 목록)"""
+        view = self._keysets.get(post_id)
+        if view is None:
+            comments = self.data.get("comments", [])
+            if post_id:
+                comments = [c for c in comments if c.get("post_id") == post_id]
+            comments = sorted(comments, key=comment_sort_key)
+            view = ([comment_sort_key(c) for c in comments], comments)
+            self._keysets[post_id] = view
+        return view
+    
+    def invalidate_views(self):
+        self._sorted.clear()
+        self._keysets.clear()
 
 
 class StorageService:
-    """JSON 파일 기반 저장소 서비스"""
+    """
+    JSON 파일 기반 저장소 서비스
+    계정별로 파싱한 댓글을 메모리에 캐시하고, 모든 변경은 캐시를 직접 고친 뒤 파일에 기록합니다(write-through).
+    다른 프로세스(scripts/sync_comments.py 등)가 파일을 바꾸면 (inode, 수정 시각, 크기)로 감지해 다시 읽고,
+    캐시 크기가 storage_cache_max_mb를 넘으면 가장 오래 쓰지 않은 계정부터 비웁니다.
+    변경은 계정 파일 옆의 잠금 파일(.lock)을 잡은 채로 최신 파일을 읽고 고쳐 저장하므로 여러 프로세스가 동시에 써도
+    서로의 변경을 덮어쓰지 않습니다.
+    storage_archive_accounts의 계정은 댓글 파일 대신 읽기 전용 mmap 세그먼트에서 필요한 댓글만 디코딩해 읽습니다.
+    """
     
     def __init__(self):
         self.data_dir = settings.data_dir
         self.comments_file = os.path.join(self.data_dir, settings.comments_file)
+        # 파일 경로 → 메모리 인덱스 (처음 접근할 때 생성, 최근 사용 순)
+        self._indexes: "OrderedDict[str, _CommentIndex]" = OrderedDict()
+        # 파일 경로 → 마지막으로 본 파일 시그니처 (캐시에서 제거된 뒤의 외부 변경도 감지)
+        self._known_signatures: Dict[str, Optional[tuple]] = {}
+        self.cache_max_bytes = settings.storage_cache_max_mb * 1024 * 1024
+        # 댓글 파일 저장 형식 (읽을 때는 파일 앞부분으로 형식을 자동 감지)
+        self.codec = get_codec(settings.storage_format)
+        # 아카이브 계정: 파싱한 댓글 대신 mmap 세그먼트로 읽음 (댓글 파일 경로 → 열린 세그먼트)
+        self.archive_accounts = {
+            account.strip() for account in settings.storage_archive_accounts.split(",") if account.strip()
+        }
+        self._segments: Dict[str, ArchiveSegment] = {}
+        self._lock = threading.RLock()
+        # 데이터 파일 경로 → 프로세스 간 쓰기 잠금, 마지막으로 본 쓰기 세대 번호
+        self._file_locks: Dict[str, FileLock] = {}
+        self._generations: Dict[str, int] = {}
+        self._listeners: List = []
         self._ensure_data_file()
     
+    # ---------- 변경 알림 ----------
+    
+    def add_listener(self, listener):
+        """
+        댓글 변경 리스너 등록 (집계, 검색 색인 등 파생 데이터 갱신용)
+        리스너는 저장소 잠금 안에서 다음 메서드로 호출됩니다.
+        - on_comment_changed(account_id, before, after): 추가는 before=None, 삭제는 after=None
+        - on_account_reset(account_id): 다른 프로세스가 데이터를 바꿔 계정 데이터를 다시 읽어야 함 (None이면 전체)
+        """
+        self._listeners.append(listener)
+    
+    def _notify(self, account_id: Optional[str], events: List[Tuple[Optional[Dict], Optional[Dict]]]):
+        key = account_id or "default"
+        for listener in self._listeners:
+            for before, after in events:
+                try:
+                    listener.on_comment_changed(key, before, after)
+                except Exception as e:
+                    print(f"Storage listener error: {e}")
+    
+    def _notify_reset(self, account_id: Optional[str]):
+        key = None if account_id is None else account_id or "default"
+        for listener in self._listeners:
+            try:
+                listener.on_account_reset(key)
+            except Exception as e:
+                print(f"Storage listener error: {e}")
+    
+    def _snapshot(self, comment: Optional[Dict]) -> Optional[Dict]:
+        """리스너가 있을 때만 변경 알림용 복사본 생성"""
+        if comment is None or not self._listeners:
+            return None
+        return snapshot_comment(comment)
+    
+    def scan_locked(self, account_id: Optional[str], fn):
+        """
+        쓰기를 막은 상태에서 계정의 전체 댓글 iterator로 fn을 실행 (파생 데이터 초기 구성용)
+        fn이 끝날 때까지 다른 변경이 끼어들지 않으므로, 이후 변경 알림과 빈틈없이 이어집니다.
+        """
+        with self._lock:
+            return fn(self.iter_comments(account_id))
+    
+    def check_external_changes(self, account_id: Optional[str] = None):
+        """다른 프로세스의 변경을 확인 (변경이 있으면 on_account_reset 알림)"""
+        with self._lock:
+            if self._get_segment(account_id) is None:
+                self._get_index(account_id)
+    
+    # ---------- 프로세스 간 쓰기 잠금 ----------
+    
+    def _data_file(self, account_id: Optional[str] = None) -> str:
+        """계정 데이터가 저장되는 파일 (잠금 파일은 이 경로 + .lock)"""
+        return self._get_comments_file(account_id)
+    
+    @contextmanager
+    def _write_lock(self, account_id: Optional[str] = None):
+        """
+        쓰기 잠금: 스레드 잠금 + 다른 프로세스(scripts/sync_comments.py 등)와 공유하는 파일 잠금
+        잠금을 잡은 뒤 다른 프로세스가 그동안 쓴 내용을 다시 읽어 고치므로 read-modify-write 중에 변경이 유실되지 않습니다.
+        """
+        with self._lock:
+            if not settings.storage_file_lock:
+                yield
+                return
+            data_file = self._data_file(account_id)
+            lock = self._file_locks.get(data_file)
+            if lock is None:
+                os.makedirs(self.data_dir, exist_ok=True)
+                lock = self._file_locks[data_file] = FileLock(data_file + ".lock")
+            with lock:
+                if lock.depth == 1:
+                    generation = lock.read_generation()
+                    known = self._generations.get(data_file)
+                    if known is not None and known != generation:
+                        # 마지막으로 잠금을 잡은 뒤 다른 프로세스가 씀
+                        self._invalidate_cache(account_id)
+                    self._generations[data_file] = generation
+                yield
+    
+    def _mark_written(self, data_file: str):
+        """데이터 파일을 바꾼 뒤 쓰기 세대 번호를 올림 (파일 잠금을 잡은 경우에만)"""
+        lock = self._file_locks.get(data_file)
+        if lock is not None and lock.depth:
+            self._generations[data_file] = lock.bump_generation()
+    
+    def _invalidate_cache(self, account_id: Optional[str] = None):
+        """캐시를 버려 다음 접근 때 파일을 다시 읽고 on_account_reset 알림"""
+        comments_file = self._get_comments_file(account_id)
+        self._indexes.pop(comments_file, None)
+        self._segments.pop(comments_file, None)
+        # 어떤 시그니처와도 다른 값 → 다시 읽을 때 외부 변경으로 처리
+        self._known_signatures[comments_file] = ()
+    
     def _get_comments_file(self, account_id: Optional[str] = None) -> str:
         """계정별 댓글 파일 경로 반환"""
         if account_id and account_id != "default":
@@ -24,117 +258,379 @@ class StorageService:
         comments_file = self._get_comments_file(account_id)
         if not os.path.exists(comments_file):
             os.makedirs(self.data_dir, exist_ok=True)
-            with open(comments_file, 'w', encoding='utf-8') as f:
-                json.dump({"comments": []}, f, ensure_ascii=False, indent=2)
+            try:
+                # 다른 프로세스가 먼저 만든 파일을 비우지 않도록 없을 때만 생성
+                with open(comments_file, 'xb') as f:
+                    f.write(self.codec.dumps({"comments": []}))
+            except FileExistsError:
+                pass
     
-    def _load_data(self, account_id: Optional[str] = None) -> Dict:
-        """JSON 파일에서 데이터 로드"""
+    @staticmethod
+    def _file_signature(path: str) -> Optional[tuple]:
+        """파일 변경 감지용 (inode, 수정 시각, 크기) — 원자적 교체(os.replace)는 inode로 감지"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    
+    def _get_index(self, account_id: Optional[str] = None) -> _CommentIndex:
+        """계정의 메모리 인덱스 반환 (없거나 파일이 외부에서 바뀌었으면 다시 생성)"""
+        return self._get_file_index(self._get_comments_file(account_id), account_id)
+    
+    def _get_file_index(self, comments_file: str, account_id: Optional[str] = None) -> _CommentIndex:
+        """댓글 파일 하나의 메모리 인덱스 반환 (외부 변경 시 account_id로 on_account_reset 알림)"""
+        signature = self._file_signature(comments_file)
+        index = self._indexes.get(comments_file)
+        if index is None or index.signature != signature:
+            known = self._known_signatures.get(comments_file)
+            data, codec = self._decode_file(comments_file)
+            if codec is not None and codec.family != self.codec.family:
+                data = self._convert_file(comments_file, account_id)
+            index = self._indexes.get(comments_file)
+            if index is None or index.data is not data:
+                index = _CommentIndex(data, self._file_signature(comments_file))
+                self._indexes[comments_file] = index
+            self._evict_cold_indexes(comments_file)
+            self._known_signatures[comments_file] = index.signature
+            if known is not None and known != signature:
+                # 다른 프로세스가 파일을 바꿈
+                self._notify_reset(account_id)
+        self._indexes.move_to_end(comments_file)
+        return index
+    
+    def _evict_cold_indexes(self, keep: str):
+        """메모리 예산을 넘으면 가장 오래 쓰지 않은 계정의 캐시부터 제거 (keep은 유지)"""
+        total = sum(index.estimated_bytes for index in self._indexes.values())
+        for comments_file in list(self._indexes):
+            if total <= self.cache_max_bytes:
+                break
+            if comments_file == keep:
+                continue
+            total -= self._indexes.pop(comments_file).estimated_bytes
+    
+    # ---------- 아카이브 계정 (읽기 전용 mmap 세그먼트) ----------
+    
+    def _is_archive(self, account_id: Optional[str]) -> bool:
+        return (account_id or "default") in self.archive_accounts
+    
+    @staticmethod
+    def _segment_file(comments_file: str) -> str:
+        """댓글 파일에 대응하는 세그먼트 파일 경로 (comments_x.json → comments_x.seg)"""
+        return os.path.splitext(comments_file)[0] + ".seg"
+    
+    def _get_segment(self, account_id: Optional[str] = None) -> Optional[ArchiveSegment]:
+        """
+        아카이브 계정이면 댓글 파일과 내용이 같은 세그먼트 반환 (아니거나 댓글 파일이 없으면 None → 일반 경로로 읽음)
+        세그먼트에 기록된 원본 시그니처가 현재 댓글 파일과 다르면(다른 프로세스의 쓰기 등) 다시 만듭니다.
+        """
+        if not self._is_archive(account_id):
+            return None
         comments_file = self._get_comments_file(account_id)
+        signature = self._file_signature(comments_file)
+        if signature is None:
+            return None
+        segment = self._segments.get(comments_file)
+        if segment is None or segment.source_signature != signature:
+            known = self._known_signatures.get(comments_file)
+            segment = self._open_segment(comments_file, signature)
+            if segment is None:
+                return None
+            self._segments[comments_file] = segment
+            self._known_signatures[comments_file] = segment.source_signature
+            if known is not None and known != segment.source_signature:
+                # 다른 프로세스가 파일을 바꿈
+                self._notify_reset(account_id)
+        return segment
+    
+    def _open_segment(self, comments_file: str, signature: tuple) -> Optional[ArchiveSegment]:
+        """디스크의 세그먼트를 열고, 없거나 댓글 파일보다 오래됐으면 댓글 파일을 한 번 읽어 다시 만듦"""
+        segment_file = self._segment_file(comments_file)
+        try:
+            segment = ArchiveSegment(segment_file)
+            if segment.source_signature == signature:
+                return segment
+        except (FileNotFoundError, ValueError):
+            pass
+        try:
+            with open(comments_file, 'rb') as f:
+                # 읽은 파일 자체의 시그니처 (읽는 사이 교체되어도 세그먼트 내용과 일치)
+                stat = os.fstat(f.fileno())
+                raw = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            data = decode(raw)[0]
+        except ValueError:
+            data = {"comments": []}
+        return self._build_segment(comments_file, data, (stat.st_ino, stat.st_mtime_ns, stat.st_size))
+    
+    def _build_segment(self, comments_file: str, data: Dict, signature: tuple) -> Optional[ArchiveSegment]:
+        """데이터로 세그먼트 파일을 만들어 엶 (실패하면 None → 댓글 파일에서 읽음)"""
+        segment_file = self._segment_file(comments_file)
+        # 교체할 세그먼트의 mmap을 먼저 놓음 (열린 매핑이 있으면 교체할 수 없는 Windows 대비)
+        self._segments.pop(comments_file, None)
+        try:
+            write_segment(segment_file, data.get("comments", []), signature)
+            return ArchiveSegment(segment_file)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  아카이브 세그먼트를 만들지 못해 댓글 파일에서 읽습니다: {segment_file} ({e})")
+            return None
+    
+    def _decode_file(self, comments_file: str) -> Tuple[Dict, Optional[Codec]]:
+        """댓글 파일을 형식에 맞게 읽음 → (데이터, 파일 형식) (없거나 손상된 파일은 빈 데이터, 형식 None)"""
         try:
-            with open(comments_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {"comments": []}
+            with open(comments_file, 'rb') as f:
+                raw = f.read()
+            return decode(raw)
+        except (FileNotFoundError, ValueError):
+            return {"comments": []}, None
+    
+    def _read_file(self, comments_file: str) -> Dict:
+        """댓글 파일에서 데이터 읽기"""
+        return self._decode_file(comments_file)[0]
+    
+    def _convert_file(self, comments_file: str, account_id: Optional[str] = None) -> Dict:
+        """storage_format과 다른 계열 형식의 파일(설정 변경 전 파일)을 설정된 형식으로 다시 저장 (두 JSON 형식끼리는 다음 쓰기 때 바뀜)"""
+        with self._write_lock(account_id):
+            # 잠금을 잡기 전에 다른 프로세스가 바꿨을 수 있으므로 다시 읽음
+            data, codec = self._decode_file(comments_file)
+            if codec is not None and codec.family != self.codec.family:
+                self._save_file(comments_file, data)
+                print(f"✅ 댓글 파일을 {codec.name} → {self.codec.name} 형식으로 변환했습니다: {comments_file}")
+            return data
+    
+    def _load_data(self, account_id: Optional[str] = None) -> Dict:
+        """JSON 파일에서 데이터 로드 (메모리 인덱스와 공유되는 객체)"""
+        return self._get_index(account_id).data
     
     def _save_data(self, data: Dict, account_id: Optional[str] = None):
         """데이터를 JSON 파일에 저장"""
         comments_file = self._get_comments_file(account_id)
-        with open(comments_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        self._save_file(comments_file, data)
+        if self._is_archive(account_id):
+            # 아카이브 계정: 저장한 데이터로 세그먼트를 바로 다시 만들고 파싱한 데이터는 캐시에서 내림
+            segment = self._build_segment(comments_file, data, self._known_signatures[comments_file])
+            if segment is not None:
+                self._segments[comments_file] = segment
+                self._indexes.pop(comments_file, None)
+    
+    def _save_file(self, comments_file: str, data: Dict):
+        """데이터를 댓글 파일 하나에 원자적으로 저장하고 메모리 인덱스 갱신"""
+        # 임시 파일에 쓴 뒤 교체하여 저장 도중 중단되어도 기존 파일이 깨지지 않도록 함
+        # (임시 파일 이름에 PID를 넣어 다른 프로세스의 임시 파일과 겹치지 않게 함)
+        tmp_file = f"{comments_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(self.codec.dumps(data))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, comments_file)
+        self._mark_written(comments_file)
+        
+        # 방금 쓴 파일 기준으로 인덱스 갱신 (write-through)
+        signature = self._file_signature(comments_file)
+        self._known_signatures[comments_file] = signature
+        index = self._indexes.get(comments_file)
+        if index is not None and index.data is data:
+            index.signature = signature
+            index.invalidate_views()
+        else:
+            self._indexes[comments_file] = _CommentIndex(data, signature)
+        self._evict_cold_indexes(comments_file)
     
     def get_all_comments(self, account_id: Optional[str] = None) -> List[Dict]:
         """모든 댓글 조회"""
-        data = self._load_data(account_id)
-        return data.get("comments", [])
+        with self._lock:
+            segment = self._get_segment(account_id)
+            if segment is not None:
+                return list(segment)
+            data = self._load_data(account_id)
+            return list(data.get("comments", []))
+    
+    def list_comments(
+        self,
+        account_id: Optional[str] = None,
+        post_id: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[Dict]:
+        """댓글 목록 조회 (post_id 필터, 최신순 정렬, 페이지네이션)"""
+        with self._lock:
+            segment = self._get_segment(account_id)
+            if segment is not None:
+                return segment.recent(post_id or None, offset, limit)
+            # 정렬된 목록은 캐시되어 있으므로 변경이 없으면 잘라서 반환만 함
+            return self._get_index(account_id).sorted_comments(post_id or None)[offset:offset + limit]
+    
+    def list_comments_after(
+        self,
+        account_id: Optional[str] = None,
+        post_id: Optional[str] = None,
+        limit: int = 100,
+        after: Optional[Tuple[str, str]] = None
+    ) -> List[Dict]:
+        """
+        키셋 페이지네이션: (created_at, id) 내림차순으로 after 커서 다음 댓글부터 limit개 조회
+        정렬된 키 목록에서 커서 위치를 이진 탐색하므로 페이지 깊이와 관계없이 O(log n + limit)입니다.
+        """
+        with self._lock:
+            segment = self._get_segment(account_id)
+            if segment is not None:
+                return segment.before(post_id or None, limit, after)
+            keys, comments = self._get_index(account_id).keyset_view(post_id or None)
+            end = len(keys) if after is None else bisect.bisect_left(keys, tuple(after))
+            start = max(0, end - limit)
+            return comments[start:end][::-1]
+    
+    def iter_comments(
+        self,
+        account_id: Optional[str] = None,
+        post_id: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> Iterator[Dict]:
+        """
+        조건에 맞는 댓글을 저장 순서대로 하나씩 반환 (내보내기용 generator, 목록을 복사하지 않음)
+        삭제는 목록 객체를 새로 만들고 추가는 끝에 붙이므로 순회 도중 변경되어도 안전합니다.
+        """
+        with self._lock:
+            # 아카이브 계정은 세그먼트에서 하나씩 디코딩
+            comments = self._get_segment(account_id)
+            if comments is None:
+                comments = self._get_index(account_id).data.get("comments", [])
+        for comment in comments:
+            if matches_filter(comment, post_id, since, until):
+                yield comment
     
     def get_comment_by_id(self, comment_id: str, account_id: Optional[str] = None) -> Optional[Dict]:
         """ID로 댓글 조회"""
-        comments = self.get_all_comments(account_id)
-        for comment in comments:
-            if comment.get("id") == comment_id:
-                return comment
-        return None
+        with self._lock:
+            segment = self._get_segment(account_id)
+            if segment is not None:
+                return segment.get(comment_id)
+            return self._get_index(account_id).by_id.get(comment_id)
     
     def add_comment(self, comment: Dict, account_id: Optional[str] = None) -> Dict:
         """새 댓글 추가"""
-        data = self._load_data(account_id)
-        comments = data.get("comments", [])
-        
-        # 중복 체크
-        comment_id = comment.get("id")
-        if comment_id:
-            existing = self.get_comment_by_id(comment_id, account_id)
-            if existing:
-                return existing
-        
-        # 타임스탬프 추가
-        if "created_at" not in comment:
-            comment["created_at"] = datetime.utcnow().isoformat() + "Z"
-        
-        if "replies" not in comment:
-            comment["replies"] = []
-        
-        comments.append(comment)
-        data["comments"] = comments
-        self._save_data(data, account_id)
-        return comment
+        with self._write_lock(account_id):
+            index = self._get_index(account_id)
+            
+            # 중복 체크
+            comment_id = comment.get("id")
+            if comment_id:
+                existing = index.by_id.get(comment_id)
+                if existing:
+                    return existing
+            
+            prepare_new_comment(comment)
+            index.data.setdefault("comments", []).append(comment)
+            if comment_id:
+                index.by_id[comment_id] = comment
+            self._save_data(index.data, account_id)
+            self._notify(account_id, [(None, comment)])
+            return comment
+    
+    def upsert_many(self, comments: List[Dict], account_id: Optional[str] = None) -> Dict[str, int]:
+        """
+        여러 댓글을 한 번에 추가/갱신 (잠금 한 번, 파일 저장 한 번)
+        이미 있는 댓글은 새 값으로 갱신하고(답글은 ID 기준으로 합침), 결과 건수를 반환합니다.
+        """
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+        with self._write_lock(account_id):
+            index = self._get_index(account_id)
+            # 같은 배치 안에서 한 댓글이 여러 번 바뀔 수 있으므로 변경 시점의 복사본으로 알림
+            events = []
+            for comment in comments:
+                comment_id = comment.get("id")
+                existing = index.by_id.get(comment_id) if comment_id else None
+                if existing is None:
+                    prepare_new_comment(comment)
+                    index.data.setdefault("comments", []).append(comment)
+                    if comment_id:
+                        index.by_id[comment_id] = comment
+                    counts["inserted"] += 1
+                    events.append((None, self._snapshot(comment)))
+                else:
+                    before = self._snapshot(existing)
+                    if merge_comment(existing, comment):
+                        counts["updated"] += 1
+                        events.append((before, self._snapshot(existing)))
+                    else:
+                        counts["unchanged"] += 1
+            
+            if counts["inserted"] or counts["updated"]:
+                self._save_data(index.data, account_id)
+                self._notify(account_id, events)
+        return counts
     
     def update_comment(self, comment_id: str, updates: Dict, account_id: Optional[str] = None) -> Optional[Dict]:
         """댓글 업데이트"""
-        data = self._load_data(account_id)
-        comments = data.get("comments", [])
-        
-        for i, comment in enumerate(comments):
-            if comment.get("id") == comment_id:
-                comments[i].update(updates)
-                data["comments"] = comments
-                self._save_data(data, account_id)
-                return comments[i]
-        
-        return None
+        with self._write_lock(account_id):
+            index = self._get_index(account_id)
+            comment = index.by_id.get(comment_id)
+            if not comment:
+                return None
+            
+            before = self._snapshot(comment)
+            comment.update(updates)
+            self._save_data(index.data, account_id)
+            self._notify(account_id, [(before, comment)])
+            return comment
     
     def add_reply(self, comment_id: str, reply: Dict, account_id: Optional[str] = None) -> Optional[Dict]:
         """댓글에 답글 추가"""
-        comment = self.get_comment_by_id(comment_id, account_id)
-        if not comment:
-            return None
-        
-        if "replies" not in comment:
-            comment["replies"] = []
-        
-        # 답글에 타임스탬프 추가
-        if "created_at" not in reply:
-            reply["created_at"] = datetime.utcnow().isoformat() + "Z"
-        
-        comment["replies"].append(reply)
-        
-        # 업데이트 저장
-        data = self._load_data(account_id)
-        comments = data.get("comments", [])
-        for i, c in enumerate(comments):
-            if c.get("id") == comment_id:
-                comments[i] = comment
-                break
-        
-        data["comments"] = comments
-        self._save_data(data, account_id)
-        return reply
+        with self._write_lock(account_id):
+            index = self._get_index(account_id)
+            comment = index.by_id.get(comment_id)
+            if not comment:
+                return None
+            
+            if "replies" not in comment:
+                comment["replies"] = []
+            
+            # 답글에 타임스탬프 추가
+            if "created_at" not in reply:
+                reply["created_at"] = datetime.utcnow().isoformat() + "Z"
+            
+            before = self._snapshot(comment)
+            comment["replies"].append(reply)
+            
+            # 업데이트 저장
+            self._save_data(index.data, account_id)
+            self._notify(account_id, [(before, comment)])
+            return reply
     
     def delete_comment(self, comment_id: str, account_id: Optional[str] = None) -> bool:
         """댓글 삭제"""
-        data = self._load_data(account_id)
-        comments = data.get("comments", [])
-        
-        original_length = len(comments)
-        comments = [c for c in comments if c.get("id") != comment_id]
-        
-        if len(comments) < original_length:
-            data["comments"] = comments
-            self._save_data(data, account_id)
+        with self._write_lock(account_id):
+            index = self._get_index(account_id)
+            if index.by_id.pop(comment_id, None) is None:
+                return False
+            
+            comments = index.data.get("comments", [])
+            removed = [c for c in comments if c.get("id") == comment_id]
+            index.data["comments"] = [c for c in comments if c.get("id") != comment_id]
+            self._save_data(index.data, account_id)
+            self._notify(account_id, [(c, None) for c in removed])
             return True
-        
-        return False
+
+
+def create_storage() -> StorageService:
+    """설정된 저장소 엔진(settings.storage_engine)에 맞는 저장소 생성"""
+    engine = settings.storage_engine.lower()
+    if engine == "json":
+        return StorageService()
+    if engine == "log":
+        from services.log_storage import LogStorageService
+        return LogStorageService()
+    if engine == "sharded":
+        from services.sharded_storage import ShardedStorageService
+        return ShardedStorageService()
+    if engine == "sqlite":
+        from services.sqlite_storage import SQLiteStorageService
+        return SQLiteStorageService()
+    raise ValueError(f"Unsupported storage engine: {settings.storage_engine}")
 
 
 # 싱글톤 인스턴스
-storage = StorageService()
+storage = create_storage()
@@ -0,0 +1,238 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+from config import settings
+from services.account_manager import account_manager
+from services.comment_sync import get_media_list, sync_media_comments
+from services.instagram_client import AsyncInstagramClient
+from services.rate_limiter import GraphRateLimitError
+
+
+class _AccountSchedule:
+    """계정 하나의 동기화 일정과 최근 실행 결과"""
+
+    def __init__(self, account_id: str, interval: float):
+        self.account_id = account_id
+        self.interval = interval
+        # 처음 등록되면 바로 실행
+        self.next_run = time.monotonic()
+        self.running = False
+        self.last_started: Optional[float] = None
+        self.last_run_at: Optional[str] = None
+        self.last_duration_ms: Optional[float] = None
+        self.last_synced_count: Optional[int] = None
+        self.last_error: Optional[str] = None
+        # 새 댓글 속도 (개/초, 지수 이동 평균)
+        self.velocity: Optional[float] = None
+        # 마지막 실행에서 실패해 다음 실행으로 넘어간 미디어 수
+        self.backlog_media = 0
+        # 예정 시각보다 늦게 시작한 시간 (초)
+        self.lag = 0.0
+        self.runs = 0
+        self.consecutive_failures = 0
+
+
+class SyncScheduler:
+    """
+    다중 계정 댓글 동기화 스케줄러
+    - 활성 계정(AccountManager)을 동시에 sync_scheduler_concurrency개까지 동기화합니다.
+    - 계정별 간격은 최근 새 댓글 속도에 맞춰 한 번에 약 sync_target_comments_per_run개가 모이도록 조절하고
+      (sync_interval_min ~ sync_interval_max), 새 댓글이 없으면 간격을 두 배씩 늘립니다.
+      댓글이 늘지 않은 게시물은 comments_count 워터마크로 댓글 조회 없이 건너뛰므로,
+      활발한 게시물이 있는 계정만 자주 댓글을 가져오게 됩니다.
+    - 호출 한도 초과는 Retry-After만큼, 그 외 실패는 간격을 지수적으로 늘려 다시 시도합니다.
+    """
+
+    # 지수 이동 평균에서 최근 실행의 비중
+    VELOCITY_ALPHA = 0.5
+    # 계정 목록을 다시 읽는 최대 간격 (초)
+    REFRESH_INTERVAL = 5.0
+
+    def __init__(self, limit: Optional[int] = None, full_history: bool = False, force: bool = False):
+        self.limit = limit
+        self.full_history = full_history
+        self.force = force
+        self._schedules: Dict[str, _AccountSchedule] = {}
+        self._accounts: Dict[str, Dict] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+
+    # ---------- 실행 ----------
+
+    async def start(self):
+        """백그라운드에서 스케줄러 실행 (FastAPI lifespan)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self):
+        """스케줄러와 진행 중인 동기화 중단"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run_forever(self):
+        """예정 시각이 된 계정을 동기화하고, 다음 예정 시각까지 대기하기를 반복"""
+        semaphore = asyncio.Semaphore(max(1, settings.sync_scheduler_concurrency))
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                self._refresh_accounts()
+                now = time.monotonic()
+                for schedule in self._schedules.values():
+                    if not schedule.running and schedule.next_run <= now:
+                        schedule.running = True
+                        task = asyncio.create_task(self._run(schedule, semaphore))
+                        self._tasks.add(task)
+                        task.add_done_callback(self._tasks.discard)
+
+                waiting = [s.next_run for s in self._schedules.values() if not s.running]
+                timeout = min(min(waiting, default=now + self.REFRESH_INTERVAL) - now, self.REFRESH_INTERVAL)
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), max(0.05, timeout))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in list(self._tasks):
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            for schedule in self._schedules.values():
+                schedule.running = False
+
+    async def run_once(self) -> List[Dict]:
+        """모든 활성 계정을 한 번씩 동기화하고 계정별 상태 반환 (스크립트 --once)"""
+        semaphore = asyncio.Semaphore(max(1, settings.sync_scheduler_concurrency))
+        self._refresh_accounts()
+        schedules = list(self._schedules.values())
+        for schedule in schedules:
+            schedule.running = True
+        await asyncio.gather(*(self._run(schedule, semaphore) for schedule in schedules))
+        return self.status()["accounts"]
+
+    def request_run(self, account_id: str):
+        """계정을 다음 반복에서 바로 동기화"""
+        schedule = self._schedules.get(account_id)
+        if schedule is not None:
+            schedule.next_run = time.monotonic()
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _refresh_accounts(self):
+        """활성 계정 목록을 반영 (새 계정은 바로 실행, 비활성/삭제 계정은 진행 중이 아니면 제외)"""
+        self._accounts = {
+            account["id"]: account
+            for account in account_manager.get_all_accounts()
+            if account.get("is_active", True) and account.get("access_token")
+        }
+        for account_id in self._accounts:
+            if account_id not in self._schedules:
+                self._schedules[account_id] = _AccountSchedule(account_id, settings.sync_interval_initial)
+        for account_id in list(self._schedules):
+            if account_id not in self._accounts and not self._schedules[account_id].running:
+                del self._schedules[account_id]
+
+    async def _run(self, schedule: _AccountSchedule, semaphore: asyncio.Semaphore):
+        try:
+            async with semaphore:
+                started = time.monotonic()
+                schedule.lag = max(0.0, started - schedule.next_run)
+                schedule.last_run_at = datetime.utcnow().isoformat() + "Z"
+                delay = schedule.interval
+                try:
+                    result = await self._sync_account(self._accounts[schedule.account_id])
+                except GraphRateLimitError as e:
+                    schedule.consecutive_failures += 1
+                    schedule.last_error = f"Rate limited: {e.detail}"
+                    delay = max(e.retry_after or 0.0, settings.sync_interval_min)
+                except Exception as e:
+                    schedule.consecutive_failures += 1
+                    schedule.last_error = str(e)
+                    delay = min(schedule.interval * 2 ** schedule.consecutive_failures, settings.sync_interval_max)
+                else:
+                    schedule.consecutive_failures = 0
+                    schedule.last_error = None
+                    schedule.last_synced_count = result["synced_count"]
+                    schedule.backlog_media = len(result["failed_media"])
+                    self._adapt_interval(schedule, result["inserted"], started)
+                    delay = schedule.interval
+                finally:
+                    schedule.runs += 1
+                    schedule.last_started = started
+                    schedule.last_duration_ms = round((time.monotonic() - started) * 1000, 1)
+                schedule.next_run = time.monotonic() + delay
+        finally:
+            schedule.running = False
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+    def _adapt_interval(self, schedule: _AccountSchedule, inserted: int, started: float):
+        """직전 실행 이후 들어온 새 댓글 수로 속도를 갱신하고 다음 간격 계산"""
+        if schedule.last_started is None:
+            # 첫 실행은 그동안 쌓인 댓글까지 가져오므로 속도 계산에서 제외
+            return
+        elapsed = max(1.0, started - schedule.last_started)
+        velocity = inserted / elapsed
+        if schedule.velocity is None:
+            schedule.velocity = velocity
+        else:
+            schedule.velocity = self.VELOCITY_ALPHA * velocity + (1 - self.VELOCITY_ALPHA) * schedule.velocity
+
+        if schedule.velocity > 0:
+            interval = settings.sync_target_comments_per_run / schedule.velocity
+            if inserted == 0:
+                # 이번에 새 댓글이 없었으면 줄어드는 속도를 기다리지 않고 간격을 늘림
+                interval = max(interval, schedule.interval * 2)
+        else:
+            interval = schedule.interval * 2
+        schedule.interval = min(max(interval, settings.sync_interval_min), settings.sync_interval_max)
+
+    async def _sync_account(self, account: Dict) -> Dict:
+        client = AsyncInstagramClient(account["access_token"])
+        user_id = account.get("user_id") or await client.get_user_id()
+        if not user_id:
+            raise RuntimeError("Failed to get user ID")
+        limit = self.limit or settings.sync_media_limit
+        media_list = await get_media_list(client, user_id, limit, self.full_history)
+        return await sync_media_comments(client, media_list, account["id"], force=self.force)
+
+    # ---------- 조회 ----------
+
+    def status(self) -> Dict:
+        """계정별 마지막 실행 시각/소요 시간/밀린 작업과 다음 실행까지 남은 시간"""
+        now = time.monotonic()
+        accounts = []
+        for schedule in self._schedules.values():
+            accounts.append({
+                "account_id": schedule.account_id,
+                "state": "running" if schedule.running else ("backoff" if schedule.consecutive_failures else "idle"),
+                "last_run_at": schedule.last_run_at,
+                "last_duration_ms": schedule.last_duration_ms,
+                "last_synced_count": schedule.last_synced_count,
+                "last_error": schedule.last_error,
+                "runs": schedule.runs,
+                "consecutive_failures": schedule.consecutive_failures,
+                "interval_s": round(schedule.interval, 1),
+                "next_run_in_s": None if schedule.running else round(max(0.0, schedule.next_run - now), 1),
+                "comments_per_min": None if schedule.velocity is None else round(schedule.velocity * 60, 2),
+                "backlog": {
+                    "failed_media": schedule.backlog_media,
+                    # 예정 시각이 지났는데 아직 시작하지 못한 시간 (동시 실행 제한으로 대기 중)
+                    "overdue_s": round(max(0.0, now - schedule.next_run), 1) if not schedule.running else 0.0,
+                    "last_start_lag_s": round(schedule.lag, 1),
+                },
+            })
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "concurrency": settings.sync_scheduler_concurrency,
+            "accounts": accounts,
+        }
+
+
+# 싱글톤 인스턴스
+sync_scheduler = SyncScheduler()
@@ -0,0 +1,85 @@
+import json
+import os
+import threading
+from contextlib import nullcontext
+from typing import Dict, Optional
+from datetime import datetime
+from config import settings
+from services.file_lock import FileLock
+
+
+class SyncStateStore:
+    """
+    (계정, 미디어)별 동기화 워터마크 저장소
+    마지막 동기화 시점의 comments_count와 가장 최신 댓글의 timestamp/id를 기록해
+    다음 동기화에서 변화가 없는 미디어와 이미 받은 댓글을 건너뛸 수 있게 합니다.
+    서버와 scripts/sync_comments.py가 같은 파일을 쓰므로, 저장할 때는 잠금 파일(.lock)을 잡고 최신 파일에
+    이 프로세스가 바꾼 워터마크만 합쳐 쓰고, 다른 프로세스가 파일을 바꾸면 다음 조회 때 다시 읽습니다.
+    """
+
+    def __init__(self):
+        self.state_file = os.path.join(settings.data_dir, "sync_state.json")
+        self._data: Optional[Dict] = None
+        # 마지막으로 읽은(쓴) 파일 시그니처 (inode, 수정 시각, 크기)
+        self._signature: Optional[tuple] = None
+        # 아직 저장하지 않은 워터마크 (계정 → 미디어 → 워터마크)
+        self._pending: Dict[str, Dict[str, Dict]] = {}
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(self.state_file + ".lock")
+
+    def _file_signature(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self.state_file)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _load(self) -> Dict:
+        """파일 내용 (처음 읽거나 다른 프로세스가 파일을 바꿨으면 다시 읽음)"""
+        signature = self._file_signature()
+        if self._data is None or signature != self._signature:
+            try:
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    self._data = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._data = {"accounts": {}}
+            self._signature = signature
+        return self._data
+
+    def get_watermark(self, account_id: Optional[str], media_id: str) -> Optional[Dict]:
+        """미디어의 마지막 동기화 워터마크 조회"""
+        key = account_id or "default"
+        with self._lock:
+            pending = self._pending.get(key, {}).get(media_id)
+            if pending is not None:
+                return pending
+            return self._load()["accounts"].get(key, {}).get(media_id)
+
+    def set_watermark(self, account_id: Optional[str], media_id: str, watermark: Dict):
+        """미디어의 워터마크 갱신 (save() 호출 전까지는 메모리에만 반영)"""
+        with self._lock:
+            watermark = dict(watermark, synced_at=datetime.utcnow().isoformat() + "Z")
+            self._pending.setdefault(account_id or "default", {})[media_id] = watermark
+
+    def save(self):
+        """바꾼 워터마크를 최신 파일에 합쳐 저장 (잠금 파일을 잡고 읽고 고쳐 쓰기, 임시 파일에 쓴 뒤 교체)"""
+        with self._lock:
+            if not self._pending:
+                return
+            os.makedirs(settings.data_dir, exist_ok=True)
+            with self._file_lock if settings.storage_file_lock else nullcontext():
+                data = self._load()
+                accounts = data.setdefault("accounts", {})
+                for key, watermarks in self._pending.items():
+                    accounts.setdefault(key, {}).update(watermarks)
+                # 임시 파일 이름에 PID를 넣어 다른 프로세스의 임시 파일과 겹치지 않게 함
+                tmp_file = f"{self.state_file}.{os.getpid()}.tmp"
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_file, self.state_file)
+                self._signature = self._file_signature()
+            self._pending = {}
+
+
+# 싱글톤 인스턴스
+sync_state = SyncStateStore()
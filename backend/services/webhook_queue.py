@@ -0,0 +1,262 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+from config import settings
+from services.storage import storage
+from services.comment_enricher import comment_enricher
+from services.comment_events import comment_events
+from services.rate_limiter import rate_limiter_metrics
+from services.webhook_spool import WebhookSpool, webhook_spool
+
+
+def parse_comment_events(data: Dict) -> List[Dict]:
+    """웹훅 페이로드에서 새 댓글 이벤트를 저장소 댓글 형식으로 추출"""
+    comments = []
+    for entry in data.get("entry", []):
+        # 댓글 이벤트 처리
+        for change in entry.get("changes", []):
+            if change.get("field") != "comments":
+                continue
+            value = change.get("value", {})
+            if "text" in value:
+                comments.append({
+                    "id": value.get("id"),
+                    "post_id": value.get("media_id") or entry.get("id"),
+                    "text": value.get("text"),
+                    "username": value.get("from", {}).get("username", "unknown"),
+                    "timestamp": value.get("created_time"),
+                    "replies": []
+                })
+    return comments
+
+
+async def enrich_comment(comment_data: Dict):
+    """Graph API에서 좋아요 수와 답글을 가져와 댓글 데이터에 추가 (같은 게시물의 댓글은 묶어서 조회)"""
+    try:
+        detailed_comment = await comment_enricher.get(comment_data["id"], comment_data.get("post_id"))
+        if detailed_comment:
+            comment_data.update({
+                "like_count": detailed_comment.get("like_count", 0),
+                "replies": detailed_comment.get("replies", {}).get("data", [])
+            })
+    except Exception as e:
+        print(f"Error fetching detailed comment: {e}")
+
+
+class WebhookIngestQueue:
+    """
+    웹훅 이벤트 비동기 처리 큐
+    웹훅 핸들러는 원본 페이로드를 넣고 바로 응답하며, 백그라운드 워커들이 묶음 단위로
+    파싱 → 중복 제거 → 상세 정보 조회 → 저장을 처리합니다.
+    스풀이 설정되어 있으면 페이로드를 먼저 디스크에 확정한 뒤 큐에 넣고, 저장이 끝나면 ack 하므로
+    재시작해도 처리되지 않은 이벤트를 잃지 않습니다.
+    """
+
+    # 저장 실패 시 다시 시도하는 횟수
+    MAX_ATTEMPTS = 3
+
+    # 최근 처리한 댓글 ID를 기억하는 개수 (Meta의 중복 전송 제거용)
+    RECENT_IDS_LIMIT = 10000
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        spool: Optional[WebhookSpool] = None
+    ):
+        self.workers = workers or settings.webhook_workers
+        self.batch_size = batch_size or settings.webhook_batch_size
+        self.max_size = max_size or settings.webhook_queue_max_size
+        self.spool = spool
+        # (큐에 넣은 시각, 스풀 시퀀스, 원본 페이로드, 시도 횟수)
+        self._items: Deque[Tuple[float, Optional[int], bytes, int]] = deque()
+        self._not_empty: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._in_flight = 0
+        self._recent_ids: "OrderedDict[str, None]" = OrderedDict()
+        self._stats = {
+            "enqueued_total": 0,
+            "processed_total": 0,
+            "failed_total": 0,
+            "dropped_total": 0,
+            "retried_total": 0,
+            "replayed_total": 0,
+            "duplicates_total": 0,
+            "batches_total": 0,
+            "comments_stored_total": 0,
+        }
+        self._last_batch_lag = 0.0
+        self._max_lag = 0.0
+
+    async def start(self):
+        """워커 시작 (FastAPI lifespan에서 호출)"""
+        if self._tasks:
+            return
+        if self.spool is not None:
+            # 지난 실행에서 처리하지 못한 이벤트 재처리
+            for seq, payload in self.spool.replay():
+                self._items.append((time.time(), seq, payload, 0))
+                self._stats["replayed_total"] += 1
+            if self._stats["replayed_total"]:
+                print(f"✅ 웹훅 스풀에서 {self._stats['replayed_total']}개의 이벤트를 다시 처리합니다.")
+        self._not_empty = asyncio.Event()
+        if self._items:
+            self._not_empty.set()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = 10.0):
+        """남은 이벤트를 최대 timeout초 동안 처리한 뒤 워커 종료"""
+        deadline = time.monotonic() + timeout
+        while (self._items or self._in_flight) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.spool is not None:
+            self.spool.close()
+
+    async def submit(self, payload: bytes) -> bool:
+        """
+        원본 페이로드를 (스풀에 확정한 뒤) 큐에 추가
+        큐가 가득 차면 스풀에도 쓰지 않고 False 반환
+        """
+        if len(self._items) >= self.max_size:
+            self._stats["dropped_total"] += 1
+            return False
+        seq = await self.spool.append(payload) if self.spool is not None else None
+        self._push((time.time(), seq, payload, 0))
+        self._stats["enqueued_total"] += 1
+        return True
+
+    def _push(self, item: Tuple[float, Optional[int], bytes, int]):
+        self._items.append(item)
+        if self._not_empty is not None:
+            self._not_empty.set()
+
+    def metrics(self) -> Dict:
+        """큐 깊이, 지연 시간 등 처리 현황"""
+        oldest_age = time.time() - self._items[0][0] if self._items else 0.0
+        spool_metrics = {}
+        if self.spool is not None:
+            spool_metrics = {
+                "spool_committed_seq": self.spool.committed_seq,
+                "spool_pending": self.spool.pending_count(),
+            }
+        return {
+            "queue_depth": len(self._items),
+            "in_flight": self._in_flight,
+            "oldest_pending_age_ms": round(oldest_age * 1000, 1),
+            "last_batch_lag_ms": round(self._last_batch_lag * 1000, 1),
+            "max_lag_ms": round(self._max_lag * 1000, 1),
+            "workers": len(self._tasks),
+            **self._stats,
+            **spool_metrics,
+            "enrichment": comment_enricher.metrics(),
+            "graph_rate_limits": rate_limiter_metrics(),
+            "comment_stream": comment_events.metrics(),
+        }
+
+    def _take_batch(self) -> List[Tuple[float, Optional[int], bytes, int]]:
+        batch = []
+        while self._items and len(batch) < self.batch_size:
+            batch.append(self._items.popleft())
+        if not self._items:
+            self._not_empty.clear()
+        return batch
+
+    async def _worker(self):
+        while True:
+            await self._not_empty.wait()
+            batch = self._take_batch()
+            if not batch:
+                continue
+            self._in_flight += len(batch)
+            try:
+                await self._process_batch(batch)
+                self._ack(batch)
+            except Exception as e:
+                print(f"Webhook worker error: {e}")
+                self._retry(batch)
+            finally:
+                self._in_flight -= len(batch)
+
+    def _ack(self, batch):
+        if self.spool is not None:
+            self.spool.ack([seq for _, seq, _, _ in batch if seq is not None])
+
+    def _retry(self, batch):
+        """저장에 실패한 이벤트를 다시 큐에 넣음 (최대 MAX_ATTEMPTS회, 이후에는 포기하고 ack)"""
+        given_up = []
+        for enqueued_at, seq, payload, attempts in batch:
+            if attempts + 1 < self.MAX_ATTEMPTS:
+                self._push((enqueued_at, seq, payload, attempts + 1))
+                self._stats["retried_total"] += 1
+            else:
+                given_up.append((enqueued_at, seq, payload, attempts))
+        self._stats["failed_total"] += len(given_up)
+        self._ack(given_up)
+
+    def _is_duplicate(self, comment_id: Optional[str]) -> bool:
+        """최근에 저장한 댓글 ID인지 확인"""
+        if not comment_id or comment_id not in self._recent_ids:
+            return False
+        self._recent_ids.move_to_end(comment_id)
+        return True
+
+    def _remember(self, comments: List[Dict]):
+        """
+        저장을 마친 댓글 ID 기록
+        저장에 성공한 뒤에만 기록해야 실패한 묶음을 다시 시도할 때 중복으로 건너뛰지 않습니다.
+        """
+        for comment_data in comments:
+            if comment_data["id"]:
+                self._recent_ids[comment_data["id"]] = None
+        while len(self._recent_ids) > self.RECENT_IDS_LIMIT:
+            self._recent_ids.popitem(last=False)
+
+    async def _process_batch(self, batch: List[Tuple[float, Optional[int], bytes, int]]):
+        """파싱 → 중복 제거 → 상세 정보 조회 → 한 번에 저장"""
+        comments = []
+        batch_ids = set()
+        for _, _, payload, _ in batch:
+            try:
+                data = json.loads(payload.decode('utf-8'))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                print("Webhook error: Invalid JSON")
+                self._stats["failed_total"] += 1
+                continue
+            for comment_data in parse_comment_events(data):
+                comment_id = comment_data["id"]
+                if self._is_duplicate(comment_id) or (comment_id and comment_id in batch_ids):
+                    self._stats["duplicates_total"] += 1
+                    continue
+                if comment_id:
+                    batch_ids.add(comment_id)
+                comments.append(comment_data)
+
+        if comments:
+            # Instagram API에서 상세 정보 가져오기 (선택사항)
+            await asyncio.gather(*[
+                enrich_comment(comment_data)
+                for comment_data in comments
+                if comment_data["id"]
+            ])
+            # 파일 저장(fsync, 잠금 대기)은 이벤트 루프를 막지 않도록 스레드에서 실행
+            loop = asyncio.get_running_loop()
+            counts = await loop.run_in_executor(None, storage.upsert_many, comments)
+            self._remember(comments)
+            self._stats["comments_stored_total"] += counts["inserted"] + counts["updated"]
+
+        lag = time.time() - batch[0][0]
+        self._last_batch_lag = lag
+        self._max_lag = max(self._max_lag, lag)
+        self._stats["processed_total"] += len(batch)
+        self._stats["batches_total"] += 1
+
+
+# 싱글톤 인스턴스
+webhook_queue = WebhookIngestQueue(spool=webhook_spool if settings.webhook_spool_enabled else None)
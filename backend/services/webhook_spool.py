@@ -0,0 +1,292 @@
+import asyncio
+import glob
+import os
+import shutil
+import struct
+import zlib
+from typing import BinaryIO, Iterator, List, Optional, Set, Tuple
+from config import settings
+from services.file_lock import FileLock
+
+
+# 레코드 헤더: 페이로드 길이(4) + CRC32(4) + 시퀀스 번호(8)
+_HEADER = struct.Struct(">IIQ")
+
+
+class WebhookSpool:
+    """
+    웹훅 이벤트 디스크 스풀 (write-ahead)
+    원본 페이로드를 세그먼트 파일에 순서대로 추가하고, 짧은 시간 창 안의 추가분을 fsync 한 번으로
+    묶어(group commit) 디스크에 확정한 뒤 호출자에게 돌려줍니다.
+    처리가 끝난 시퀀스는 ack()로 체크포인트를 올리며, 재시작 시 체크포인트 이후 이벤트를 다시 처리합니다.
+    (최소 한 번 전달 — 같은 이벤트가 다시 처리될 수 있으므로 저장은 댓글 ID 기준 upsert로 멱등하게 처리)
+    uvicorn 워커 등 여러 프로세스가 함께 쓰도록 프로세스마다 하위 디렉토리(webhook_spool/<pid>)를 쓰고,
+    그 디렉토리의 owner.lock을 잡고 있습니다. 시작할 때 잠금을 잡을 수 있는(주인 프로세스가 끝난) 다른 디렉토리의
+    처리되지 않은 이벤트는 자기 스풀로 옮겨 다시 처리합니다.
+    """
+
+    def __init__(self, spool_dir: Optional[str] = None):
+        self.root_dir = spool_dir or os.path.join(settings.data_dir, settings.webhook_spool_dir)
+        # 프로세스별 디렉토리는 open()에서 정함 (fork된 워커도 자기 PID를 쓰도록)
+        self.spool_dir: Optional[str] = None
+        self.checkpoint_file: Optional[str] = None
+        self._owner_lock: Optional[FileLock] = None
+        self.segment_max_bytes = settings.webhook_spool_segment_bytes
+        self.group_commit_window = settings.webhook_spool_group_commit_ms / 1000
+        self._file: Optional[BinaryIO] = None
+        self._segment_path: Optional[str] = None
+        self._next_seq = 1
+        self._committed_seq = 0
+        self._acked: Set[int] = set()
+        # fsync를 기다리는 호출자들 (group commit)
+        self._waiters: List[asyncio.Future] = []
+        self._commit_task: Optional[asyncio.Task] = None
+        self._opened = False
+
+    # ---------- 세그먼트 파일 ----------
+
+    def _segments(self, spool_dir: Optional[str] = None) -> List[str]:
+        return sorted(glob.glob(os.path.join(spool_dir or self.spool_dir, "*.seg")))
+
+    @staticmethod
+    def _read_checkpoint(spool_dir: str) -> int:
+        try:
+            with open(os.path.join(spool_dir, "checkpoint"), 'r', encoding='utf-8') as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    @staticmethod
+    def _segment_first_seq(path: str) -> int:
+        return int(os.path.splitext(os.path.basename(path))[0])
+
+    def _read_segment(self, path: str) -> Iterator[Tuple[int, bytes, int]]:
+        """세그먼트의 (seq, payload, 레코드 끝 오프셋)을 순서대로 반환 (손상된 꼬리에서 멈춤)"""
+        with open(path, 'rb') as f:
+            offset = 0
+            while True:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    return
+                length, crc, seq = _HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    return
+                offset += _HEADER.size + length
+                yield seq, payload, offset
+
+    def _fsync_dir(self):
+        if hasattr(os, "O_DIRECTORY"):
+            fd = os.open(self.spool_dir, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _open_segment(self, first_seq: int):
+        self._segment_path = os.path.join(self.spool_dir, f"{first_seq:016d}.seg")
+        self._file = open(self._segment_path, 'ab')
+        self._fsync_dir()
+
+    def open(self):
+        """
+        프로세스별 디렉토리를 잡고 체크포인트를 읽어 마지막 세그먼트의 손상된 꼬리를 잘라낸 뒤 쓰기 준비,
+        주인이 없는 다른 디렉토리의 이벤트를 가져옴
+        """
+        if self._opened:
+            return
+        self.spool_dir = os.path.join(self.root_dir, str(os.getpid()))
+        self.checkpoint_file = os.path.join(self.spool_dir, "checkpoint")
+        os.makedirs(self.root_dir, exist_ok=True)
+        # 만든 디렉토리를 잠그기 전에 다른 프로세스가 주인 없는 디렉토리로 가져가지 않도록 adopt.lock 안에서 잠금
+        with FileLock(os.path.join(self.root_dir, "adopt.lock")):
+            os.makedirs(self.spool_dir, exist_ok=True)
+            self._owner_lock = FileLock(os.path.join(self.spool_dir, "owner.lock"))
+            self._owner_lock.acquire()
+        self._committed_seq = self._read_checkpoint(self.spool_dir)
+
+        last_seq = self._committed_seq
+        segments = self._segments()
+        if segments:
+            last_segment = segments[-1]
+            valid_end = 0
+            for seq, _, end in self._read_segment(last_segment):
+                last_seq = max(last_seq, seq)
+                valid_end = end
+            if valid_end < os.path.getsize(last_segment):
+                # 기록 도중 중단된 레코드 제거
+                with open(last_segment, 'r+b') as f:
+                    f.truncate(valid_end)
+            if last_seq < self._committed_seq:
+                last_seq = self._committed_seq
+            self._segment_path = last_segment
+            self._file = open(last_segment, 'ab')
+        self._next_seq = last_seq + 1
+        if self._file is None:
+            self._open_segment(self._next_seq)
+        self._opened = True
+        self._adopt_orphans()
+
+    def close(self):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+        if self.spool_dir is not None:
+            self._save_checkpoint()
+            if self.pending_count() == 0:
+                # 남은 이벤트가 없으면 다른 프로세스가 가져갈 것도 없으므로 디렉토리 정리
+                shutil.rmtree(self.spool_dir, ignore_errors=True)
+        if self._owner_lock is not None:
+            self._owner_lock.release()
+            self._owner_lock = None
+        self._opened = False
+
+    # ---------- 주인이 없는 스풀 가져오기 ----------
+
+    def _adopt_orphans(self):
+        """
+        끝난 프로세스의 디렉토리(와 이전 버전의 최상위 스풀 파일)에 남은 처리되지 않은 이벤트를 자기 스풀 끝에 옮김
+        시작하는 프로세스끼리 같은 디렉토리를 동시에 가져가지 않도록 최상위 adopt.lock으로 배타합니다.
+        """
+        with FileLock(os.path.join(self.root_dir, "adopt.lock")):
+            adopted = 0
+            if self._segments(self.root_dir):
+                # 프로세스별 디렉토리를 쓰기 전 버전의 스풀
+                adopted += self._copy_pending(self.root_dir)
+                for path in self._segments(self.root_dir) + [os.path.join(self.root_dir, "checkpoint")]:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+            for name in sorted(os.listdir(self.root_dir)):
+                orphan_dir = os.path.join(self.root_dir, name)
+                if orphan_dir == self.spool_dir or not os.path.isdir(orphan_dir):
+                    continue
+                owner_lock = FileLock(os.path.join(orphan_dir, "owner.lock"))
+                if not owner_lock.acquire(blocking=False):
+                    # 실행 중인 프로세스의 스풀
+                    continue
+                try:
+                    adopted += self._copy_pending(orphan_dir)
+                finally:
+                    owner_lock.release()
+                shutil.rmtree(orphan_dir, ignore_errors=True)
+            if adopted:
+                print(f"✅ 종료된 프로세스의 웹훅 스풀에서 {adopted}개의 이벤트를 가져왔습니다.")
+
+    def _copy_pending(self, spool_dir: str) -> int:
+        """다른 스풀 디렉토리의 체크포인트 이후 이벤트를 새 시퀀스 번호로 자기 스풀에 추가하고 디스크에 확정"""
+        committed_seq = self._read_checkpoint(spool_dir)
+        count = 0
+        for path in self._segments(spool_dir):
+            for seq, payload, _ in self._read_segment(path):
+                if seq > committed_seq:
+                    self._write_record(payload)
+                    count += 1
+        if count:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        return count
+
+    # ---------- 쓰기 (group commit) ----------
+
+    async def append(self, payload: bytes) -> int:
+        """페이로드를 스풀에 추가하고 디스크에 확정(fsync)되면 시퀀스 번호 반환"""
+        if not self._opened:
+            self.open()
+        seq = self._write_record(payload)
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        if self._commit_task is None or self._commit_task.done():
+            self._commit_task = asyncio.create_task(self._group_commit())
+        await future
+        return seq
+
+    def _write_record(self, payload: bytes) -> int:
+        """현재 세그먼트 끝에 레코드 추가 (디스크 확정 전) → 시퀀스 번호"""
+        seq = self._next_seq
+        self._next_seq += 1
+        self._file.write(_HEADER.pack(len(payload), zlib.crc32(payload), seq) + payload)
+        return seq
+
+    async def _group_commit(self):
+        """모여 있는 추가분을 fsync 한 번으로 확정 (fsync는 이벤트 루프 밖에서 실행)"""
+        loop = asyncio.get_running_loop()
+        while self._waiters:
+            await asyncio.sleep(self.group_commit_window)
+            waiters, self._waiters = self._waiters, []
+            try:
+                self._file.flush()
+                await loop.run_in_executor(None, os.fsync, self._file.fileno())
+            except Exception as e:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(e)
+                continue
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+            if self._file.tell() >= self.segment_max_bytes:
+                self._roll_segment()
+
+    def _roll_segment(self):
+        """현재 세그먼트를 닫고 새 세그먼트 시작"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._open_segment(self._next_seq)
+
+    # ---------- 재처리 / 체크포인트 ----------
+
+    def replay(self) -> Iterator[Tuple[int, bytes]]:
+        """체크포인트 이후 아직 처리되지 않은 (seq, payload) 반환"""
+        if not self._opened:
+            self.open()
+        self._file.flush()
+        for path in self._segments():
+            for seq, payload, _ in self._read_segment(path):
+                if seq > self._committed_seq:
+                    yield seq, payload
+
+    def ack(self, seqs: List[int]):
+        """처리가 끝난 시퀀스 기록, 연속 구간만큼 체크포인트를 올리고 다 쓴 세그먼트 삭제"""
+        self._acked.update(seqs)
+        advanced = False
+        while self._committed_seq + 1 in self._acked:
+            self._committed_seq += 1
+            self._acked.discard(self._committed_seq)
+            advanced = True
+        if advanced:
+            self._save_checkpoint()
+            self._remove_consumed_segments()
+
+    @property
+    def committed_seq(self) -> int:
+        return self._committed_seq
+
+    def pending_count(self) -> int:
+        """디스크에 있지만 아직 처리되지 않은 이벤트 수"""
+        return self._next_seq - 1 - self._committed_seq
+
+    def _save_checkpoint(self):
+        # 체크포인트가 유실돼도 재처리될 뿐이므로 fsync 없이 원자적 교체만 수행
+        tmp_file = self.checkpoint_file + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(str(self._committed_seq))
+        os.replace(tmp_file, self.checkpoint_file)
+
+    def _remove_consumed_segments(self):
+        segments = self._segments()
+        for path, next_path in zip(segments, segments[1:]):
+            if path == self._segment_path:
+                break
+            # 다음 세그먼트의 첫 시퀀스 직전까지 모두 처리된 세그먼트
+            if self._segment_first_seq(next_path) - 1 <= self._committed_seq:
+                os.remove(path)
+
+
+# 싱글톤 인스턴스
+webhook_spool = WebhookSpool()
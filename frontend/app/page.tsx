@@ -1,7 +1,7 @@
 'use client';
 
 import { useState, useEffect } from 'react';
-import { getComments, syncComments, getAccounts, createAccount, getInstagramLoginUrl, Account, Comment } from '@/lib/api';
+import { getComments, syncComments, getAccounts, createAccount, getInstagramLoginUrl, subscribeComments, Account, Comment, CommentEvent } from '@/lib/api';
 import CommentCard from '@/components/CommentCard';
 import styles from './page.module.css';
 
@@ -47,19 +47,27 @@ export default function Home() {
     loadAccounts();
   }, []);
 
+  // 푸시로 받은 댓글 변경을 목록에 반영
+  const applyCommentEvent = (event: CommentEvent) => {
+    setComments((current) => {
+      if (event.type === 'deleted') {
+        return current.filter((comment) => comment.id !== event.comment.id);
+      }
+      if (current.some((comment) => comment.id === event.comment.id)) {
+        return current.map((comment) => (comment.id === event.comment.id ? event.comment : comment));
+      }
+      return [event.comment, ...current];
+    });
+  };
+
   useEffect(() => {
-    if (selectedAccountId) {
-      loadComments();
+    if (!selectedAccountId) {
+      return;
     }
+    loadComments();
     
-    // 30초마다 댓글 새로고침 (폴링)
-    const interval = setInterval(() => {
-      if (selectedAccountId) {
-        loadComments();
-      }
-    }, 30000);
-    
-    return () => clearInterval(interval);
+    // 새 댓글은 서버가 바로 보내줌 (폴링 대신 Server-Sent Events)
+    return subscribeComments(selectedAccountId, applyCommentEvent, loadComments);
   }, [selectedAccountId]);
 
   const handleSync = async () => {
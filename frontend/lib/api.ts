@@ -28,6 +28,12 @@ export interface Reply {
   created_at?: string;
 }
 
+export interface CommentEvent {
+  type: 'created' | 'updated' | 'deleted';
+  account_id: string;
+  comment: Comment;
+}
+
 export interface ReplyRequest {
   message: string;
 }
@@ -78,6 +84,25 @@ export async function getComments(accountId?: string, postId?: string, limit = 1
   return response.data;
 }
 
+// 새 댓글 푸시 구독 (Server-Sent Events)
+// 연결이 끊기면 브라우저가 Last-Event-ID로 자동 재연결해 놓친 이벤트를 이어 받고,
+// 이어 받을 수 없으면 reset 이벤트가 오므로 목록을 다시 불러오면 됩니다. 반환값을 호출하면 구독 해제.
+export function subscribeComments(
+  accountId: string | undefined,
+  onEvent: (event: CommentEvent) => void,
+  onReset: () => void
+): () => void {
+  const params = new URLSearchParams();
+  if (accountId) {
+    params.set('account_id', accountId);
+  }
+  
+  const source = new EventSource(`${API_BASE_URL}/api/comments/stream?${params.toString()}`);
+  source.addEventListener('comment', (event) => onEvent(JSON.parse((event as MessageEvent).data)));
+  source.addEventListener('reset', () => onReset());
+  return () => source.close();
+}
+
 // 특정 댓글 조회
 export async function getComment(commentId: string, accountId?: string): Promise<Comment> {
   const params: any = {};